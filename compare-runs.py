@@ -0,0 +1,433 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from dataclasses import asdict, dataclass
+
+try:
+    from influxdb_client import InfluxDBClient
+except ImportError:  # pragma: no cover - only needed when comparing test names
+    InfluxDBClient = None
+
+try:
+    import pyarrow.dataset as pa_dataset
+except ImportError:  # pragma: no cover - only needed when comparing sample exports
+    pa_dataset = None
+
+
+INFLUXDB_URL = os.getenv("INFLUXDB_URL", "http://localhost:8086")
+INFLUX_TOKEN = os.getenv("INFLUXDB_TOKEN", "my-super-secret-auth-token")
+INFLUX_ORG = os.getenv("INFLUXDB_ORG", "arkiv-network")
+INFLUX_BUCKET = os.getenv("INFLUXDB_BUCKET", "arkiv-tests")
+
+# Window used to turn counters into a distribution of rates (seconds)
+RATE_WINDOW_SECONDS = 10
+
+# Minimum samples per run for a distribution comparison
+MIN_SAMPLES = 8
+
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+NO_CHANGE = "no change"
+INSUFFICIENT = "insufficient data"
+
+
+@dataclass
+class RunData:
+    """What one run provides for the comparison."""
+
+    source: str
+    latencies: dict  # request name -> latencies in milliseconds
+    throughput: list  # entities (or requests) per second, one value per rate window
+    scalars: dict  # metric name -> single value
+
+
+@dataclass
+class Verdict:
+    metric: str
+    statistic: str
+    baseline: float | None
+    candidate: float | None
+    change: float | None  # relative, candidate / baseline - 1
+    ci_low: float | None
+    ci_high: float | None
+    p_value: float | None
+    verdict: str
+
+
+def quantile(values, q):
+    """Linear-interpolated quantile of a non-empty sequence."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def mean(values):
+    return sum(values) / len(values)
+
+
+def mann_whitney_u(baseline, candidate):
+    """Two-sided Mann-Whitney U test (normal approximation with tie correction), returns (U, p)."""
+    n1 = len(baseline)
+    n2 = len(candidate)
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        rank_sum += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        i = j + 1
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    p = math.erfc(max(z, 0.0) / math.sqrt(2))
+    return u, min(p, 1.0)
+
+
+def bootstrap_change_ci(baseline, candidate, statistic, iterations=2000, confidence=0.95, rng=None):
+    """Bootstrap confidence interval of statistic(candidate) / statistic(baseline) - 1."""
+    rng = rng or random.Random(0)
+    changes = []
+    for _ in range(iterations):
+        base = statistic(rng.choices(baseline, k=len(baseline)))
+        cand = statistic(rng.choices(candidate, k=len(candidate)))
+        if base:
+            changes.append(cand / base - 1)
+    if not changes:
+        return None, None
+    tail = (1 - confidence) / 2
+    return quantile(changes, tail), quantile(changes, 1 - tail)
+
+
+def compare_distribution(metric, statistic_name, baseline, candidate, lower_is_better, args, rng=None):
+    """
+    Compare two samples: Mann-Whitney for a shift, bootstrap CI for the size of the change.
+
+    Mann-Whitney tests a shift of the whole distribution and misses a change in the tail, so
+    p95 verdicts are gated on the bootstrap CI alone.
+    """
+    if len(baseline) < MIN_SAMPLES or len(candidate) < MIN_SAMPLES:
+        return Verdict(metric, statistic_name, None, None, None, None, None, None, INSUFFICIENT)
+
+    rng = rng or random.Random(0)
+    statistic = STATISTICS[statistic_name]
+    base_value = statistic(baseline)
+    cand_value = statistic(candidate)
+    change = cand_value / base_value - 1 if base_value else None
+    # The tests run on a random subset of large runs, the reported values use all samples
+    if len(baseline) > args.max_samples:
+        baseline = rng.sample(baseline, args.max_samples)
+    if len(candidate) > args.max_samples:
+        candidate = rng.sample(candidate, args.max_samples)
+    p_value = None
+    if statistic_name != "p95":
+        _, p_value = mann_whitney_u(baseline, candidate)
+    ci_low, ci_high = bootstrap_change_ci(
+        baseline, candidate, statistic, args.bootstrap_iterations, 1 - args.alpha, rng
+    )
+
+    verdict = NO_CHANGE
+    if (p_value is None or p_value < args.alpha) and ci_low is not None:
+        worse_low, worse_high = (ci_low, ci_high) if lower_is_better else (-ci_high, -ci_low)
+        if worse_low > 0 and abs(change or 0) >= args.min_effect:
+            verdict = REGRESSION
+        elif worse_high < 0 and abs(change or 0) >= args.min_effect:
+            verdict = IMPROVEMENT
+    return Verdict(metric, statistic_name, base_value, cand_value, change, ci_low, ci_high, p_value, verdict)
+
+
+def compare_scalar(metric, baseline, candidate, lower_is_better, args):
+    """Compare single values per run against the --scalar-threshold relative change."""
+    if baseline is None or candidate is None:
+        return Verdict(metric, "value", baseline, candidate, None, None, None, None, INSUFFICIENT)
+    change = candidate / baseline - 1 if baseline else None
+    verdict = NO_CHANGE
+    if change is not None and abs(change) >= args.scalar_threshold:
+        worse = change > 0 if lower_is_better else change < 0
+        verdict = REGRESSION if worse else IMPROVEMENT
+    return Verdict(metric, "value", baseline, candidate, change, None, None, None, verdict)
+
+
+STATISTICS = {
+    "p50": lambda values: quantile(values, 0.5),
+    "p95": lambda values: quantile(values, 0.95),
+    "mean": mean,
+}
+
+# Nodes whose database growth is reported per entity
+DB_NODES = ("sequencer", "validator")
+
+# Scalar metric -> lower is better
+SCALAR_METRICS = {
+    **{f"db_bytes_per_entity_{node}": True for node in DB_NODES},
+    "cost_usd_per_entity": True,
+    "da_efficiency": True,
+}
+
+
+def compare_runs(baseline, candidate, args, rng=None):
+    """Verdicts for everything both runs provide."""
+    rng = rng or random.Random(args.seed)
+    verdicts = []
+    for name in sorted(set(baseline.latencies) & set(candidate.latencies)):
+        for statistic_name in ("p50", "p95"):
+            verdicts.append(
+                compare_distribution(
+                    f"latency {name}",
+                    statistic_name,
+                    baseline.latencies[name],
+                    candidate.latencies[name],
+                    True,
+                    args,
+                    rng,
+                )
+            )
+    if baseline.throughput and candidate.throughput:
+        verdicts.append(
+            compare_distribution("throughput", "mean", baseline.throughput, candidate.throughput, False, args, rng)
+        )
+    for metric, lower_is_better in SCALAR_METRICS.items():
+        if metric in baseline.scalars or metric in candidate.scalars:
+            verdicts.append(
+                compare_scalar(metric, baseline.scalars.get(metric), candidate.scalars.get(metric), lower_is_better, args)
+            )
+    return verdicts
+
+
+def samples_to_run(source, rows):
+    """Build RunData from raw sample rows (dicts with the stress/tools/sample_sink.py columns)."""
+    latencies = {}
+    windows = {}
+    for row in rows:
+        if row.get("error"):
+            continue
+        latencies.setdefault(row["name"], []).append(float(row["latency_ms"]))
+        if row.get("entity_count"):
+            window = int(row["timestamp"] // RATE_WINDOW_SECONDS)
+            windows[window] = windows.get(window, 0) + row["entity_count"]
+    throughput = []
+    if len(windows) > 2:
+        # The first and last windows are partial
+        first, last = min(windows), max(windows)
+        throughput = [windows.get(w, 0) / RATE_WINDOW_SECONDS for w in range(first + 1, last)]
+    return RunData(source=source, latencies=latencies, throughput=throughput, scalars={})
+
+
+def load_samples(path):
+    """Load a SAMPLE_SINK_DIR export (all workers)."""
+    if pa_dataset is None:
+        raise RuntimeError("pyarrow is required to read sample exports")
+    table = pa_dataset.dataset(path, format="parquet", partitioning="hive").to_table(
+        columns=["timestamp", "name", "latency_ms", "entity_count", "error"]
+    )
+    columns = table.to_pydict()
+    rows = (
+        {
+            "timestamp": timestamp.timestamp(),
+            "name": name,
+            "latency_ms": latency_ms,
+            "entity_count": entity_count,
+            "error": error,
+        }
+        for timestamp, name, latency_ms, entity_count, error in zip(
+            columns["timestamp"], columns["name"], columns["latency_ms"], columns["entity_count"], columns["error"]
+        )
+    )
+    return samples_to_run(path, rows)
+
+
+def escape_flux_string(value):
+    """Escape a string value before interpolating it into a Flux query."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+    )
+
+
+def query_values(flux_query):
+    """_value of every record returned by a Flux query."""
+    if InfluxDBClient is None:
+        raise RuntimeError("influxdb_client is required to compare test names")
+    with InfluxDBClient(url=INFLUXDB_URL, token=INFLUX_TOKEN, org=INFLUX_ORG) as client:
+        result = client.query_api().query(org=INFLUX_ORG, query=flux_query)
+    return [record["_value"] for table in result for record in table.records]
+
+
+def measurement_filter(test_name, measurement):
+    return f"""
+    from(bucket: "{escape_flux_string(INFLUX_BUCKET)}")
+      |> range(start: 0)
+      |> filter(fn: (r) => r["_measurement"] == "{escape_flux_string(measurement)}")
+      |> filter(fn: (r) => r["test"] == "{escape_flux_string(test_name)}")
+    """
+
+
+def query_total(test_name, measurement, fn="last"):
+    """Sum over all series of the last (or max) value of a measurement, None if missing."""
+    values = query_values(measurement_filter(test_name, measurement) + f"|> {fn}()\n  |> group()\n  |> sum()")
+    return values[-1] if values else None
+
+
+def query_growth(test_name, measurement, node):
+    """Last minus first value of a measurement of one node (tag node), None if missing."""
+    node_query = measurement_filter(test_name, measurement) + (
+        f'  |> filter(fn: (r) => r["node"] == "{escape_flux_string(node)}")\n'
+    )
+    first = query_values(node_query + "  |> first()")
+    last = query_values(node_query + "  |> last()")
+    if not first or not last:
+        return None
+    return last[-1] - first[0]
+
+
+def query_rates(test_name, measurement):
+    """Per-window rate of a counter summed over all series (e.g. all Locust workers)."""
+    window = f"{RATE_WINDOW_SECONDS}s"
+    return query_values(
+        measurement_filter(test_name, measurement)
+        + f"""|> aggregateWindow(every: {window}, fn: last, createEmpty: false)
+      |> derivative(unit: 1s, nonNegative: true)
+      |> group()
+      |> aggregateWindow(every: {window}, fn: sum, createEmpty: false)"""
+    )
+
+
+def load_influx(test_name):
+    """Load the throughput and per-entity metrics of a test from InfluxDB."""
+    entities = query_total(test_name, "loadtest_entities_created_total")
+    scalars = {}
+    if entities:
+        # Every node stores every entity, so the growth is per node and not summed over them
+        for node in DB_NODES:
+            db_growth = query_growth(test_name, "arkiv_sqlite_db_size_bytes", node)
+            if db_growth is not None:
+                scalars[f"db_bytes_per_entity_{node}"] = db_growth / entities
+        spend = [
+            value
+            for value in (
+                query_total(test_name, "arkiv_simulated_eth_spend_usd"),
+                query_total(test_name, "arkiv_simulated_da_spending_usd"),
+            )
+            if value is not None
+        ]
+        if spend:
+            scalars["cost_usd_per_entity"] = sum(spend) / entities
+    da_efficiency = query_total(test_name, "arkiv_da_efficiency")
+    if da_efficiency is not None:
+        scalars["da_efficiency"] = da_efficiency
+    throughput = [float(value) for value in query_rates(test_name, "loadtest_entities_created_total")]
+    return RunData(source=test_name, latencies={}, throughput=throughput, scalars=scalars)
+
+
+def load_run(source):
+    """A sample export directory / file, or a test name in InfluxDB."""
+    if os.path.exists(source):
+        return load_samples(source)
+    return load_influx(source)
+
+
+def format_number(value, percent=False):
+    if value is None:
+        return "-"
+    if percent:
+        return f"{value * 100:+.1f}%"
+    return f"{value:.4g}"
+
+
+def format_table(verdicts):
+    headers = ("metric", "stat", "baseline", "candidate", "change", "95% CI", "p", "verdict")
+    rows = [
+        (
+            v.metric,
+            v.statistic,
+            format_number(v.baseline),
+            format_number(v.candidate),
+            format_number(v.change, percent=True),
+            "-" if v.ci_low is None else f"[{format_number(v.ci_low, True)}, {format_number(v.ci_high, True)}]",
+            "-" if v.p_value is None else f"{v.p_value:.3g}",
+            v.verdict.upper() if v.verdict == REGRESSION else v.verdict,
+        )
+        for v in verdicts
+    ]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    lines = ["  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)) for row in (headers, *rows)]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare two test runs (InfluxDB test names or sample export directories) and fail on regression."
+    )
+    parser.add_argument("baseline", help="Baseline test name or SAMPLE_SINK_DIR export")
+    parser.add_argument("candidate", help="Candidate test name or SAMPLE_SINK_DIR export")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level (default: 0.05)")
+    parser.add_argument(
+        "--min-effect",
+        type=float,
+        default=0.05,
+        help="Smallest relative change of a distribution reported as a regression (default: 0.05)",
+    )
+    parser.add_argument(
+        "--scalar-threshold",
+        type=float,
+        default=0.10,
+        help="Relative change of a single-valued metric reported as a regression (default: 0.10)",
+    )
+    parser.add_argument("--bootstrap-iterations", type=int, default=2000)
+    parser.add_argument(
+        "--max-samples",
+        type=int,
+        default=5000,
+        help="Samples per run and metric used by the statistical tests (default: 5000)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the bootstrap resampling")
+    parser.add_argument("--json", help="Also write the verdicts to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = load_run(args.baseline)
+    candidate = load_run(args.candidate)
+    verdicts = compare_runs(baseline, candidate, args)
+
+    print(f"Baseline:  {baseline.source}")
+    print(f"Candidate: {candidate.source}\n")
+    print(format_table(verdicts))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(v) for v in verdicts], f, indent=2)
+
+    regressions = [v for v in verdicts if v.verdict == REGRESSION]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s)")
+        return 1
+    print("\n✅ No regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
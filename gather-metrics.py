@@ -1,10 +1,16 @@
 import asyncio
+import ctypes
+import ctypes.util
 import json
 import math
 import os
 import socket
+import struct
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from stat import S_ISDIR
 
 import requests
 from influxdb_client import Point
@@ -22,6 +28,11 @@ OP_NODE_L1_ADDRESS = os.getenv("OP_NODE_L1_ADDRESS", "").strip()
 OP_BATCHER_L1_ADDRESS = os.getenv("OP_BATCHER_L1_ADDRESS", "").strip()
 OP_PROPOSER_L1_ADDRESS = os.getenv("OP_PROPOSER_L1_ADDRESS", "").strip()
 OP_NODE_L1_START_BLOCK = max(int(os.getenv("OP_NODE_L1_START_BLOCK", "0")), 0)
+L1_SCAN_BATCH_SIZE = max(int(os.getenv("L1_SCAN_BATCH_SIZE", "100")), 1)
+L1_SCAN_CONCURRENCY = max(int(os.getenv("L1_SCAN_CONCURRENCY", "8")), 1)
+L1_SCAN_MAX_BLOCKS_PER_ITERATION = max(
+    int(os.getenv("L1_SCAN_MAX_BLOCKS_PER_ITERATION", "5000")), 1
+)
 MAX_L1_LOGGED_SENDERS = 5
 GAS_BASE_NETWORK = os.getenv(
     "GAS_BASE_NETWORK", "https://mainnet.rpc-node.dev.golem.network/"
@@ -37,6 +48,9 @@ PRICE_API_URL = os.getenv(
     "https://api.coingecko.com/api/v3/simple/price?ids=ethereum,celestia&vs_currencies=usd",
 ).strip()
 PRICE_CACHE_SECONDS = 60
+LOADTEST_METRICS_URL = os.getenv("LOADTEST_METRICS_URL", "").strip()
+LOADTEST_JOB_NAME = os.getenv("LOADTEST_JOB_NAME", "").strip()
+LOADTEST_PAYLOAD_BYTES_METRIC = "loadtest_transaction_payload_bytes_total"
 
 
 def resolve_scrape_targets():
@@ -104,6 +118,10 @@ price_metrics_state = {
     "tia_price_usd": None,
     "prices_fetched_at": None,
 }
+da_efficiency_state = {
+    "da_data_size_baseline": None,
+    "payload_bytes_baseline": None,
+}
 
 
 def get_point_measurement(point):
@@ -237,6 +255,14 @@ def get_tracked_l1_senders():
     return tracked_senders
 
 
+def get_l1_sender_components(tracked_senders):
+    sender_components = {}
+    for component, tracked_sender in tracked_senders.items():
+        sender_components.setdefault(tracked_sender, component)
+
+    return sender_components
+
+
 def get_file_size(file_path):
     try:
         return os.path.getsize(file_path)
@@ -244,24 +270,254 @@ def get_file_size(file_path):
         return 0
 
 
-async def get_path_size_async(path):
-    if not os.path.isdir(path):
-        return 0
-
-    process = await asyncio.create_subprocess_exec(
-        "du",
-        "-sb",
-        path,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await process.communicate()
-    return int(stdout.split()[0]) if process.returncode == 0 else 0
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+INOTIFY_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal non-blocking inotify wrapper (Linux, through libc with ctypes)."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+    def add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch {path} failed: {os.strerror(errno)}")
+        return wd
+
+    def remove_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """All queued events as (wd, mask, name) tuples, without blocking."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                name = data[offset : offset + name_length].rstrip(b"\0")
+                offset += name_length
+                events.append((wd, mask, os.fsdecode(name)))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectorySizeTracker:
+    """
+    Apparent size of a directory tree with `du -sb` semantics, kept up to date incrementally.
+
+    Like `du -sb` the total is the st_size of every file, directory and symlink (not
+    followed) in the tree, each hard-linked inode counted once. The tree is scanned once
+    with os.scandir; afterwards, with inotify, only the entries named in the events
+    since the previous call are stat-ed again. Without inotify (not Linux, or out of
+    watches) every call rescans the tree with os.scandir, which still saves forking du.
+    """
+
+    def __init__(self, path, use_inotify=True):
+        self.path = os.path.abspath(path)
+        self._entries = {}  # path -> (dev, ino)
+        self._children = {}  # directory path -> names of its entries
+        self._inodes = {}  # (dev, ino) -> [size, number of paths]
+        self._total = 0
+        self._wd_to_dir = {}
+        self._dir_to_wd = {}
+        self._inotify = None
+        self._watch_failed = False
+        if use_inotify:
+            try:
+                self._inotify = Inotify()
+            except OSError as e:
+                print(f"Warning: inotify unavailable for {self.path}, rescanning on every sample: {e}")
+
+    @property
+    def incremental(self):
+        return self._inotify is not None
+
+    def size(self):
+        """Current total in bytes (0 while the directory does not exist)."""
+        if self._inotify is None:
+            self._reset()
+            self._scan_root()
+            return self._total
+
+        if self.path not in self._entries:
+            self._scan_root()
+            return self._checked_total()
+
+        changed = {}
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                self._reset()
+                self._scan_root()
+                return self._total
+            if mask & IN_IGNORED:
+                continue
+            directory = self._wd_to_dir.get(wd)
+            if directory is None:
+                continue
+            if name:
+                changed[os.path.join(directory, name)] = None
+            # The directory's own size changes with its entries
+            changed[directory] = None
+        for path in changed:
+            self._refresh(path)
+        return self._checked_total()
+
+    def _checked_total(self):
+        if self._watch_failed:
+            # Out of inotify watches: untrack everything and rescan from now on
+            self._reset()
+            self.close()
+            self._scan_root()
+        return self._total
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _reset(self):
+        for wd in self._wd_to_dir:
+            self._inotify.remove_watch(wd)
+        self._entries.clear()
+        self._children.clear()
+        self._inodes.clear()
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        self._total = 0
+
+    def _scan_root(self):
+        try:
+            stat = os.lstat(self.path)
+        except OSError:
+            return
+        if not S_ISDIR(stat.st_mode):
+            return
+        self._add(self.path, stat)
+        self._scan(self.path)
+
+    def _scan(self, directory):
+        """Track a new directory and everything below it."""
+        if self._inotify is not None:
+            try:
+                wd = self._inotify.add_watch(directory)
+                self._wd_to_dir[wd] = directory
+                self._dir_to_wd[directory] = wd
+            except OSError as e:
+                if not self._watch_failed:
+                    print(f"Warning: {e}, falling back to rescanning {self.path}")
+                self._watch_failed = True
+        names = self._children.setdefault(directory, set())
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            names.add(entry.name)
+            self._add(entry.path, stat)
+            if S_ISDIR(stat.st_mode):
+                self._scan(entry.path)
+
+    def _refresh(self, path):
+        """Re-stat one entry named in an event."""
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            self._remove(path)
+            return
+        key = (stat.st_dev, stat.st_ino)
+        if self._entries.get(path) != key:
+            # New entry, or the name now points to another inode
+            self._remove(path)
+            self._children.setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+            self._add(path, stat)
+            if S_ISDIR(stat.st_mode):
+                self._scan(path)
+            return
+        inode = self._inodes[key]
+        self._total += stat.st_size - inode[0]
+        inode[0] = stat.st_size
+
+    def _add(self, path, stat):
+        key = (stat.st_dev, stat.st_ino)
+        self._entries[path] = key
+        inode = self._inodes.get(key)
+        if inode is None:
+            self._inodes[key] = [stat.st_size, 1]
+            self._total += stat.st_size
+        else:
+            inode[1] += 1
+            self._total += stat.st_size - inode[0]
+            inode[0] = stat.st_size
+
+    def _remove(self, path):
+        key = self._entries.pop(path, None)
+        if key is None:
+            return
+        for name in self._children.pop(path, ()):
+            self._remove(os.path.join(path, name))
+        wd = self._dir_to_wd.pop(path, None)
+        if wd is not None:
+            del self._wd_to_dir[wd]
+            self._inotify.remove_watch(wd)
+        parent = self._children.get(os.path.dirname(path))
+        if parent is not None:
+            parent.discard(os.path.basename(path))
+        inode = self._inodes[key]
+        inode[1] -= 1
+        if inode[1] == 0:
+            del self._inodes[key]
+            self._total -= inode[0]
 
 
 async def get_path_size_async_loop(path, metric_key, node_type=None):
+    tracker = DirectorySizeTracker(path)
     while True:
-        size = await get_path_size_async(path)
+        size = await asyncio.to_thread(tracker.size)
 
         # Update the state dictionary instead of a Prometheus Gauge
         if node_type:
@@ -269,7 +525,8 @@ async def get_path_size_async_loop(path, metric_key, node_type=None):
         else:
             metrics_state[metric_key] = size
 
-        if size < 100000000:
+        # A full rescan of a large tree is expensive, incremental updates are not
+        if tracker.incremental or size < 100000000:
             await asyncio.sleep(1)
         else:
             await asyncio.sleep(10)
@@ -342,6 +599,38 @@ def call_json_rpc(url, method, params):
     return payload.get("result")
 
 
+def call_json_rpc_batch(url, calls):
+    """Send (method, params) calls as one JSON-RPC array, results in call order."""
+    try:
+        response = requests.post(
+            url,
+            json=[
+                {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+                for request_id, (method, params) in enumerate(calls)
+            ],
+            timeout=30,
+        )
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        raise RuntimeError(f"Unable to call a batch of {len(calls)} on {url}") from exc
+
+    payload = response.json()
+    if not isinstance(payload, list):
+        raise RuntimeError(f"RPC batch of {len(calls)} rejected: {payload}")
+
+    payload_by_id = {item.get("id"): item for item in payload if isinstance(item, dict)}
+    results = []
+    for request_id, (method, _) in enumerate(calls):
+        item = payload_by_id.get(request_id)
+        if item is None:
+            raise RuntimeError(f"RPC {method} missing from the batch response")
+        if item.get("error"):
+            raise RuntimeError(f"RPC {method} failed: {item['error']}")
+        results.append(item.get("result"))
+
+    return results
+
+
 def call_json_api(url, params=None):
     try:
         response = requests.get(url, params=params, timeout=10)
@@ -376,6 +665,67 @@ def get_receipts_for_block(url, block_number, transaction_hashes):
     }
 
 
+def get_l1_blocks(url, block_numbers):
+    calls = [("eth_getBlockByNumber", [hex(block_number), True]) for block_number in block_numbers]
+    try:
+        blocks = call_json_rpc_batch(url, calls)
+    except RuntimeError as exc:
+        print(
+            f"[l1-tracker] batched eth_getBlockByNumber failed for blocks "
+            f"{block_numbers[0]}-{block_numbers[-1]}, falling back to single calls: {exc}"
+        )
+        blocks = [call_json_rpc(url, method, params) for method, params in calls]
+
+    for block_number, block in zip(block_numbers, blocks):
+        if block is None:
+            raise RuntimeError(f"L1 block {block_number} is not available")
+
+    return blocks
+
+
+def scan_l1_block_range(url, block_numbers, sender_components):
+    """Fetch blocks and the receipts of their tracked transactions (runs in the scan pool)."""
+    scanned_blocks = []
+    for block_number, block in zip(block_numbers, get_l1_blocks(url, block_numbers)):
+        transactions = block.get("transactions", [])
+        matching_transactions, seen_senders = find_matching_l1_transactions(
+            transactions, sender_components
+        )
+        receipts_by_hash = {}
+        if matching_transactions:
+            receipts_by_hash = get_receipts_for_block(
+                url,
+                block_number,
+                [transaction["hash"] for _, _, transaction in matching_transactions],
+            )
+        scanned_blocks.append(
+            (block_number, transactions, matching_transactions, seen_senders, receipts_by_hash)
+        )
+
+    return scanned_blocks
+
+
+def scan_l1_blocks(url, first_block, last_block, sender_components):
+    """Yield scanned blocks in order; batches of L1_SCAN_BATCH_SIZE blocks are fetched
+    L1_SCAN_CONCURRENCY at a time."""
+    batches = [
+        range(batch_start, min(batch_start + L1_SCAN_BATCH_SIZE, last_block + 1))
+        for batch_start in range(first_block, last_block + 1, L1_SCAN_BATCH_SIZE)
+    ]
+    if not batches:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(L1_SCAN_CONCURRENCY, len(batches)))
+    try:
+        for scanned_blocks in executor.map(
+            lambda batch: scan_l1_block_range(url, list(batch), sender_components),
+            batches,
+        ):
+            yield from scanned_blocks
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def get_next_l1_block_to_scan():
     last_scanned_block = l1_tx_metrics_state["last_scanned_block"]
     if last_scanned_block is None:
@@ -384,7 +734,7 @@ def get_next_l1_block_to_scan():
     return last_scanned_block + 1
 
 
-def find_matching_l1_transactions(transactions, tracked_senders):
+def find_matching_l1_transactions(transactions, sender_components):
     matching_transactions = []
     seen_senders = []
     seen_sender_set = set()
@@ -399,17 +749,9 @@ def find_matching_l1_transactions(transactions, tracked_senders):
             seen_sender_set.add(sender)
             seen_senders.append(sender)
 
-        match = next(
-            (
-                (tracked_component, tracked_sender)
-                for tracked_component, tracked_sender in tracked_senders.items()
-                if sender == tracked_sender
-            ),
-            None,
-        )
-        if match:
-            component, tracked_sender = match
-            matching_transactions.append((component, tracked_sender, transaction))
+        component = sender_components.get(sender) if sender else None
+        if component:
+            matching_transactions.append((component, sender, transaction))
 
     return matching_transactions, seen_senders
 
@@ -618,6 +960,50 @@ def collect_celenium_gas_metrics_sync():
     return points
 
 
+def fetch_loadtest_payload_bytes(url):
+    try:
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        raise RuntimeError(f"Unable to fetch load test metrics from {url}") from exc
+
+    total = None
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name != LOADTEST_PAYLOAD_BYTES_METRIC:
+                continue
+            if LOADTEST_JOB_NAME and sample.labels.get("job") != LOADTEST_JOB_NAME:
+                continue
+            total = (total or 0.0) + float(sample.value)
+    return total
+
+
+def collect_da_efficiency_points_sync():
+    if not LOADTEST_METRICS_URL:
+        return []
+
+    payload_bytes = fetch_loadtest_payload_bytes(LOADTEST_METRICS_URL)
+    if payload_bytes is None:
+        return []
+
+    current_da_data_size = int(metrics_state.get("arkiv_da_data_size", 0))
+    payload_baseline = da_efficiency_state.get("payload_bytes_baseline")
+    # Start (or restart after the load test counters were reset) from the current values
+    if payload_baseline is None or payload_bytes < payload_baseline:
+        da_efficiency_state["payload_bytes_baseline"] = payload_bytes
+        da_efficiency_state["da_data_size_baseline"] = current_da_data_size
+        payload_baseline = payload_bytes
+
+    points = [create_point("arkiv_loadtest_payload_bytes", payload_bytes)]
+
+    payload_diff = payload_bytes - payload_baseline
+    if payload_diff > 0:
+        da_diff = current_da_data_size - da_efficiency_state["da_data_size_baseline"]
+        points.append(create_point("arkiv_da_efficiency", da_diff / payload_diff))
+
+    return points
+
+
 async def collect_celestia_balance_points():
     if not CELESTIA_ADDRESS or not CELESTIA_RPC_ADDR:
         return []
@@ -716,6 +1102,8 @@ def collect_l1_sender_points_sync():
 
     latest_block = hex_to_int(call_json_rpc(OP_NODE_L1_RPC_URL, "eth_blockNumber", []))
     next_block = get_next_l1_block_to_scan()
+    last_block = min(latest_block, next_block + L1_SCAN_MAX_BLOCKS_PER_ITERATION - 1)
+    sender_components = get_l1_sender_components(tracked_senders)
     new_points = []
     gas_price_wei = None
     tracked_sender_summary = ", ".join(
@@ -725,18 +1113,14 @@ def collect_l1_sender_points_sync():
     scanned_blocks = 0
     matched_transactions_total = 0
 
-    for block_number in range(next_block, latest_block + 1):
-        block = call_json_rpc(
-            OP_NODE_L1_RPC_URL,
-            "eth_getBlockByNumber",
-            [hex(block_number), True],
-        )
+    for (
+        block_number,
+        transactions,
+        matching_transactions,
+        seen_senders,
+        receipts_by_hash,
+    ) in scan_l1_blocks(OP_NODE_L1_RPC_URL, next_block, last_block, sender_components):
         scanned_blocks += 1
-        transactions = block.get("transactions", [])
-        matching_transactions, seen_senders = find_matching_l1_transactions(
-            transactions, tracked_senders
-        )
-
         if matching_transactions:
             matched_transactions_total += len(matching_transactions)
             print(
@@ -754,14 +1138,6 @@ def collect_l1_sender_points_sync():
                 f"seen_from={format_seen_senders(seen_senders)}"
             )
 
-        receipts_by_hash = {}
-        if matching_transactions:
-            receipts_by_hash = get_receipts_for_block(
-                OP_NODE_L1_RPC_URL,
-                block_number,
-                [transaction["hash"] for _, _, transaction in matching_transactions],
-            )
-
         for component, tracked_sender, transaction in matching_transactions:
             receipt = receipts_by_hash.get(transaction["hash"], {})
             gas_used = hex_to_int(receipt.get("gasUsed"))
@@ -799,10 +1175,15 @@ def collect_l1_sender_points_sync():
             for component in sorted(tracked_senders)
         )
         print(
-            f"[l1-tracker] scanned {scanned_blocks} block(s) from {next_block} to {latest_block}; "
+            f"[l1-tracker] scanned {scanned_blocks} block(s) from {next_block} to {last_block}; "
             f"matched {matched_transactions_total} tracked transaction(s). "
             f"tracked={tracked_sender_summary}; totals={cumulative_totals_summary}"
         )
+        if last_block < latest_block:
+            print(
+                f"[l1-tracker] catching up: {latest_block - last_block} block(s) behind "
+                f"L1 head {latest_block}, continuing next iteration"
+            )
 
     new_points.extend(build_l1_sender_total_points(tracked_senders))
 
@@ -922,6 +1303,13 @@ async def run_infinite_loop():
                 except Exception as exc:
                     print(f"Failed to collect Celenium gas metrics: {exc}")
 
+                try:
+                    points.extend(
+                        await asyncio.to_thread(collect_da_efficiency_points_sync)
+                    )
+                except Exception as exc:
+                    print(f"Failed to collect DA efficiency metrics: {exc}")
+
                 try:
                     l1_points = await collect_l1_sender_points()
                     points.extend(l1_points)
@@ -111,12 +111,38 @@ def collect_l1_result_metrics(test_name):
     return result_metrics
 
 
+def collect_load_generator_result_metrics(test_name):
+    """Flag runs where a load generator process was CPU saturated (see stress/tools/self_monitor.py)."""
+    try:
+        saturated_seconds = query_last_metric_total(test_name, "loadtest_generator_saturated_seconds_total")
+    except RuntimeError as exc:
+        print(f"Warning: unable to fetch load generator metrics from InfluxDB: {exc}")
+        return {}
+
+    if saturated_seconds is None:
+        return {}
+
+    saturated_seconds = int(saturated_seconds)
+    if saturated_seconds > 0:
+        print(
+            f"Warning: load generator was CPU saturated for {saturated_seconds}s, "
+            "results may be limited by the load generator rather than the node"
+        )
+    return {
+        "loadGeneratorSaturatedSeconds": {
+            "value": saturated_seconds,
+            "display": f"saturated {saturated_seconds}s" if saturated_seconds > 0 else "ok",
+        }
+    }
+
+
 def push_results(backend_url, test_name, results_file, seconds):
     """Read a flat results JSON file and POST it wrapped in {parameters: ...}."""
     with open(results_file, "r", encoding="utf-8") as f:
         data = json.load(f)
 
     data.update(collect_l1_result_metrics(test_name))
+    data.update(collect_load_generator_result_metrics(test_name))
 
     url = f"{backend_url}/test/{test_name}/results"
     payload = {"parameters": data, "seconds": seconds}
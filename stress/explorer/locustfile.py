@@ -26,33 +26,6 @@ logging.info(f"Using mnemonic: {config.mnemonic}, users: {config.users}")
 
 class L3ExplorerUser(BaseUser):
     wait_time = between(2, 6)
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.id = 0
-        
-        logging.config.dictConfig({
-            "version": 1,
-            "formatters": {
-                "default": {
-                    "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-                }
-            },
-            "handlers": {
-                "console": {
-                    "class": "logging.StreamHandler",
-                    "formatter": "default"
-                },
-                "file": {
-                    "class": "logging.FileHandler",
-                    "formatter": "default",
-                    "filename": "locust.log"
-                }
-            },
-            "root": {
-                "handlers": ["console", "file"],
-                "level": config.log_level
-            }
-        })
 
     #@task
     def explore_blocks(self):
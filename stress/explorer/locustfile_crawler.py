@@ -0,0 +1,47 @@
+import logging
+import random
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path so we can import stress module
+# This file is at: stress-tests/stress/explorer/locustfile_crawler.py
+# We need to add stress-tests/ to the path
+file_dir = Path(__file__).resolve().parent
+project_root = file_dir.parent.parent  # Go up from explorer/ to stress/ to stress-tests/
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from locust import task, between
+
+from stress.tools.base_user import BaseUser
+from stress.tools.explorer_frontier import CrawlFrontier
+
+
+class ExplorerCrawlerUser(BaseUser):
+    """
+    Browses the explorer like its visitors: opens blocks, transactions, addresses and
+    entities discovered by earlier responses (popular ones more often) and follows
+    pagination cursors into deep pages. See stress/tools/explorer_frontier.py.
+    """
+
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        super().on_start()
+        self.rng = random.Random()
+
+    @task
+    def crawl(self):
+        frontier = CrawlFrontier.get_frontier()
+        request = frontier.next_request(self.rng)
+        response = self.client.get(request.url, name=request.name)
+        if not response.ok:
+            logging.warning("Failed to retrieve %s: %s", request.url, response.status_code)
+            return
+        try:
+            body = response.json()
+        except ValueError as e:
+            logging.warning("Invalid JSON from %s: %s", request.url, e)
+            return
+        found = frontier.record(request, body)
+        logging.debug("Crawled %s (page %s): %s items", request.url, request.depth, found)
@@ -51,6 +51,7 @@ if str(project_root) not in sys.path:
 
 import stress.tools.config as config
 from stress.tools.json_rpc_user import JsonRpcUser
+from stress.tools.tx_phases import tx_span
 from stress.tools.utils import build_account_path
 
 # Add parent directory to path (kept for backwards compat)
@@ -318,7 +319,8 @@ class DataCenterReadWriteUser(JsonRpcUser):
         start = time.perf_counter()
         exc: Optional[BaseException] = None
         try:
-            return fn()
+            with tx_span(name):
+                return fn()
         except BaseException as e:
             exc = e
             raise
@@ -337,8 +339,8 @@ class DataCenterReadWriteUser(JsonRpcUser):
         msg = str(e).lower()
         return ("not found" in msg) or ("404" in msg) or ("missing" in msg) or ("does not exist" in msg)
 
-    def _query_count(self, query: str, limit: Optional[int] = None) -> int:
-        w3 = self._initialize_account_and_w3()
+    def _query_count(self, query: str, limit: Optional[int] = None, w3: Optional[Arkiv] = None) -> int:
+        w3 = w3 or self._initialize_account_and_w3()
         it = w3.arkiv.query_entities(
             query=query,
             options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
@@ -440,6 +442,7 @@ class DataCenterReadWriteUser(JsonRpcUser):
 
         w3 = self._initialize_account_and_w3()
         operations = Operations(creates=create_ops)
+        self.wait_for_write_slot()
         nonce = w3.eth.get_transaction_count(self.account.address)
         self._fire_locust_request(
             "write_node_with_workloads", lambda: custom_execute(w3, operations, TxParams(nonce=nonce))
@@ -477,7 +480,10 @@ class DataCenterReadWriteUser(JsonRpcUser):
 
         query = f'{id_key}="{entity_id}"'
         try:
-            count = self._fire_locust_request("point_by_id", lambda: self._query_count(query))
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                count = self._fire_locust_request(
+                    endpoint.request_name("point_by_id"), lambda: self._query_count(query, w3=endpoint.w3)
+                )
             debug_log(f"[DEBUG] point_by_id: SUCCESS - found {count} entities for {id_key}={entity_id}")
         except Exception as e:
             debug_log(f"[DEBUG] point_by_id: FAILED - error={e}, entity_id={entity_id}")
@@ -496,9 +502,11 @@ class DataCenterReadWriteUser(JsonRpcUser):
         
         debug_log(f"[DEBUG] point_by_key: querying entity_key={entity_key[:20]}...")
 
-        w3 = self._initialize_account_and_w3()
         try:
-            entity = self._fire_locust_request("point_by_key", lambda: w3.arkiv.get_entity(entity_key))
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                entity = self._fire_locust_request(
+                    endpoint.request_name("point_by_key"), lambda: endpoint.w3.arkiv.get_entity(entity_key)
+                )
             key = getattr(entity, "key", "unknown")
             debug_log(f"[DEBUG] point_by_key: SUCCESS - found entity key={str(key)[:20]}...")
         except Exception as e:
@@ -514,9 +522,11 @@ class DataCenterReadWriteUser(JsonRpcUser):
         nonexistent_key = "0x0000000000000000000000000000000000000000000000000000000000000001"
         debug_log(f"[DEBUG] point_miss: querying non-existent entity_key={nonexistent_key[:20]}...")
         
-        w3 = self._initialize_account_and_w3()
         try:
-            _ = self._fire_locust_request("point_miss", lambda: w3.arkiv.get_entity(nonexistent_key))
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                _ = self._fire_locust_request(
+                    endpoint.request_name("point_miss"), lambda: endpoint.w3.arkiv.get_entity(nonexistent_key)
+                )
             debug_log(f"[DEBUG] point_miss: FAILED - unexpectedly found key={nonexistent_key[:20]}...")
             raise RuntimeError("Expected entity to be missing, but it existed")
         except Exception as e:
@@ -547,9 +557,11 @@ class DataCenterReadWriteUser(JsonRpcUser):
             f" && cpu_count>={min_cpu} && ram_gb>={min_ram}"
         )
         try:
-            count = self._fire_locust_request(
-                "node_filter", lambda: self._query_count(query_str, limit=DEFAULT_NODE_LIMIT)
-            )
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                count = self._fire_locust_request(
+                    endpoint.request_name("node_filter"),
+                    lambda: self._query_count(query_str, limit=DEFAULT_NODE_LIMIT, w3=endpoint.w3),
+                )
             debug_log(f"[DEBUG] node_filter: SUCCESS - found {count} nodes")
         except Exception as e:
             debug_log(f"[DEBUG] node_filter: FAILED - error={e}")
@@ -562,10 +574,11 @@ class DataCenterReadWriteUser(JsonRpcUser):
 
         query_str = 'status="pending" && type="workload"'
         try:
-            count = self._fire_locust_request(
-                "workload_simple",
-                lambda: self._query_count(query_str, limit=DEFAULT_WORKLOAD_LIMIT),
-            )
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                count = self._fire_locust_request(
+                    endpoint.request_name("workload_simple"),
+                    lambda: self._query_count(query_str, limit=DEFAULT_WORKLOAD_LIMIT, w3=endpoint.w3),
+                )
             debug_log(f"[DEBUG] workload_simple: SUCCESS - found {count} workloads")
         except Exception as e:
             debug_log(f"[DEBUG] workload_simple: FAILED - error={e}")
@@ -586,10 +599,11 @@ class DataCenterReadWriteUser(JsonRpcUser):
             f'status="pending" && type="workload" && region="{region}" && vm_type="{vm_type}"'
         )
         try:
-            count = self._fire_locust_request(
-                "workload_specific",
-                lambda: self._query_count(query_str, limit=DEFAULT_WORKLOAD_LIMIT),
-            )
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                count = self._fire_locust_request(
+                    endpoint.request_name("workload_specific"),
+                    lambda: self._query_count(query_str, limit=DEFAULT_WORKLOAD_LIMIT, w3=endpoint.w3),
+                )
             debug_log(f"[DEBUG] workload_specific: SUCCESS - found {count} workloads")
         except Exception as e:
             debug_log(f"[DEBUG] workload_specific: FAILED - error={e}")
@@ -14,26 +14,38 @@ This test has 4 task types with relative frequency (lowest -> highest):
 Each Locust user keeps an in-memory pool (ring buffer) of entities:
   - up to 1000 nodes
   - up to 5000 workloads
+The pools hold metadata only (keys, attributes and a payload seed); payloads are
+regenerated from the seed when an entity is updated. Workloads are indexed by status,
+so update_workload picks from UPDATABLE_WORKLOAD_STATUSES in O(1).
+
+Batching (coalescing mode):
+By default every task sends its own single-entity transaction. With DC_BATCH_MAX_OPS > 1
+creates and updates are queued and submitted together as one
+Operations(creates=..., updates=...) transaction once DC_BATCH_MAX_OPS operations are
+pending or the oldest pending operation is older than DC_BATCH_WINDOW_SECONDS (checked
+on every task, so the effective resolution is the task wait time). Each logical
+operation is reported under its own name with the latency from enqueue to receipt;
+the transaction itself is reported as "execute_batch" (response length = ops in batch).
 
 Usage:
     locust -f locust/dc_write_and_update.py --host=http://localhost:3000
 """
 
+import logging
 import os
 import random
 import sys
 import time
-from dataclasses import replace
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import web3
 from arkiv import Arkiv
-from arkiv.account import NamedAccount
+from arkiv.types import Operations, UpdateOp
+from arkiv.utils import to_create_op
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from locust import constant, events, task
-from web3 import Web3
 
 # Add the project root (stress-tests/) to Python path so we can import stress.*
 file_dir = Path(__file__).resolve().parent
@@ -41,9 +53,11 @@ project_root = file_dir.parent.parent  # l3/ -> stress/ -> stress-tests/
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-import stress.tools.config as config
+from stress.tools.dc_pool import StatusIndexedPool
 from stress.tools.json_rpc_user import JsonRpcUser
-from stress.tools.utils import build_account_path
+from stress.tools.sample_sink import sample_context
+from stress.tools.trace import OP_CREATE, OP_UPDATE, record_operation
+from stress.tools.tx_phases import tx_span
 
 # Add parent directory to path for backwards-compat imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -55,6 +69,7 @@ from stress.tools.dc_data import (
     WorkloadEntity,
     create_node,
     create_workload,
+    entity_payload,
 )
 
 Account.enable_unaudited_hdwallet_features()
@@ -72,6 +87,9 @@ DEFAULT_DC_NUM = int(os.getenv("DC_NUM", "1"))
 NODE_POOL_SIZE = int(os.getenv("DC_NODE_POOL_SIZE", "1000"))
 WORKLOAD_POOL_SIZE = int(os.getenv("DC_WORKLOAD_POOL_SIZE", "5000"))
 
+# Completed workloads are final and no longer updated
+UPDATABLE_WORKLOAD_STATUSES = ("running", "pending")
+
 # Payload size is randomized per user, but bounded by these env vars
 PAYLOAD_SIZE_MIN = int(os.getenv("DC_PAYLOAD_SIZE_MIN", "5000"))
 PAYLOAD_SIZE_MAX = int(os.getenv("DC_PAYLOAD_SIZE_MAX", "15000"))
@@ -82,6 +100,10 @@ W_UPDATE_NODE = int(os.getenv("DC_W_UPDATE_NODE", "3"))
 W_ADD_WORKLOAD = int(os.getenv("DC_W_ADD_WORKLOAD", "10"))
 W_UPDATE_WORKLOAD = int(os.getenv("DC_W_UPDATE_WORKLOAD", "20"))
 
+# Coalescing mode: DC_BATCH_MAX_OPS=1 sends one transaction per operation (no batching)
+BATCH_MAX_OPS = max(1, int(os.getenv("DC_BATCH_MAX_OPS", "1")))
+BATCH_WINDOW_SECONDS = float(os.getenv("DC_BATCH_WINDOW_SECONDS", "0"))
+
 DEFAULT_BLOCK_DURATION_SECONDS = 2
 
 
@@ -143,6 +165,23 @@ def workload_to_arkiv_attributes(
     return {**string_annotations, **numeric_annotations}
 
 
+@dataclass
+class PendingOp:
+    """A create or update waiting to be submitted in the next batch.
+
+    The entity goes into its pool only once the batch has been executed, so the pools
+    never hold keys that did not reach the chain.
+    """
+
+    name: str
+    op: Any
+    is_update: bool
+    enqueued_at: float
+    trace: Dict[str, Any]
+    pool: StatusIndexedPool
+    entity: Any
+
+
 # =============================================================================
 # Locust User
 # =============================================================================
@@ -166,10 +205,8 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
     node_counter: int
     workload_counter: int
 
-    nodes: List[NodeEntity]
-    workloads: List[WorkloadEntity]
-    node_ring_idx: int
-    workload_ring_idx: int
+    nodes: StatusIndexedPool[NodeEntity]
+    workloads: StatusIndexedPool[WorkloadEntity]
 
     rng: random.Random
 
@@ -177,6 +214,8 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
     w3: Optional[Arkiv]
     block_duration_seconds: int
 
+    pending_ops: List[PendingOp]
+
     def on_start(self) -> None:
         super().on_start()
         # Keep consistent with other dc_* tests: stable per-user seed from BaseUser id
@@ -193,31 +232,33 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
         self.node_counter = 0
         self.workload_counter = 0
 
-        self.nodes = []
-        self.workloads = []
-        self.node_ring_idx = 0
-        self.workload_ring_idx = 0
+        self.nodes = StatusIndexedPool(NODE_POOL_SIZE)
+        self.workloads = StatusIndexedPool(WORKLOAD_POOL_SIZE)
 
         self.account = None
         self.w3 = None
         self.block_duration_seconds = DEFAULT_BLOCK_DURATION_SECONDS
+        self.pending_ops = []
         self._initialize_account_and_w3()
 
+    def on_stop(self) -> None:
+        # Submit whatever is still queued so no logical operation is lost
+        if self.pending_ops:
+            pending = len(self.pending_ops)
+            try:
+                self._flush_batch()
+            except Exception:
+                logging.error(
+                    "Could not flush %s pending operation(s) on stop (user: %s)",
+                    pending,
+                    self.id,
+                    exc_info=True,
+                )
+        super().on_stop()
+
     def _initialize_account_and_w3(self) -> Arkiv:
         if self.account is None or self.w3 is None:
-            account_path = build_account_path(self.id)
-            self.account = Account.from_mnemonic(config.mnemonic, account_path=account_path)
-
-            self.w3 = Arkiv(
-                web3.HTTPProvider(endpoint_uri=self.client.base_url, session=self.client),
-                NamedAccount(name="LocalSigner", account=self.account),
-            )
-            if not self.w3.is_connected():
-                raise RuntimeError(f"Not connected to Arkiv RPC at {self.client.base_url}")
-
-            if config.chain_env == "local":
-                self._topup_local_account()
-
+            super()._initialize_account_and_w3()
             try:
                 block_timing = self.w3.arkiv.get_block_timing()
                 self.block_duration_seconds = int(
@@ -228,70 +269,105 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
 
         return self.w3
 
-    def _topup_local_account(self) -> None:
-        """Top up local account with ETH from the first dev account."""
-        if self.w3 is None or self.account is None:
-            return
-        try:
-            accounts = self.w3.eth.accounts
-            balance = Web3.from_wei(self.w3.eth.get_balance(self.account.address), "ether")
-            if balance < 0.1:
-                tx_hash = self.w3.eth.send_transaction(
-                    {"from": accounts[0], "to": self.account.address, "value": Web3.to_wei(10, "ether")}
-                )
-                self.w3.eth.wait_for_transaction_receipt(tx_hash)
-        except Exception:
-            return
-
     def _expires_in_seconds_from_blocks(self, ttl_blocks: int) -> int:
         return max(1, int(ttl_blocks) * int(self.block_duration_seconds))
 
-    def _fire_locust_request(self, name: str, fn) -> Any:
+    # -------------------------------------------------------------------------
+    # Batching helpers
+    # -------------------------------------------------------------------------
+
+    def _batching_enabled(self) -> bool:
+        return BATCH_MAX_OPS > 1
+
+    def _enqueue(
+        self,
+        name: str,
+        op: Any,
+        is_update: bool,
+        trace: Dict[str, Any],
+        pool: StatusIndexedPool,
+        entity: Any,
+    ) -> None:
+        self.pending_ops.append(
+            PendingOp(
+                name=name,
+                op=op,
+                is_update=is_update,
+                enqueued_at=time.perf_counter(),
+                trace=trace,
+                pool=pool,
+                entity=entity,
+            )
+        )
+        self._maybe_flush_batch()
+
+    def _maybe_flush_batch(self) -> None:
+        if not self.pending_ops:
+            return
+        if len(self.pending_ops) >= BATCH_MAX_OPS:
+            self._flush_batch()
+            return
+        oldest_age = time.perf_counter() - self.pending_ops[0].enqueued_at
+        if BATCH_WINDOW_SECONDS > 0 and oldest_age >= BATCH_WINDOW_SECONDS:
+            self._flush_batch()
+
+    def _flush_batch(self) -> None:
+        """Submit all pending operations as one transaction and attribute latency to each of them."""
+        pending, self.pending_ops = self.pending_ops, []
+        operations = Operations(
+            creates=[p.op for p in pending if not p.is_update],
+            updates=[p.op for p in pending if p.is_update],
+        )
+        w3 = self._initialize_account_and_w3()
+        self.wait_for_write_slot()
+
         start = time.perf_counter()
         exc: Optional[BaseException] = None
+        receipt = None
         try:
-            return fn()
+            with tx_span("execute_batch"):
+                receipt = w3.arkiv.execute(operations)
         except BaseException as e:
             exc = e
             raise
         finally:
+            finished = time.perf_counter()
             events.request.fire(
                 request_type="arkiv",
-                name=name,
-                response_time=(time.perf_counter() - start) * 1000,
-                response_length=0,
+                name="execute_batch",
+                response_time=(finished - start) * 1000,
+                response_length=len(pending),
                 exception=exc,
-                context={},
+                context=sample_context(len(pending), receipt),
                 response=None,
             )
+            for p in pending:
+                events.request.fire(
+                    request_type="arkiv",
+                    name=p.name,
+                    response_time=(finished - p.enqueued_at) * 1000,
+                    response_length=0,
+                    exception=exc,
+                    context=sample_context(1, receipt),
+                    response=None,
+                )
+                record_operation(
+                    self.id, name=p.name, started_at=p.enqueued_at, exception=exc, **p.trace
+                )
+
+        # Only reached when the batch was executed
+        for p in pending:
+            p.pool.put(p.entity)
 
     # -------------------------------------------------------------------------
     # Pool helpers
     # -------------------------------------------------------------------------
 
-    def _pool_put_node(self, node: NodeEntity) -> None:
-        if len(self.nodes) < NODE_POOL_SIZE:
-            self.nodes.append(node)
-            return
-        self.nodes[self.node_ring_idx] = node
-        self.node_ring_idx = (self.node_ring_idx + 1) % NODE_POOL_SIZE
-
-    def _pool_put_workload(self, workload: WorkloadEntity) -> None:
-        if len(self.workloads) < WORKLOAD_POOL_SIZE:
-            self.workloads.append(workload)
-            return
-        self.workloads[self.workload_ring_idx] = workload
-        self.workload_ring_idx = (self.workload_ring_idx + 1) % WORKLOAD_POOL_SIZE
-
     def _pick_node(self) -> Optional[NodeEntity]:
-        if not self.nodes:
-            return None
-        return self.rng.choice(self.nodes)
+        return self.nodes.pick(self.rng)
 
     def _pick_workload(self) -> Optional[WorkloadEntity]:
-        if not self.workloads:
-            return None
-        return self.rng.choice(self.workloads)
+        return self.workloads.pick(self.rng, UPDATABLE_WORKLOAD_STATUSES)
 
     # -------------------------------------------------------------------------
     # Domain helpers (status/assignment changes)
@@ -326,10 +402,36 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
     # Core operations (Arkiv SDK)
     # -------------------------------------------------------------------------
 
-    def _create_entity(self, payload: bytes, attributes: Dict[str, Any], name: str) -> None:
+    def _create_entity(
+        self,
+        payload: bytes,
+        attributes: Dict[str, Any],
+        name: str,
+        pool: StatusIndexedPool,
+        entity: Any,
+    ) -> None:
+        """Create the entity and put it into the pool once it is on chain."""
         ttl_blocks = self.rng.randint(100, 1000)
         expires_in = self._expires_in_seconds_from_blocks(ttl_blocks)
         w3 = self._initialize_account_and_w3()
+        trace = dict(
+            op=OP_CREATE,
+            payload_size=len(payload),
+            entity_count=1,
+            content_type="application/octet-stream",
+            attributes=[attributes],
+            expires_in=expires_in,
+        )
+        if self._batching_enabled():
+            create_op = to_create_op(
+                payload=payload,
+                content_type="application/octet-stream",
+                attributes=attributes,
+                expires_in=expires_in,
+            )
+            self._enqueue(name, create_op, is_update=False, trace=trace, pool=pool, entity=entity)
+            return
+        self.wait_for_write_slot()
         self._fire_locust_request(
             name,
             lambda: w3.arkiv.create_entity(
@@ -338,14 +440,43 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
                 attributes=attributes,
                 expires_in=expires_in,
             ),
+            trace=trace,
+            entity_count=1,
         )
+        pool.put(entity)
 
     def _update_entity(
-        self, entity_key: str, payload: bytes, attributes: Dict[str, Any], name: str
+        self,
+        entity_key: str,
+        payload: bytes,
+        attributes: Dict[str, Any],
+        name: str,
+        pool: StatusIndexedPool,
+        entity: Any,
     ) -> None:
+        """Update the entity and store the new version in the pool once it is on chain."""
         ttl_blocks = self.rng.randint(100, 1000)
         expires_in = self._expires_in_seconds_from_blocks(ttl_blocks)
         w3 = self._initialize_account_and_w3()
+        trace = dict(
+            op=OP_UPDATE,
+            payload_size=len(payload),
+            entity_count=1,
+            key=entity_key,
+            attributes=attributes,
+            expires_in=expires_in,
+        )
+        if self._batching_enabled():
+            update_op = UpdateOp(
+                key=entity_key,
+                content_type="application/octet-stream",
+                payload=payload,
+                attributes=attributes,
+                expires_in=expires_in,
+            )
+            self._enqueue(name, update_op, is_update=True, trace=trace, pool=pool, entity=entity)
+            return
+        self.wait_for_write_slot()
         self._fire_locust_request(
             name,
             lambda: w3.arkiv.update_entity(
@@ -354,7 +485,10 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
                 attributes=attributes,
                 expires_in=expires_in,
             ),
+            trace=trace,
+            entity_count=1,
         )
+        pool.put(entity)
 
     # -------------------------------------------------------------------------
     # Tasks (frequency: add_node < update_node < add_workload < update_workload)
@@ -373,14 +507,16 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
             block=self.current_block,
             seed=self.seed,
             status="available",
+            with_payload=False,
         )
 
         self._create_entity(
-            payload=node.payload,
+            payload=entity_payload(node, self.payload_size),
             attributes=node_to_arkiv_attributes(node, self.creator_address),
             name="add_node",
+            pool=self.nodes,
+            entity=node,
         )
-        self._pool_put_node(node)
 
     @task(W_UPDATE_NODE)
     def update_node(self) -> None:
@@ -397,18 +533,14 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
         key_hex = "0x" + updated.entity_key.hex()
         self._update_entity(
             key_hex,
-            payload=updated.payload,
+            payload=entity_payload(updated, self.payload_size),
             attributes=node_to_arkiv_attributes(updated, self.creator_address),
             name="update_node",
+            # The latest version replaces the pool entry with the same key
+            pool=self.nodes,
+            entity=updated,
         )
 
-        # Persist the latest version in the pool (by replacement in-place)
-        try:
-            idx = self.nodes.index(node)
-            self.nodes[idx] = updated
-        except ValueError:
-            self._pool_put_node(updated)
-
     @task(W_ADD_WORKLOAD)
     def add_workload(self) -> None:
         if not self.nodes:
@@ -429,14 +561,16 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
             seed=self.seed,
             status="running",
             assigned_node=assigned_node_id,
+            with_payload=False,
         )
 
         self._create_entity(
-            payload=workload.payload,
+            payload=entity_payload(workload, self.payload_size),
             attributes=workload_to_arkiv_attributes(workload, self.creator_address),
             name="add_workload",
+            pool=self.workloads,
+            entity=workload,
         )
-        self._pool_put_workload(workload)
 
     @task(W_UPDATE_WORKLOAD)
     def update_workload(self) -> None:
@@ -463,16 +597,12 @@ class DataCenterWriteAndUpdateUser(JsonRpcUser):
         key_hex = "0x" + updated.entity_key.hex()
         self._update_entity(
             key_hex,
-            payload=updated.payload,
+            payload=entity_payload(updated, self.payload_size),
             attributes=workload_to_arkiv_attributes(updated, self.creator_address),
             name="update_workload",
+            # The latest version replaces the pool entry with the same key
+            pool=self.workloads,
+            entity=updated,
         )
 
-        # Persist the latest version in the pool (by replacement in-place)
-        try:
-            idx = self.workloads.index(workload)
-            self.workloads[idx] = updated
-        except ValueError:
-            self._pool_put_workload(updated)
-
 
@@ -35,6 +35,7 @@ if str(project_root) not in sys.path:
 
 import stress.tools.config as config
 from stress.tools.json_rpc_user import JsonRpcUser
+from stress.tools.tx_phases import tx_span
 from stress.tools.utils import build_account_path
 
 # Add parent directory to path to import from src.db.append_dc_data (kept for backwards compat)
@@ -210,7 +211,8 @@ class DataCenterUser(JsonRpcUser):
         start = time.perf_counter()
         exc: Optional[BaseException] = None
         try:
-            return fn()
+            with tx_span(name):
+                return fn()
         except BaseException as e:
             exc = e
             raise
@@ -297,10 +299,11 @@ class DataCenterUser(JsonRpcUser):
 
         w3 = self._initialize_account_and_w3()
         operations = Operations(creates=create_ops)
+        self.wait_for_write_slot()
         nonce = w3.eth.get_transaction_count(self.account.address)
-        logging.info(f"Sending tx by user {self.id} with nonce: {nonce}, address: {self.account.address}")
+        logging.debug("Sending tx by user %s with nonce: %s, address: %s", self.id, nonce, self.account.address)
         self._fire_locust_request("write_node_with_workloads", lambda: custom_execute(w3, operations, TxParams(nonce=nonce)))
-        logging.info(f"Tx sent by user {self.id} with nonce: {nonce}, address: {self.account.address}")
+        logging.debug("Tx sent by user %s with nonce: %s, address: %s", self.id, nonce, self.account.address)
 
 
 def custom_execute(w3: Arkiv, operations: Operations, tx_params: TxParams) -> Any:
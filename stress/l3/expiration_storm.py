@@ -0,0 +1,493 @@
+"""
+Expiration-storm benchmark: housekeeping cost of many entities expiring at once.
+
+Users write STORM_ENTITY_COUNT entities (STORM_BATCH_SIZE per transaction) whose
+expiration is aimed at chosen blocks:
+
+  - STORM_MODE=cohort  every entity expires in the same block, STORM_LEAD_BLOCKS after
+                       the head at test start
+  - STORM_MODE=rate    STORM_RATE_PER_BLOCK entities expire in every block starting
+                       STORM_LEAD_BLOCKS after the head at test start
+
+The plan is made once, on the master (or the local runner): after STORM_BASELINE_BLOCKS
+blocks observed without load the first target block is set STORM_LEAD_BLOCKS after the
+head, and the entities are split in contiguous ranges over the connected workers (sent
+as "storm_plan" messages). Users wait for the plan before writing; workers report the
+written entities back to the master ("storm_written"). Workers that join later get no
+share of the storm.
+
+A monitor thread on the master follows the chain from the start until STORM_WINDOW_BLOCKS
+after the last targeted block and records for every block: its arrival time and interval, the
+head lag (arrival time - block timestamp), eth_blockNumber latency seen while the block
+was head, and the node Prometheus metrics matching STORM_NODE_METRICS (block
+processing / persistence timings) scraped from STORM_NODE_METRICS_URL. The per-block
+table, the expiration blocks actually hit and a baseline vs storm summary are written
+to STORM_REPORT_FILE, after which the run stops. The baseline summary covers the blocks
+before the plan was made, i.e. before any storm entity was written.
+
+Usage:
+    STORM_ENTITY_COUNT=20000 locust -f stress/l3/expiration_storm.py --host=http://localhost:8545 --headless --users 10
+"""
+
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+from arkiv import Arkiv
+from arkiv.types import Operations
+from arkiv.utils import to_create_op
+from locust import constant, events, task
+from locust.exception import StopUser
+from locust.runners import LocalRunner, MasterRunner, WorkerRunner
+from prometheus_client.parser import text_string_to_metric_families
+
+# Add the project root (stress-tests/) to Python path so we can import stress.*
+file_dir = Path(__file__).resolve().parent
+project_root = file_dir.parent.parent  # l3/ -> stress/ -> stress-tests/
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from stress.tools.background_sampler import BackgroundSampler
+from stress.tools.json_rpc_user import JsonRpcUser
+from stress.tools.metrics import Metrics
+from stress.tools.payload_pool import PayloadPool
+
+# =============================================================================
+# Configuration (env-overridable)
+# =============================================================================
+
+STORM_MODE = os.getenv("STORM_MODE", "cohort")  # cohort or rate
+STORM_ENTITY_COUNT = int(os.getenv("STORM_ENTITY_COUNT", "10000"))
+STORM_BATCH_SIZE = int(os.getenv("STORM_BATCH_SIZE", "200"))
+STORM_PAYLOAD_BYTES = int(os.getenv("STORM_PAYLOAD_BYTES", "100"))
+STORM_LEAD_BLOCKS = int(os.getenv("STORM_LEAD_BLOCKS", "300"))
+STORM_RATE_PER_BLOCK = int(os.getenv("STORM_RATE_PER_BLOCK", "500"))
+STORM_WINDOW_BLOCKS = int(os.getenv("STORM_WINDOW_BLOCKS", "20"))
+STORM_BASELINE_BLOCKS = int(os.getenv("STORM_BASELINE_BLOCKS", "10"))
+
+STORM_POLL_INTERVAL_SEC = float(os.getenv("STORM_POLL_INTERVAL_SEC", "0.25"))
+STORM_NODE_METRICS_URL = os.getenv(
+    "STORM_NODE_METRICS_URL", os.getenv("RETH_SEQUENCER_METRICS_URL", "")
+)
+STORM_NODE_METRICS = [
+    name.strip()
+    for name in os.getenv(
+        "STORM_NODE_METRICS", "new_payload,execution,persistence,block_processing,gas_per_second"
+    ).split(",")
+    if name.strip()
+]
+STORM_REPORT_FILE = os.getenv("STORM_REPORT_FILE", "expiration_storm_report.json")
+
+DEFAULT_BLOCK_DURATION_SECONDS = 2
+HTTP_TIMEOUT_SECONDS = 5
+
+
+# =============================================================================
+# Shared storm plan
+# =============================================================================
+
+STORM_PLAN_MESSAGE = "storm_plan"
+STORM_WRITTEN_MESSAGE = "storm_written"
+
+
+class StormPlan:
+    """
+    Which block each entity should expire in; hands out the batches of this process's
+    entity range (the whole storm on a local runner) to the users.
+    """
+
+    start_block: Optional[int] = None
+    write_start_block: Optional[int] = None  # head when the plan was made, the baseline ends before it
+    next_entity: int = 0
+    end_entity: int = 0
+    written: int = 0
+    expiration_blocks: dict[int, int] = {}  # actual expiration block -> entities
+    retry: list[tuple[int, int]] = []  # batches whose write failed, handed out again first
+    ready = threading.Event()
+    _lock = threading.Lock()
+
+    @classmethod
+    def initialize(cls, write_start_block: int, start_block: int, first_entity: int, end_entity: int) -> None:
+        with cls._lock:
+            cls.write_start_block = write_start_block
+            cls.start_block = start_block
+            cls.next_entity = first_entity
+            cls.end_entity = end_entity
+            logging.info(
+                "Expiration storm (%s): entities %s..%s of %s, blocks %s..%s",
+                STORM_MODE,
+                first_entity,
+                end_entity - 1,
+                STORM_ENTITY_COUNT,
+                cls.start_block,
+                cls.last_target_block(),
+            )
+        cls.ready.set()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls.ready.clear()
+            cls.start_block = None
+            cls.write_start_block = None
+            cls.next_entity = 0
+            cls.end_entity = 0
+            cls.written = 0
+            cls.expiration_blocks = {}
+            cls.retry = []
+
+    @classmethod
+    def target_block(cls, entity_index: int) -> int:
+        if STORM_MODE == "rate":
+            return cls.start_block + entity_index // max(STORM_RATE_PER_BLOCK, 1)
+        return cls.start_block
+
+    @classmethod
+    def last_target_block(cls) -> int:
+        return cls.target_block(max(STORM_ENTITY_COUNT - 1, 0))
+
+    @classmethod
+    def next_batch(cls) -> tuple[int, int] | None:
+        """Reserve the next batch: (first entity index, entity count), None when all are taken."""
+        with cls._lock:
+            if cls.retry:
+                return cls.retry.pop()
+            if cls.next_entity >= cls.end_entity:
+                return None
+            first = cls.next_entity
+            count = min(STORM_BATCH_SIZE, cls.end_entity - first)
+            if STORM_MODE == "rate":
+                # Keep one batch within one target block so a single expires_in fits all entities
+                per_block = max(STORM_RATE_PER_BLOCK, 1)
+                count = min(count, per_block - first % per_block)
+            cls.next_entity += count
+            return first, count
+
+    @classmethod
+    def release(cls, first: int, count: int) -> None:
+        """Give back a reserved batch that was not written, so another user retries it."""
+        with cls._lock:
+            cls.retry.append((first, count))
+
+    @classmethod
+    def record_written(cls, expiration_block: int, count: int) -> None:
+        with cls._lock:
+            cls.written += count
+            cls.expiration_blocks[expiration_block] = cls.expiration_blocks.get(expiration_block, 0) + count
+
+
+def entity_ranges(workers: int) -> list[tuple[int, int]]:
+    """Split the storm entities into contiguous [first, end) ranges, one per worker."""
+    share, extra = divmod(STORM_ENTITY_COUNT, max(workers, 1))
+    ranges = []
+    first = 0
+    for index in range(max(workers, 1)):
+        end = first + share + (1 if index < extra else 0)
+        ranges.append((first, end))
+        first = end
+    return ranges
+
+
+def publish_plan(environment, head_block: int) -> None:
+    """Make the plan (master / local runner) and hand the entity ranges out to the workers."""
+    start_block = head_block + STORM_LEAD_BLOCKS
+    runner = environment.runner
+    if isinstance(runner, MasterRunner):
+        workers = list(runner.clients.keys())
+        if not workers:
+            logging.error("Expiration storm: no workers connected, nothing will be written")
+        for worker, (first, end) in zip(workers, entity_ranges(len(workers))):
+            runner.send_message(
+                STORM_PLAN_MESSAGE,
+                {"write_start_block": head_block, "start_block": start_block, "first": first, "end": end},
+                client_id=worker,
+            )
+        # The master writes nothing, it only needs the blocks for the report
+        StormPlan.initialize(head_block, start_block, 0, 0)
+    else:
+        StormPlan.initialize(head_block, start_block, 0, STORM_ENTITY_COUNT)
+
+
+def on_storm_plan(environment, msg, **kwargs):
+    """Worker: the master sent this worker's share of the storm."""
+    data = msg.data
+    StormPlan.initialize(data["write_start_block"], data["start_block"], data["first"], data["end"])
+
+
+def on_storm_written(environment, msg, **kwargs):
+    """Master: a worker wrote a batch."""
+    StormPlan.record_written(msg.data["expiration_block"], msg.data["count"])
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    runner = getattr(environment, "runner", None)
+    if isinstance(runner, MasterRunner):
+        runner.register_message(STORM_WRITTEN_MESSAGE, on_storm_written)
+    elif isinstance(runner, WorkerRunner):
+        runner.register_message(STORM_PLAN_MESSAGE, on_storm_plan)
+
+
+# =============================================================================
+# Chain / node monitor
+# =============================================================================
+
+@dataclass
+class BlockObservation:
+    number: int
+    seen_at: float
+    interval_ms: Optional[float]
+    head_lag_ms: float
+    rpc_latencies_ms: list[float] = field(default_factory=list)
+    node_metrics: dict[str, float] = field(default_factory=dict)
+
+
+def scrape_node_metrics(url: str, patterns: list[str]) -> dict[str, float]:
+    """Prometheus samples whose name contains one of the patterns (labels folded into the key)."""
+    try:
+        response = requests.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+    except Exception as e:
+        logging.warning("Could not scrape node metrics from %s: %s", url, e)
+        return {}
+
+    values = {}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if not any(pattern in sample.name for pattern in patterns):
+                continue
+            value = float(sample.value)
+            if not math.isfinite(value):
+                continue
+            labels = ",".join(f"{k}={v}" for k, v in sorted(sample.labels.items()))
+            values[f"{sample.name}{{{labels}}}" if labels else sample.name] = value
+    return values
+
+
+class StormMonitor(BackgroundSampler):
+    """Background thread that follows the head around the storm and writes the report."""
+
+    @classmethod
+    def for_test(cls, environment):
+        """A fresh monitor for every test (master / local runner)."""
+        if not isinstance(getattr(environment, "runner", None), (MasterRunner, LocalRunner)):
+            return None
+        cls._instance = cls(environment)
+        return cls._instance
+
+    def __init__(self, environment):
+        super().__init__(STORM_POLL_INTERVAL_SEC)
+        self._environment = environment
+        self.head: Optional[int] = None
+        self.blocks: list[BlockObservation] = []
+
+    def _rpc(self, method: str, params: list) -> tuple[Any, float]:
+        started = time.perf_counter()
+        response = requests.post(
+            self._environment.host,
+            json={"jsonrpc": "2.0", "method": method, "params": params, "id": 1},
+            timeout=HTTP_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        return response.json().get("result"), (time.perf_counter() - started) * 1000
+
+    def _observe_block(self, number: int):
+        block, _ = self._rpc("eth_getBlockByNumber", [hex(number), False])
+        now = time.time()
+        timestamp = int(block["timestamp"], 16) if block else now
+        previous = self.blocks[-1] if self.blocks else None
+        observation = BlockObservation(
+            number=number,
+            seen_at=now,
+            interval_ms=(now - previous.seen_at) * 1000 if previous else None,
+            head_lag_ms=max(now - timestamp, 0) * 1000,
+        )
+        if STORM_NODE_METRICS_URL:
+            observation.node_metrics = scrape_node_metrics(STORM_NODE_METRICS_URL, STORM_NODE_METRICS)
+        self.blocks.append(observation)
+        Metrics.get_metrics().record_block_observation(observation.interval_ms, observation.head_lag_ms)
+
+    def run_once(self):
+        result, latency_ms = self._rpc("eth_blockNumber", [])
+        number = int(result, 16)
+        Metrics.get_metrics().record_rpc_probe(latency_ms)
+
+        if self.head is None or number > self.head:
+            # Blocks skipped between polls are recorded with the same arrival time
+            for missed in range(number if self.head is None else self.head + 1, number + 1):
+                self._observe_block(missed)
+            self.head = number
+        if self.blocks:
+            self.blocks[-1].rpc_latencies_ms.append(latency_ms)
+
+        if StormPlan.start_block is None and len(self.blocks) >= STORM_BASELINE_BLOCKS:
+            publish_plan(self._environment, self.head)
+
+        if StormPlan.start_block is not None and self.head > StormPlan.last_target_block() + STORM_WINDOW_BLOCKS:
+            self.write_report()
+            if StormPlan.written < STORM_ENTITY_COUNT:
+                logging.warning(
+                    "Expiration storm window passed with only %s of %s entities written",
+                    StormPlan.written,
+                    STORM_ENTITY_COUNT,
+                )
+            self.stop()
+            self._environment.runner.quit()
+
+    def write_report(self):
+        first_target = StormPlan.start_block or 0
+        last_target = StormPlan.last_target_block() if StormPlan.start_block is not None else 0
+
+        def summarize(blocks: list[BlockObservation]) -> dict:
+            intervals = [b.interval_ms for b in blocks if b.interval_ms is not None]
+            lags = [b.head_lag_ms for b in blocks]
+            latencies = [latency for b in blocks for latency in b.rpc_latencies_ms]
+            return {
+                "blocks": len(blocks),
+                "interval_ms_mean": sum(intervals) / len(intervals) if intervals else None,
+                "interval_ms_max": max(intervals, default=None),
+                "head_lag_ms_max": max(lags, default=None),
+                "rpc_latency_ms_mean": sum(latencies) / len(latencies) if latencies else None,
+                "rpc_latency_ms_max": max(latencies, default=None),
+            }
+
+        # Expired entities are removed when the expiration block is processed, the cost shows on
+        # the block itself and the next one (its arrival interval)
+        write_start = StormPlan.write_start_block if StormPlan.write_start_block is not None else first_target
+        baseline = [b for b in self.blocks if b.number <= write_start]
+        storm = [b for b in self.blocks if first_target <= b.number <= last_target + 1]
+
+        report = {
+            "settings": {
+                "mode": STORM_MODE,
+                "entity_count": STORM_ENTITY_COUNT,
+                "batch_size": STORM_BATCH_SIZE,
+                "payload_bytes": STORM_PAYLOAD_BYTES,
+                "rate_per_block": STORM_RATE_PER_BLOCK,
+                "write_start_block": StormPlan.write_start_block,
+                "first_target_block": first_target,
+                "last_target_block": last_target,
+            },
+            "entities_written": StormPlan.written,
+            "expiration_blocks": {str(k): v for k, v in sorted(StormPlan.expiration_blocks.items())},
+            "baseline": summarize(baseline),
+            "storm": summarize(storm),
+            "blocks": [
+                asdict(b)
+                for b in self.blocks
+                if b.number <= write_start or first_target - STORM_WINDOW_BLOCKS <= b.number <= last_target + STORM_WINDOW_BLOCKS
+            ],
+        }
+        with open(STORM_REPORT_FILE, "w") as f:
+            json.dump(report, f, indent=2)
+        logging.info(
+            "Expiration storm report written to %s (baseline interval: %s ms, "
+            "storm max interval: %s ms)",
+            STORM_REPORT_FILE,
+            report["baseline"]["interval_ms_mean"],
+            report["storm"]["interval_ms_max"],
+        )
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    StormPlan.reset()
+
+
+StormMonitor.listen_to_tests()
+
+
+# =============================================================================
+# Locust User
+# =============================================================================
+
+class ExpirationStormUser(JsonRpcUser):
+    """Locust user writing entities whose expiration is aimed at the storm blocks."""
+
+    wait_time = constant(0)
+
+    block_duration_seconds: int = DEFAULT_BLOCK_DURATION_SECONDS
+
+    def on_start(self) -> None:
+        super().on_start()
+        self._initialize_account_and_w3()
+
+    def _initialize_account_and_w3(self) -> Arkiv:
+        if self.account is None or self.w3 is None:
+            super()._initialize_account_and_w3()
+            try:
+                block_timing = self.w3.arkiv.get_block_timing()
+                self.block_duration_seconds = int(
+                    getattr(block_timing, "duration", DEFAULT_BLOCK_DURATION_SECONDS)
+                )
+            except Exception:
+                self.block_duration_seconds = DEFAULT_BLOCK_DURATION_SECONDS
+        return self.w3
+
+    def _record_written(self, expiration_block: int, count: int) -> None:
+        runner = self.environment.runner
+        if isinstance(runner, WorkerRunner):
+            runner.send_message(STORM_WRITTEN_MESSAGE, {"expiration_block": expiration_block, "count": count})
+        else:
+            StormPlan.record_written(expiration_block, count)
+
+    @task
+    def write_storm_batch(self) -> None:
+        if not StormPlan.ready.wait(timeout=1.0):
+            return  # the plan is made after STORM_BASELINE_BLOCKS blocks without load
+        batch = StormPlan.next_batch()
+        if batch is None:
+            logging.info("All storm entities reserved, user %s stops writing", self.id)
+            raise StopUser()
+        first, count = batch
+        try:
+            self._write_batch(first, count)
+        except Exception:
+            StormPlan.release(first, count)
+            raise
+
+    def _write_batch(self, first: int, count: int) -> None:
+        w3 = self._initialize_account_and_w3()
+        target_block = StormPlan.target_block(first)
+        head = w3.eth.block_number
+        # The transaction is expected in the next block; expiration = inclusion block + expires_in / block time
+        blocks_to_live = target_block - (head + 1)
+        if blocks_to_live < 1:
+            logging.warning(
+                "Storm target block %s is too close to head %s, "
+                "increase STORM_LEAD_BLOCKS (user: %s)",
+                target_block,
+                head,
+                self.id,
+            )
+            blocks_to_live = 1
+        expires_in = blocks_to_live * self.block_duration_seconds
+
+        create_ops = [
+            to_create_op(
+                payload=PayloadPool.get_pool().payload(STORM_PAYLOAD_BYTES),
+                content_type="application/octet-stream",
+                attributes={"ArkivEntityType": "StormEntity", "stormTarget": target_block},
+                expires_in=expires_in,
+            )
+            for _ in range(count)
+        ]
+        self.wait_for_write_slot()
+        receipt = self._fire_locust_request(
+            f"write_storm_batch_x{count}",
+            lambda: w3.arkiv.execute(Operations(creates=create_ops)),
+            entity_count=count,
+        )
+
+        inclusion_block = getattr(receipt, "block_number", None)
+        if inclusion_block is None:
+            inclusion_block = head + 1
+        self._record_written(inclusion_block + blocks_to_live, count)
@@ -23,16 +23,33 @@ from arkiv.types import ATTRIBUTES, KEY, Operations
 from arkiv.utils import to_create_op, to_query_options
 from eth_account.signers.local import LocalAccount
 from locust import task, between, events, constant_pacing
-from locust.runners import MasterRunner, LocalRunner
 from web3 import Web3
 import web3
+import gevent
 from eth_account import Account
 
 import stress.tools.config as config
 from stress.tools.utils import launch_image, build_account_path
 from stress.tools.metrics import Metrics
-from stress.tools.entity_count_updater import EntityCountUpdater
+import stress.tools.chain_state_sampler  # noqa: F401  registers the chain state sampling hooks
 from stress.tools.json_rpc_user import JsonRpcUser
+from stress.tools.visibility import wait_for_visibility
+from stress.tools.trace import (
+    traced_operation,
+    OP_CHANGE_OWNER,
+    OP_CREATE,
+    OP_DELETE,
+    OP_EXTEND,
+    OP_QUERY,
+    OP_UPDATE,
+)
+from stress.tools.adaptive_batcher import AdaptiveBatcher
+import stress.tools.block_follower  # noqa: F401  registers the BLOCK_FOLLOWER test hooks
+from stress.tools.entity_pool import LiveEntity, LiveEntityPool, gas_used
+from stress.tools.payload_pool import PayloadPool
+from stress.tools.tx_phases import tx_span
+from stress.tools.index_lag import submit_receipt
+from stress.tools.sample_sink import record_sample, sample_context
 
 Account.enable_unaudited_hdwallet_features()
 
@@ -45,6 +62,41 @@ MAX_RESULTS_PER_PAGE: int = 1_000_000_000
 # Default entity expiration time
 DEFAULT_EXPIRATION_TIME: timedelta = timedelta(seconds=float(os.getenv("BLOCK_EXPIRATION_TIME_SEC", 30 * 60)))
 
+# Read-your-writes check: entities created per measurement and how long to wait for them
+VISIBILITY_ENTITY_COUNT: int = int(os.getenv("VISIBILITY_ENTITY_COUNT", "10"))
+VISIBILITY_TIMEOUT_SEC: float = float(os.getenv("VISIBILITY_TIMEOUT_SEC", "60"))
+# Opt-in (0 keeps read_your_writes_lag, which can block a user for VISIBILITY_TIMEOUT_SEC, out of the default mix)
+VISIBILITY_TASK_WEIGHT: int = int(os.getenv("VISIBILITY_TASK_WEIGHT", "0"))
+
+# Adaptive batches: payload sizes rotated so the gas model sees both entity- and byte-heavy batches
+ADAPTIVE_BATCH_PAYLOAD_SIZES: list[int] = [
+    int(size) for size in os.getenv("ADAPTIVE_BATCH_PAYLOAD_SIZES", "100,1024,10240,32768").split(",")
+]
+# Opt-in (0 keeps store_adaptive_batch out of the default benchmark mix)
+ADAPTIVE_BATCH_TASK_WEIGHT: int = int(os.getenv("ADAPTIVE_BATCH_TASK_WEIGHT", "0"))
+
+# Entity lifecycle mix: relative weights of the operations run by the entity_lifecycle task
+LIFECYCLE_MIX: dict[str, int] = {
+    op: int(weight)
+    for op, weight in (
+        item.split(":")
+        for item in os.getenv(
+            "LIFECYCLE_MIX", "create:2,update:4,extend:2,delete:1,change_owner:1"
+        ).split(",")
+    )
+}
+# Opt-in (0 keeps the entity_lifecycle task out of the default benchmark mix)
+LIFECYCLE_TASK_WEIGHT: int = int(os.getenv("LIFECYCLE_TASK_WEIGHT", "0"))
+LIFECYCLE_PAYLOAD_BYTES: int = int(os.getenv("LIFECYCLE_PAYLOAD_BYTES", "100"))
+LIFECYCLE_EXTEND_BY: timedelta = timedelta(seconds=float(os.getenv("LIFECYCLE_EXTEND_BY_SEC", 10 * 60)))
+# Workload trace operation of every lifecycle operation (create is traced by _store_payload)
+LIFECYCLE_TRACE_OPS: dict[str, int] = {
+    "update": OP_UPDATE,
+    "extend": OP_EXTEND,
+    "delete": OP_DELETE,
+    "change_owner": OP_CHANGE_OWNER,
+}
+
 # JSON data as one-line Python string
 bigger_payload = b'{"offer":{"constraints":"(&\\n  (golem.srv.comp.expiration>1653219330118)\\n  (golem.node.debug.subnet=0987)\\n)","offerId":"7f2f81f213dd48549e080d774dbf1bc2-076a8cbae6546e5f158e5b4d3a869f25a8e2ae426279a691e7ee45315efa3d83","properties":{"golem":{"activity":{"caps":{"transfer":{"protocol":["http","https","gftp"]}}},"com":{"payment":{"debit-notes":{"accept-timeout?":240},"platform":{"erc20-rinkeby-tglm":{"address":"0x86a269498fb5270f20bdc6fdcf6039122b0d3b23"},"zksync-rinkeby-tglm":{"address":"0x86a269498fb5270f20bdc6fdcf6039122b0d3b23"}}},"pricing":{"model":{"@tag":"linear","linear":{"coeffs":[0.0002777777777777778,0.001388888888888889,0.0]}}},"scheme":"payu","usage":{"vector":["golem.usage.duration_sec","golem.usage.cpu_sec"]}},"inf":{"cpu":{"architecture":"x86_64","capabilities":["sse3","pclmulqdq","dtes64","monitor","dscpl","vmx","eist","tm2","ssse3","fma","cmpxchg16b","pdcm","pcid","sse41","sse42","x2apic","movbe","popcnt","tsc_deadline","aesni","xsave","osxsave","avx","f16c","rdrand","fpu","vme","de","pse","tsc","msr","pae","mce","cx8","apic","sep","mtrr","pge","mca","cmov","pat","pse36","clfsh","ds","acpi","mmx","fxsr","sse","sse2","ss","htt","tm","pbe","fsgsbase","adjust_msr","smep","rep_movsb_stosb","invpcid","deprecate_fpu_cs_ds","mpx","rdseed","rdseed","adx","smap","clflushopt","processor_trace","sgx","sgx_lc"],"cores":6,"model":"Stepping 10 Family 6 Model 158","threads":11,"vendor":"GenuineIntel"},"mem":{"gib":28.0},"storage":{"gib":57.276745605468754}},"node":{"debug":{"subnet":"0987"},"id":{"name":"nieznanysprawiciel-laptop-Provider-2"}},"runtime":{"capabilities":["vpn"],"name":"vm","version":"0.2.10"},"srv":{"caps":{"multi-activity":true}}}},"providerId":"0x86a269498fb5270f20bdc6fdcf6039122b0d3b23","timestamp":"2022-05-22T11:35:49.290821396Z"},"proposedSignature":"NoSignature","state":"Pending","timestamp":"2022-05-22T11:35:49.290821396Z","validTo":"2022-05-22T12:35:49.280650Z"}'
 simple_payload = b"Hello Arkiv Workshop!"
@@ -53,16 +105,6 @@ simple_payload = b"Hello Arkiv Workshop!"
 gb_container = None
 
 
-@events.init.add_listener
-def on_locust_init(environment, **kwargs):
-    """Initialize Locust - runs once when Locust starts."""
-    runner = getattr(environment, "runner", None)
-    # only run on the master node or local runner
-    if isinstance(runner, (MasterRunner, LocalRunner)):
-        logging.info("Running on master/local runner - creating EntityCountUpdater")
-        EntityCountUpdater.instance = EntityCountUpdater(environment)
-
-
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     Metrics.reset_global_metrics()
@@ -74,12 +116,6 @@ def on_test_start(environment, **kwargs):
         f"A new test is starting with nr of users {environment.runner.target_user_count}"
     )
 
-    # Start/restart EntityCountUpdater (host may have changed)
-    runner = getattr(environment, "runner", None)
-    if isinstance(runner, (MasterRunner, LocalRunner)):
-        if EntityCountUpdater.instance:
-            EntityCountUpdater.instance.restart()
-
     if (
         config.chain_env == "local"
         and config.image_to_run
@@ -113,6 +149,9 @@ class ArkivL3User(JsonRpcUser):
         self.unique_ids = set()
         self.account: LocalAccount | None = None
         self.w3: Arkiv | None = None
+        self.validator_w3: Arkiv | None = None
+        self.transfer_target: str | None = None
+        self.transfer_target_id: int | None = None
         self.block_duration: int = DEFAULT_BLOCK_DURATION
 
     def on_start(self):
@@ -126,10 +165,10 @@ class ArkivL3User(JsonRpcUser):
             self.account = Account.from_mnemonic(
                 config.mnemonic, account_path=account_path
             )
-            logging.info(f"Account: {self.account.address} (user: {self.id})")
+            logging.info("Account: %s (user: %s)", self.account.address, self.id)
 
-            logging.info(f"Connecting to Arkiv L3 (user: {self.id})")
-            logging.info(f"Base URL: {self.client.base_url} (user: {self.id})")
+            logging.info("Connecting to Arkiv L3 (user: %s)", self.id)
+            logging.info("Base URL: %s (user: %s)", self.client.base_url, self.id)
             self.w3 = Arkiv(
                 web3.HTTPProvider(
                     endpoint_uri=self.client.base_url, session=self.client
@@ -141,7 +180,7 @@ class ArkivL3User(JsonRpcUser):
                 logging.error(f"Not connected to Arkiv L3 (user: {self.id})")
                 raise Exception(f"Not connected to Arkiv L3 (user: {self.id})")
 
-            logging.info(f"Connected to Arkiv L3 (user: {self.id})")
+            logging.info("Connected to Arkiv L3 (user: %s)", self.id)
 
             if config.chain_env == "local":
                 self._topup_local_account()
@@ -153,7 +192,7 @@ class ArkivL3User(JsonRpcUser):
         accounts = self.w3.eth.accounts
 
         balance = Web3.from_wei(self.w3.eth.get_balance(self.account.address), "ether")
-        logging.info(f"Balance: {balance} ETH (user: {self.id})")
+        logging.debug("Balance: %s ETH (user: %s)", balance, self.id)
         
         # Top up if balance is below 0.1 ETH
         if balance < 0.1:
@@ -164,16 +203,16 @@ class ArkivL3User(JsonRpcUser):
                     "value": Web3.to_wei(10, "ether"),
                 }
             )
-            logging.info(f"Transaction hash: {tx_hash} (user: {self.id})")
+            logging.info("Transaction hash: %s (user: %s)", tx_hash, self.id)
             receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            logging.info(f"Transaction confirmed in block: {receipt.blockNumber} (user: {self.id})")
+            logging.info("Transaction confirmed in block: %s (user: %s)", receipt.blockNumber, self.id)
 
     def _query_block_duration(self) -> int:
         """Get block duration from block timing."""
         try:
             block_timing = self.w3.arkiv.get_block_timing()
             duration = block_timing.duration
-            logging.info(f"Block duration: {duration} seconds (user: {self.id})")
+            logging.info("Block duration: %s seconds (user: %s)", duration, self.id)
             return duration
         except Exception:
             return DEFAULT_BLOCK_DURATION
@@ -200,12 +239,19 @@ class ArkivL3User(JsonRpcUser):
 
         return expiration_seconds
 
+    def _traced(self, op: int, name: str, payload_size: int = 0, entity_count: int = 0, **details):
+        """
+        Record the operation run in the with block in the workload trace once it finished
+        (no-op unless TRACE_RECORD_FILE is set). Yields the details dict for late details.
+        """
+        return traced_operation(self.id, op, name, payload_size, entity_count, **details)
+
     def _generate_payload(self, size_bytes: int) -> bytes:
         """
-        Generate a payload of the specified size in bytes using
-        high-entropy random data to avoid compression.
+        Generate a unique payload of the specified size in bytes, sliced from the
+        process payload pool (high-entropy random data to avoid compression).
         """
-        return os.urandom(size_bytes)
+        return PayloadPool.get_pool().payload(size_bytes)
 
     def _get_annotations_for_percentages(self) -> dict[str, str]:
         """
@@ -243,18 +289,28 @@ class ArkivL3User(JsonRpcUser):
                 gb_container = launch_image(config.image_to_run)
 
             w3 = self._initialize_account_and_w3()
+            self.wait_for_write_slot()
 
             nonce = w3.eth.get_transaction_count(self.account.address)
-            logging.info(f"Nonce: {nonce}")
+            logging.debug("Nonce: %s", nonce)
 
             start_time = time.perf_counter()
             expiration_seconds = self._calculate_expiration(expires_in)
-            w3.arkiv.create_entity(
-                payload=bigger_payload,
+            with self._traced(
+                OP_CREATE,
+                "store_bigger_payload",
+                len(bigger_payload),
+                1,
                 content_type="application/json",
-                attributes={"ArkivEntityType": "StressedEntity"},
+                attributes=[{"ArkivEntityType": "StressedEntity"}],
                 expires_in=expiration_seconds,
-            )
+            ), tx_span("store_bigger_payload"):
+                w3.arkiv.create_entity(
+                    payload=bigger_payload,
+                    content_type="application/json",
+                    attributes={"ArkivEntityType": "StressedEntity"},
+                    expires_in=expiration_seconds,
+                )
             duration = timedelta(seconds=time.perf_counter() - start_time)
 
             Metrics.get_metrics().record_transaction(len(bigger_payload), duration)
@@ -278,6 +334,9 @@ class ArkivL3User(JsonRpcUser):
             size_bytes: Size of the payload in bytes
             count: Number of entities to create in a single transaction (default: 1)
             expires_in: Expiration time as timedelta (default: 30 minutes)
+
+        Returns:
+            Tuple of (transaction receipt, list of uniqueId values of the created entities)
         """
         try:
             w3 = self._initialize_account_and_w3()
@@ -285,16 +344,16 @@ class ArkivL3User(JsonRpcUser):
             # Calculate expiration in seconds based on block timing
             expiration_seconds = self._calculate_expiration(expires_in)
 
-            # Generate payload of the specified size (same payload for all entities)
-            payload = self._generate_payload(size_bytes)
-
             # Generate create operations for all entities
             operations = []
+            traced_attributes = []
+            created_unique_ids = []
             total_payload_size = 0
             for _ in range(count):
                 # Generate unique ID and store it in the set for use in other tasks
                 unique_id = str(uuid.uuid4())
                 self.unique_ids.add(unique_id)
+                created_unique_ids.append(unique_id)
 
                 # Random query percentage between 1 and 100
                 query_percentage = random.randint(1, 100)
@@ -309,8 +368,10 @@ class ArkivL3User(JsonRpcUser):
                 # Generate annotations based on divisibility by powers of 2 and merge into attributes
                 annotations = self._get_annotations_for_percentages()
                 attributes.update(annotations)
+                traced_attributes.append(attributes)
 
-                # Create operation for this entity
+                # Create operation for this entity, every entity gets its own payload
+                payload = self._generate_payload(size_bytes)
                 create_op = to_create_op(
                     payload=payload,
                     content_type="text/plain",
@@ -320,27 +381,51 @@ class ArkivL3User(JsonRpcUser):
                 operations.append(create_op)
                 total_payload_size += len(payload)
 
+            self.wait_for_write_slot()
             nonce = w3.eth.get_transaction_count(self.account.address)
-            logging.info(
-                f"Sending transaction with nonce: {nonce}, payload size: {size_bytes} bytes, "
-                f"count: {count}, user: {self.id}"
+            logging.debug(
+                "Sending transaction with nonce: %s, payload size: %s bytes, count: %s, user: %s",
+                nonce,
+                size_bytes,
+                count,
+                self.id,
             )
 
             start_time = time.perf_counter()
             # Execute all create operations in a single transaction
             operations = Operations(creates=operations)
-            receipt = w3.arkiv.execute(operations)
+            name = f"store_payload_{size_bytes}b_x{count}"
+            with self._traced(
+                OP_CREATE,
+                name,
+                size_bytes,
+                count,
+                content_type="text/plain",
+                attributes=traced_attributes,
+                expires_in=expiration_seconds,
+            ) as traced:
+                with tx_span(name):
+                    receipt = w3.arkiv.execute(operations)
+                traced["keys"] = [str(getattr(create, "key", "")) for create in receipt.creates]
+
+                # Verify receipt
+                if len(receipt.creates) != count:
+                    raise Exception(
+                        f"Expected {count} creates, but got {len(receipt.creates)}"
+                    )
             duration = timedelta(seconds=time.perf_counter() - start_time)
 
-            # Verify receipt
-            if len(receipt.creates) != count:
-                raise Exception(
-                    f"Expected {count} creates, but got {len(receipt.creates)}"
-                )
-
-            Metrics.get_metrics().record_transaction(
-                total_payload_size, duration, count
+            Metrics.get_metrics().record_transaction(total_payload_size, duration, count)
+            # The write fires no request event of its own (only its JSON-RPC calls do)
+            record_sample(
+                name,
+                duration.total_seconds() * 1000,
+                size=total_payload_size,
+                request_type="arkiv",
+                **sample_context(count, receipt),
             )
+            submit_receipt(receipt)
+            return receipt, created_unique_ids
         except Exception as e:
             logging.error(
                 f"Error in _store_payload (user: {self.id}, size: {size_bytes} bytes, count: {count}): {e}",
@@ -448,6 +533,252 @@ class ArkivL3User(JsonRpcUser):
         """Store a 64 KB payload (maximum limit)"""
         self._store_payload(64 * 1024)
 
+    @task(ADAPTIVE_BATCH_TASK_WEIGHT)
+    def store_adaptive_batch(self):
+        """Store as many entities as fit the gas target of the shared adaptive batcher"""
+        w3 = self._initialize_account_and_w3()
+        batcher = AdaptiveBatcher.get_batcher()
+        size_bytes = random.choice(ADAPTIVE_BATCH_PAYLOAD_SIZES)
+        count = batcher.next_batch_size(w3, size_bytes)
+        try:
+            receipt, _ = self._store_payload(size_bytes, count=count)
+        except Exception as e:
+            batcher.record_failure(count, size_bytes, e)
+            raise
+        batcher.record_receipt(w3, receipt, count, size_bytes)
+
+    def _lifecycle_transfer_target(self) -> str:
+        """Address of the next running user's account, which receives entities on change_owner."""
+        if self.transfer_target is None:
+            running_users = getattr(self.environment.runner, "target_user_count", None) or 0
+            self.transfer_target_id = (self.id + 1) % max(running_users, 2)
+            self.transfer_target = Account.from_mnemonic(
+                config.mnemonic, account_path=build_account_path(self.transfer_target_id)
+            ).address
+        return self.transfer_target
+
+    def _lifecycle_create(self, w3):
+        """Create an entity for the lifecycle operations and remember it in the live entity pool."""
+        receipt, _ = self._store_payload(LIFECYCLE_PAYLOAD_BYTES)
+        pool = LiveEntityPool.get_pool()
+        expires_at = time.time() + self._calculate_expiration(DEFAULT_EXPIRATION_TIME)
+        for create in receipt.creates:
+            pool.add(
+                LiveEntity(
+                    key=str(create.key),
+                    owner=self.account.address,
+                    payload_size=LIFECYCLE_PAYLOAD_BYTES,
+                    expires_at=expires_at,
+                )
+            )
+        return receipt
+
+    def _run_lifecycle_op(self, operation: str, fn, payload_size: int = 0, **details):
+        """
+        Run one lifecycle operation, recording its latency and gas per operation type.
+
+        Operations other than create are also recorded in the workload trace, with
+        payload_size and details (key, attributes, ...) as the record's variable part.
+        """
+        w3 = self._initialize_account_and_w3()
+        if operation != "create":  # _store_payload waits for its own write slot
+            self.wait_for_write_slot()
+        start_time = time.perf_counter()
+        exc = None
+        receipt = None
+        try:
+            if operation == "create":
+                # _store_payload traces the create and opens its own span after the write slot wait
+                receipt = fn(w3)
+            else:
+                name = f"lifecycle_{operation}"
+                with self._traced(
+                    LIFECYCLE_TRACE_OPS[operation], name, payload_size, 1, **details
+                ), tx_span(name):
+                    receipt = fn(w3)
+        except Exception as e:
+            exc = e
+            raise
+        finally:
+            duration = timedelta(seconds=time.perf_counter() - start_time)
+            events.request.fire(
+                request_type="lifecycle",
+                name=operation,
+                response_time=duration.total_seconds() * 1000,
+                response_length=0,
+                exception=exc,
+                context=sample_context(1, receipt),
+                response=None,
+            )
+        Metrics.get_metrics().record_entity_operation(operation, duration, gas_used(w3, receipt))
+        return receipt
+
+    @task(LIFECYCLE_TASK_WEIGHT)
+    def entity_lifecycle(self):
+        """
+        Run one operation from LIFECYCLE_MIX (create, update, extend, delete, change_owner)
+        on an entity this user's account created earlier.
+        """
+        operations = list(LIFECYCLE_MIX)
+        operation = random.choices(operations, weights=[LIFECYCLE_MIX[op] for op in operations])[0]
+
+        self._initialize_account_and_w3()
+        pool = LiveEntityPool.get_pool()
+        owner = self.account.address
+        entity = pool.pick(owner)
+        if entity is None or operation == "create":
+            self._run_lifecycle_op("create", self._lifecycle_create)
+            return
+
+        try:
+            if operation == "update":
+                attributes = {
+                    "ArkivEntityType": "StressedEntity",
+                    "queryPercentage": random.randint(1, 100),
+                    "uniqueId": str(uuid.uuid4()),
+                }
+                expires_in = self._calculate_expiration(DEFAULT_EXPIRATION_TIME)
+                self._run_lifecycle_op(
+                    "update",
+                    lambda w3: w3.arkiv.update_entity(
+                        entity.key,
+                        payload=self._generate_payload(entity.payload_size),
+                        attributes=attributes,
+                        expires_in=expires_in,
+                    ),
+                    payload_size=entity.payload_size,
+                    key=entity.key,
+                    attributes=attributes,
+                    expires_in=expires_in,
+                )
+                entity.expires_at = time.time() + expires_in
+            elif operation == "extend":
+                extend_by = self._calculate_expiration(LIFECYCLE_EXTEND_BY)
+                self._run_lifecycle_op(
+                    "extend",
+                    lambda w3: w3.arkiv.extend_entity(entity.key, extend_by=extend_by),
+                    key=entity.key,
+                    extend_by=extend_by,
+                )
+                entity.expires_at += extend_by
+            elif operation == "delete":
+                self._run_lifecycle_op(
+                    "delete", lambda w3: w3.arkiv.delete_entity(entity.key), key=entity.key
+                )
+                pool.remove(owner, entity.key)
+            elif operation == "change_owner":
+                new_owner = self._lifecycle_transfer_target()
+                self._run_lifecycle_op(
+                    "change_owner",
+                    lambda w3: w3.arkiv.change_owner(entity.key, new_owner),
+                    key=entity.key,
+                    new_owner=new_owner,
+                    new_owner_user=self.transfer_target_id,
+                )
+                pool.transfer(entity.key, owner, new_owner)
+            else:
+                logging.warning(f"Unknown lifecycle operation {operation!r} (user: {self.id})")
+        except Exception as e:
+            # The entity may have expired or been changed elsewhere - stop using it
+            pool.remove(owner, entity.key)
+            logging.error(
+                f"Error in entity_lifecycle (user: {self.id}, operation: {operation}, key: {entity.key}): {e}",
+                exc_info=True,
+            )
+            raise
+
+    def _visibility_endpoints(self) -> dict[str, Arkiv]:
+        """
+        Get Arkiv clients for every endpoint whose read-your-writes lag is measured.
+
+        The sequencer is always the endpoint the user writes to; the validator is
+        measured only when LOCUST_VALIDATOR_HOST is configured.
+        """
+        endpoints = {"sequencer": self._initialize_account_and_w3()}
+        if config.validator_host:
+            if self.validator_w3 is None:
+                self.validator_w3 = Arkiv(
+                    web3.HTTPProvider(endpoint_uri=config.validator_host)
+                )
+            endpoints["validator"] = self.validator_w3
+        return endpoints
+
+    def _measure_visibility(
+        self,
+        endpoint: str,
+        w3: Arkiv,
+        unique_ids: list[str],
+        committed_at: float,
+        creation_block: int,
+    ):
+        """Poll a single endpoint until the created entities are visible and record the lag."""
+        seen = wait_for_visibility(
+            w3, "uniqueId", unique_ids, timeout=VISIBILITY_TIMEOUT_SEC
+        )
+        metrics = Metrics.get_metrics()
+        for seen_at, head_block in seen.values():
+            lag = timedelta(seconds=max(seen_at - committed_at, 0))
+            metrics.record_visibility_lag(endpoint, lag, head_block - creation_block)
+            events.request.fire(
+                request_type="visibility",
+                name=f"read_your_writes_{endpoint}",
+                response_time=lag.total_seconds() * 1000,
+                response_length=0,
+                exception=None,
+                context={},
+                response=None,
+            )
+
+        missing = len(unique_ids) - len(seen)
+        if missing > 0:
+            metrics.record_visibility_timeout(endpoint, missing)
+            events.request.fire(
+                request_type="visibility",
+                name=f"read_your_writes_{endpoint}",
+                response_time=VISIBILITY_TIMEOUT_SEC * 1000,
+                response_length=0,
+                exception=TimeoutError(
+                    f"{missing} entities not visible on {endpoint} after {VISIBILITY_TIMEOUT_SEC}s"
+                ),
+                context={},
+                response=None,
+            )
+
+    @task(VISIBILITY_TASK_WEIGHT)
+    def read_your_writes_lag(self):
+        """
+        Create a batch of entities and measure how long they take to become visible
+        to query_entities on the sequencer and (optionally) on the validator.
+        """
+        try:
+            receipt, unique_ids = self._store_payload(100, count=VISIBILITY_ENTITY_COUNT)
+            committed_at = time.perf_counter()
+
+            w3 = self._initialize_account_and_w3()
+            creation_block = getattr(receipt, "block_number", None)
+            if creation_block is None:
+                creation_block = w3.eth.block_number
+
+            # Poll all endpoints concurrently so that one slow endpoint does not
+            # inflate the lag measured on the other one
+            greenlets = [
+                gevent.spawn(
+                    self._measure_visibility,
+                    endpoint,
+                    endpoint_w3,
+                    unique_ids,
+                    committed_at,
+                    creation_block,
+                )
+                for endpoint, endpoint_w3 in self._visibility_endpoints().items()
+            ]
+            gevent.joinall(greenlets, raise_error=True)
+        except Exception as e:
+            logging.error(
+                f"Error in read_your_writes_lag (user: {self.id}): {e}", exc_info=True
+            )
+            raise
+
     def _ensure_unique_ids_filled(self) -> None:
         """
         Query Arkiv for StressedEntity entities and fill unique_ids from those
@@ -456,27 +787,27 @@ class ArkivL3User(JsonRpcUser):
         if len(self.unique_ids) > 0:
             return
         
-        logging.info(f"Querying Arkiv for unique IDs (user: {self.id})")
+        logging.info("Querying Arkiv for unique IDs (user: %s)", self.id)
         
         w3 = self._initialize_account_and_w3()
         # Query a smaller subset using queryPercentage range (10 for ~10% of entities)
         query = 'ArkivEntityType="StressedEntity" && queryPercentage<=10'
-        
-        result = w3.arkiv.query_entities(
-            query=query,
-            options=to_query_options(
-                fields=KEY | ATTRIBUTES, max_results_per_page=MAX_RESULTS_PER_PAGE
-            ),
-        )
+        with self._traced(OP_QUERY, "ensure_unique_ids_filled", query=query):
+            result = w3.arkiv.query_entities(
+                query=query,
+                options=to_query_options(
+                    fields=KEY | ATTRIBUTES, max_results_per_page=MAX_RESULTS_PER_PAGE
+                ),
+            )
 
-        for entity in result:
-            if entity.attributes and "uniqueId" in entity.attributes:
-                self.unique_ids.add(entity.attributes["uniqueId"])
+            for entity in result:
+                if entity.attributes and "uniqueId" in entity.attributes:
+                    self.unique_ids.add(entity.attributes["uniqueId"])
 
         if len(self.unique_ids) > 0:
-            logging.info(f"Queried for {len(self.unique_ids)} unique IDs (user: {self.id})")
+            logging.info("Queried for %s unique IDs (user: %s)", len(self.unique_ids), self.id)
         else:
-            logging.info(f"No unique IDs found from query (user: {self.id})")
+            logging.info("No unique IDs found from query (user: %s)", self.id)
 
     @task(1)
     def query_single_entity(self):
@@ -485,30 +816,33 @@ class ArkivL3User(JsonRpcUser):
         """
         self._ensure_unique_ids_filled()
         if len(self.unique_ids) == 0:
-            logging.info(
-                f"No unique IDs available yet (user: {self.id}), skipping query_single_entity."
-            )
+            logging.debug("No unique IDs available yet (user: %s), skipping query_single_entity.", self.id)
             return
 
         unique_id = random.choice(tuple(self.unique_ids))
 
         try:
-            logging.info(f"Querying for uniqueId: {unique_id} (user: {self.id})")
-
-            w3 = self._initialize_account_and_w3()
-            start_time = time.perf_counter()
-            query = f'uniqueId="{unique_id}" && ArkivEntityType="StressedEntity"'
-            result = w3.arkiv.query_entities(
-                query=query,
-                options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
-            )
-            entities = [entity for entity in result]
-            duration = timedelta(seconds=time.perf_counter() - start_time)
+            logging.debug("Querying for uniqueId: %s (user: %s)", unique_id, self.id)
+
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                w3 = endpoint.w3
+                start_time = time.perf_counter()
+                query = f'uniqueId="{unique_id}" && ArkivEntityType="StressedEntity"'
+                with self._traced(OP_QUERY, "query_single_entity", query=query):
+                    result = w3.arkiv.query_entities(
+                        query=query,
+                        options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
+                    )
+                    entities = [entity for entity in result]
+                duration = timedelta(seconds=time.perf_counter() - start_time)
 
             Metrics.get_metrics().record_query(0, duration, len(entities))
 
-            logging.info(
-                f"Single-entity query for uniqueId {unique_id} returned {len(entities)} entities (user: {self.id})"
+            logging.debug(
+                "Single-entity query for uniqueId %s returned %s entities (user: %s)",
+                unique_id,
+                len(entities),
+                self.id,
             )
         except Exception as e:
             logging.error(
@@ -522,26 +856,28 @@ class ArkivL3User(JsonRpcUser):
         Stress test query that chooses only a selected percent of Entities
         """
         try:
-            logging.info(f"Selective query with threshold: {percent} (user: {self.id})")
-            w3 = self._initialize_account_and_w3()
-
-            # Query entities with queryPercentage below threshold
-            start_time = time.perf_counter()
-
-            query = f'ArkivEntityType="StressedEntity" && queryPercentage<{percent}'
-            result = w3.arkiv.query_entities(
-                query=query,
-                options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
-            )
-            entities = [entity for entity in result]
-            duration = timedelta(seconds=time.perf_counter() - start_time)
+            logging.debug("Selective query with threshold: %s (user: %s)", percent, self.id)
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                w3 = endpoint.w3
+
+                # Query entities with queryPercentage below threshold
+                start_time = time.perf_counter()
+
+                query = f'ArkivEntityType="StressedEntity" && queryPercentage<{percent}'
+                with self._traced(OP_QUERY, f"selective_query_{percent}", query=query):
+                    result = w3.arkiv.query_entities(
+                        query=query,
+                        options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
+                    )
+                    entities = [entity for entity in result]
+                duration = timedelta(seconds=time.perf_counter() - start_time)
 
             Metrics.get_metrics().record_query(percent, duration, len(entities))
 
-            logging.info(
-                f"Found {len(entities)} entities with queryPercentage < {percent} (user: {self.id})"
+            logging.debug(
+                "Found %s entities with queryPercentage < %s (user: %s)", len(entities), percent, self.id
             )
-            logging.debug(f"Result: {result} (user: {self.id})")
+            logging.debug("Result: %s (user: %s)", result, self.id)
         except Exception as e:
             logging.error(
                 f"Error in selective_query (user: {self.id}, percent: {percent}): {e}",
@@ -612,11 +948,12 @@ class ArkivL3User(JsonRpcUser):
             annotation_values = self._calculate_selector_approximation(percent)
             annotation_str = ", ".join(annotation_values)
             
-            logging.info(
-                f"Selective query by attribute for {percent}% with selectors: {annotation_str} (user: {self.id})"
+            logging.debug(
+                "Selective query by attribute for %s%% with selectors: %s (user: %s)",
+                percent,
+                annotation_str,
+                self.id,
             )
-            w3 = self._initialize_account_and_w3()
-
             # Build query: entities with any of the specified annotations
             # Query format: selector2="2" || selector4="4"
             annotation_conditions = [
@@ -628,20 +965,27 @@ class ArkivL3User(JsonRpcUser):
                 + ")"
             )
 
-            start_time = time.perf_counter()
-            result = w3.arkiv.query_entities(
-                query=query,
-                options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
-            )
-            entities = [entity for entity in result]
-            duration = timedelta(seconds=time.perf_counter() - start_time)
+            with self.read_endpoint(self._initialize_account_and_w3()) as endpoint:
+                w3 = endpoint.w3
+                start_time = time.perf_counter()
+                with self._traced(OP_QUERY, f"selective_query_by_attribute_{percent}", query=query):
+                    result = w3.arkiv.query_entities(
+                        query=query,
+                        options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
+                    )
+                    entities = [entity for entity in result]
+                duration = timedelta(seconds=time.perf_counter() - start_time)
 
             Metrics.get_metrics().record_query(percent, duration, len(entities))
 
-            logging.info(
-                f"Found {len(entities)} entities with selectors {annotation_str} (target: {percent}%) (user: {self.id})"
+            logging.debug(
+                "Found %s entities with selectors %s (target: %s%%) (user: %s)",
+                len(entities),
+                annotation_str,
+                percent,
+                self.id,
             )
-            logging.debug(f"Result: {result} (user: {self.id})")
+            logging.debug("Result: %s (user: %s)", result, self.id)
         except Exception as e:
             logging.error(
                 f"Error in selective_query_by_attribute (user: {self.id}, percent: {percent}): {e}",
@@ -710,20 +1054,24 @@ class ArkivL3User(JsonRpcUser):
     @task(1)
     def retrieve_keys_to_count(self):
         try:
-            logging.info(f"Retrieving offers")
-            w3 = Arkiv(
+            logging.debug("Retrieving offers")
+            write_w3 = Arkiv(
                 web3.HTTPProvider(
                     endpoint_uri=self.client.base_url, session=self.client
                 )
             )
-            result = w3.arkiv.query_entities(
-                query='ArkivEntityType="StressedEntity"',
-                options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
-            )
-
-            logging.debug(f"Result: {result} (user: {self.id})")
-            entities = [entity for entity in result]
-            logging.info(f"Keys: {len(entities)}")
+            with self.read_endpoint(write_w3) as endpoint:
+                w3 = endpoint.w3
+                query = 'ArkivEntityType="StressedEntity"'
+                with self._traced(OP_QUERY, "retrieve_keys_to_count", query=query):
+                    result = w3.arkiv.query_entities(
+                        query=query,
+                        options=to_query_options(fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE),
+                    )
+
+                    logging.debug("Result: %s (user: %s)", result, self.id)
+                    entities = [entity for entity in result]
+            logging.debug("Keys: %s", len(entities))
         except Exception as e:
             logging.error(
                 f"Error in retrieve_keys_to_count (user: {self.id}): {e}", exc_info=True
@@ -742,17 +1090,27 @@ class ArkivL3User(JsonRpcUser):
                 gb_container = launch_image(config.image_to_run)
 
             w3 = self._initialize_account_and_w3()
+            self.wait_for_write_slot()
 
             nonce = w3.eth.get_transaction_count(self.account.address)
-            logging.info(f"Nonce: {nonce}")
+            logging.debug("Nonce: %s", nonce)
 
             start_time = time.perf_counter()
-            w3.arkiv.create_entity(
-                payload=simple_payload,
+            with self._traced(
+                OP_CREATE,
+                "store_simple_payload",
+                len(simple_payload),
+                1,
                 content_type="application/json",
-                attributes={"GolemBaseMarketplace": "Offer", "projectId": "ArkivStressTest"},
-                btl=2592000,  # 30 days
-            )
+                attributes=[{"GolemBaseMarketplace": "Offer", "projectId": "ArkivStressTest"}],
+                expires_in=2592000,
+            ), tx_span("store_simple_payload"):
+                w3.arkiv.create_entity(
+                    payload=simple_payload,
+                    content_type="application/json",
+                    attributes={"GolemBaseMarketplace": "Offer", "projectId": "ArkivStressTest"},
+                    btl=2592000,  # 30 days
+                )
             duration = timedelta(seconds=time.perf_counter() - start_time)
 
             Metrics.get_metrics().record_transaction(len(simple_payload), duration)
@@ -1,5 +1,4 @@
 import logging
-import logging.config
 import time
 import itertools
 import sys
@@ -28,6 +27,7 @@ from golem_base_sdk.types import (
 
 import stress.tools.config as config
 from stress.tools.utils import launch_image, build_account_path
+from stress.tools.logging_setup import configure_logging
 
 # JSON data as one-line Python string
 # offer_json_data = b'{"offer":{"constraints":"(&\\n  (golem.srv.comp.expiration>1653219330118)\\n  (golem.node.debug.subnet=0987)\\n)","offerId":"7f2f81f213dd48549e080d774dbf1bc2-076a8cbae6546e5f158e5b4d3a869f25a8e2ae426279a691e7ee45315efa3d83","properties":{"golem":{"activity":{"caps":{"transfer":{"protocol":["http","https","gftp"]}}},"com":{"payment":{"debit-notes":{"accept-timeout?":240},"platform":{"erc20-rinkeby-tglm":{"address":"0x86a269498fb5270f20bdc6fdcf6039122b0d3b23"},"zksync-rinkeby-tglm":{"address":"0x86a269498fb5270f20bdc6fdcf6039122b0d3b23"}}},"pricing":{"model":{"@tag":"linear","linear":{"coeffs":[0.0002777777777777778,0.001388888888888889,0.0]}}},"scheme":"payu","usage":{"vector":["golem.usage.duration_sec","golem.usage.cpu_sec"]}},"inf":{"cpu":{"architecture":"x86_64","capabilities":["sse3","pclmulqdq","dtes64","monitor","dscpl","vmx","eist","tm2","ssse3","fma","cmpxchg16b","pdcm","pcid","sse41","sse42","x2apic","movbe","popcnt","tsc_deadline","aesni","xsave","osxsave","avx","f16c","rdrand","fpu","vme","de","pse","tsc","msr","pae","mce","cx8","apic","sep","mtrr","pge","mca","cmov","pat","pse36","clfsh","ds","acpi","mmx","fxsr","sse","sse2","ss","htt","tm","pbe","fsgsbase","adjust_msr","smep","rep_movsb_stosb","invpcid","deprecate_fpu_cs_ds","mpx","rdseed","rdseed","adx","smap","clflushopt","processor_trace","sgx","sgx_lc"],"cores":6,"model":"Stepping 10 Family 6 Model 158","threads":11,"vendor":"GenuineIntel"},"mem":{"gib":28.0},"storage":{"gib":57.276745605468754}},"node":{"debug":{"subnet":"0987"},"id":{"name":"nieznanysprawiciel-laptop-Provider-2"}},"runtime":{"capabilities":["vpn"],"name":"vm","version":"0.2.10"},"srv":{"caps":{"multi-activity":true}}}},"providerId":"0x86a269498fb5270f20bdc6fdcf6039122b0d3b23","timestamp":"2022-05-22T11:35:49.290821396Z"},"proposedSignature":"NoSignature","state":"Pending","timestamp":"2022-05-22T11:35:49.290821396Z","validTo":"2022-05-22T12:35:49.280650Z"}'
@@ -121,28 +121,7 @@ class GolemBaseUser(FastHttpUser):
         super().__init__(*args, **kwargs)
         self.id = 0
 
-        logging.config.dictConfig(
-            {
-                "version": 1,
-                "formatters": {
-                    "default": {
-                        "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-                    }
-                },
-                "handlers": {
-                    "console": {
-                        "class": "logging.StreamHandler",
-                        "formatter": "default",
-                    },
-                    "file": {
-                        "class": "logging.FileHandler",
-                        "formatter": "default",
-                        "filename": "locust.log",
-                    },
-                },
-                "root": {"handlers": ["console", "file"], "level": config.log_level},
-            }
-        )
+        configure_logging()
 
     def on_start(self):
         self.id = next(id_iterator)
@@ -191,7 +170,7 @@ class GolemBaseUser(FastHttpUser):
                     raise Exception("Not enough balance to send transaction")
 
             nonce = w3.eth.get_transaction_count(account.address)
-            logging.info(f"Nonce: {nonce}")
+            logging.debug("Nonce: %s", nonce)
 
             logging.info(f"Signing transaction with key: {account.key}")
             signed_tx = account.sign_transaction(prepare_tx_data(account, nonce))
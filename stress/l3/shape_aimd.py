@@ -0,0 +1,239 @@
+"""
+AIMD saturation search for L3 load tests.
+
+A custom LoadTestShape that searches for the highest sustainable load in a single
+run: every AIMD_INTERVAL_SEC it compares the p95 latency of the last interval with
+AIMD_P95_SLO_MS and the mempool growth with AIMD_MEMPOOL_GROWTH_LIMIT (tx/s), then
+adds AIMD_STEP_USERS users when both are within limits or multiplies the user count
+by AIMD_DECREASE_FACTOR when either is violated.
+
+Latency comes from one of two sources (AIMD_SLO_SOURCE):
+  - locust            p95 of the Locust request stats (AIMD_SLO_REQUEST selects one
+                      request name, empty = aggregated); works with distributed runs
+  - transaction_time  p95 of the loadtest_transaction_time_milliseconds histogram of
+                      this process; local runs only, a distributed run (master) falls
+                      back to the Locust stats, which aggregate all workers
+
+When the run ends (AIMD_DURATION_SEC or Ctrl+C) the throughput/latency curve, its knee
+(highest throughput / p95 ratio) and the highest load that stayed within the SLO are
+logged and written to AIMD_REPORT_FILE.
+
+Usage (combine with any user locustfile):
+    locust -f stress/l3/locustfile.py,stress/l3/shape_aimd.py --host=http://localhost:8545 --headless
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+
+from locust import LoadTestShape, events
+from locust.runners import MasterRunner
+
+# Add the project root (stress-tests/) to Python path so we can import stress.*
+file_dir = Path(__file__).resolve().parent
+project_root = file_dir.parent.parent  # l3/ -> stress/ -> stress-tests/
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from stress.tools.capacity import (
+    AimdController,
+    CapacitySample,
+    find_knee,
+    histogram_percentile,
+    histogram_snapshot,
+    max_sustainable,
+    read_txpool_size,
+    write_capacity_report,
+)
+from stress.tools.metrics import Metrics
+
+# =============================================================================
+# Configuration (env-overridable)
+# =============================================================================
+
+AIMD_INITIAL_USERS = int(os.getenv("AIMD_INITIAL_USERS", "1"))
+AIMD_MIN_USERS = int(os.getenv("AIMD_MIN_USERS", "1"))
+AIMD_MAX_USERS = int(os.getenv("AIMD_MAX_USERS", "500"))
+AIMD_STEP_USERS = int(os.getenv("AIMD_STEP_USERS", "2"))
+AIMD_DECREASE_FACTOR = float(os.getenv("AIMD_DECREASE_FACTOR", "0.5"))
+AIMD_SPAWN_RATE = float(os.getenv("AIMD_SPAWN_RATE", "5"))
+AIMD_INTERVAL_SEC = int(os.getenv("AIMD_INTERVAL_SEC", "30"))
+AIMD_DURATION_SEC = int(os.getenv("AIMD_DURATION_SEC", "1800"))
+
+AIMD_P95_SLO_MS = float(os.getenv("AIMD_P95_SLO_MS", "5000"))
+AIMD_SLO_SOURCE = os.getenv("AIMD_SLO_SOURCE", "locust")  # locust or transaction_time
+AIMD_SLO_REQUEST = os.getenv("AIMD_SLO_REQUEST", "")
+
+AIMD_MEMPOOL_GROWTH_LIMIT = float(os.getenv("AIMD_MEMPOOL_GROWTH_LIMIT", "5"))
+AIMD_MEMPOOL_RPC_URL = os.getenv("AIMD_MEMPOOL_RPC_URL", "")  # defaults to --host
+
+AIMD_REPORT_FILE = os.getenv("AIMD_REPORT_FILE", "aimd_capacity_report.json")
+
+
+class AimdLoadShape(LoadTestShape):
+    """Load shape driven by an AIMD controller holding a latency SLO and a mempool growth limit."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.controller = AimdController(
+            initial_users=AIMD_INITIAL_USERS,
+            min_users=AIMD_MIN_USERS,
+            max_users=AIMD_MAX_USERS,
+            additive_step=AIMD_STEP_USERS,
+            decrease_factor=AIMD_DECREASE_FACTOR,
+            p95_slo_ms=AIMD_P95_SLO_MS,
+            mempool_growth_limit=AIMD_MEMPOOL_GROWTH_LIMIT,
+        )
+        self.samples: list[CapacitySample] = []
+        self.next_evaluation = AIMD_INTERVAL_SEC
+        self.report_written = False
+
+        self._last_mempool_size: int | None = None
+        self._last_mempool_time = 0.0
+        self._last_histogram: list[float] = []
+        self._last_tx_count = 0.0
+        self._last_tx_time = 0.0
+        self._warned_distributed = False
+
+    # -------------------------------------------------------------------------
+    # Measurements of the last interval
+    # -------------------------------------------------------------------------
+
+    def _locust_window(self) -> tuple[float, float]:
+        """(throughput in requests/s, p95 in ms) over Locust's rolling stats window."""
+        stats = self.runner.stats
+        entry = stats.total
+        if AIMD_SLO_REQUEST:
+            entry = next(
+                (e for e in stats.entries.values() if e.name == AIMD_SLO_REQUEST),
+                stats.total,
+            )
+        return entry.current_rps, entry.get_current_response_time_percentile(0.95) or 0.0
+
+    def _transaction_time_window(self, run_time: float) -> tuple[float, float]:
+        """(throughput in transactions/s, p95 in ms) since the previous evaluation."""
+        metrics = Metrics.get_metrics()
+        bounds, counts = histogram_snapshot(metrics.transaction_time)
+        p95 = histogram_percentile(bounds, self._last_histogram, counts, 0.95)
+        self._last_histogram = counts
+
+        tx_count = metrics.registry.get_sample_value("loadtest_transactions_total") or 0.0
+        elapsed = max(run_time - self._last_tx_time, 1e-9)
+        throughput = (tx_count - self._last_tx_count) / elapsed
+        self._last_tx_count, self._last_tx_time = tx_count, run_time
+        return throughput, p95 or 0.0
+
+    def _mempool_growth(self, run_time: float) -> float:
+        """Mempool growth (pending + queued) in transactions per second since the previous evaluation."""
+        rpc_url = AIMD_MEMPOOL_RPC_URL or self.runner.environment.host
+        size = read_txpool_size(rpc_url) if rpc_url else None
+        if size is None:
+            return 0.0
+
+        growth = 0.0
+        if self._last_mempool_size is not None:
+            growth = (size - self._last_mempool_size) / max(run_time - self._last_mempool_time, 1e-9)
+        self._last_mempool_size, self._last_mempool_time = size, run_time
+        return growth
+
+    # -------------------------------------------------------------------------
+    # Shape
+    # -------------------------------------------------------------------------
+
+    def tick(self):
+        run_time = self.get_run_time()
+        if run_time >= AIMD_DURATION_SEC:
+            self.write_report()
+            return None
+
+        if run_time >= self.next_evaluation:
+            self.next_evaluation = run_time + AIMD_INTERVAL_SEC
+            self._evaluate(run_time)
+
+        return self.controller.users, AIMD_SPAWN_RATE
+
+    def _slo_source(self) -> str:
+        if AIMD_SLO_SOURCE == "transaction_time" and isinstance(self.runner, MasterRunner):
+            if not self._warned_distributed:
+                self._warned_distributed = True
+                logging.warning(
+                    "AIMD: the transaction_time histogram only covers the master process, "
+                    "using the Locust stats of all workers instead"
+                )
+            return "locust"
+        return AIMD_SLO_SOURCE
+
+    def _evaluate(self, run_time: float):
+        if self._slo_source() == "transaction_time":
+            throughput, p95 = self._transaction_time_window(run_time)
+        else:
+            throughput, p95 = self._locust_window()
+        mempool_growth = self._mempool_growth(run_time)
+
+        users = self.controller.users
+        violated = self.controller.violates_slo(p95, mempool_growth)
+        self.samples.append(
+            CapacitySample(
+                run_time=run_time,
+                users=users,
+                throughput=throughput,
+                p95_ms=p95,
+                mempool_growth=mempool_growth,
+                slo_violated=violated,
+            )
+        )
+        new_users = self.controller.update(p95, mempool_growth)
+        logging.info(
+            "AIMD: users %s -> %s (throughput: %.2f/s, p95: %.0fms, "
+            "mempool growth: %.2f tx/s, SLO violated: %s)",
+            users,
+            new_users,
+            throughput,
+            p95,
+            mempool_growth,
+            violated,
+        )
+
+    def write_report(self):
+        if self.report_written:
+            return
+        self.report_written = True
+
+        knee = find_knee(self.samples)
+        sustainable = max_sustainable(self.samples)
+        if knee:
+            logging.info(
+                "AIMD knee: %s users, %.2f/s at p95 %.0fms",
+                knee.users,
+                knee.throughput,
+                knee.p95_ms,
+            )
+        if sustainable:
+            logging.info(
+                "AIMD max sustainable: %s users, %.2f/s at p95 %.0fms",
+                sustainable.users,
+                sustainable.throughput,
+                sustainable.p95_ms,
+            )
+        write_capacity_report(
+            AIMD_REPORT_FILE,
+            self.samples,
+            {
+                "p95_slo_ms": AIMD_P95_SLO_MS,
+                "slo_source": AIMD_SLO_SOURCE,
+                "slo_request": AIMD_SLO_REQUEST,
+                "mempool_growth_limit": AIMD_MEMPOOL_GROWTH_LIMIT,
+                "interval_sec": AIMD_INTERVAL_SEC,
+                "step_users": AIMD_STEP_USERS,
+                "decrease_factor": AIMD_DECREASE_FACTOR,
+            },
+        )
+
+
+@events.test_stop.add_listener
+def on_test_stop_aimd(environment, **kwargs):
+    """Write the report also when the run is stopped before AIMD_DURATION_SEC."""
+    shape = getattr(environment, "shape_class", None)
+    if isinstance(shape, AimdLoadShape):
+        shape.write_report()
@@ -0,0 +1,315 @@
+"""
+Staircase capacity-curve runner with steady-state detection.
+
+A custom LoadTestShape that walks through the user counts in STAIRCASE_STEPS and holds
+each level until the system is in steady state instead of for a fixed time. Every
+STAIRCASE_SAMPLE_SEC it samples the Metrics of this process (transactions/s and mean
+transaction_time); a step is steady once the last STAIRCASE_CV_WINDOW samples of both
+have a coefficient of variation below STAIRCASE_MAX_CV. Steps are held at least
+STAIRCASE_MIN_STEP_SEC and at most STAIRCASE_MAX_STEP_SEC (a step that hits the maximum
+is reported as not steady).
+
+For every step the steady window is summarised: transaction time percentiles,
+transactions and entities per second and, when STAIRCASE_NODE_METRICS_URL points to a
+node's Prometheus endpoint, node CPU (cores) and resident memory. The results are
+written to STAIRCASE_RESULTS_FILE as flat {"key": {"value": ...}} JSON that can be
+pushed with push-results.py.
+
+Metrics are per process. In a distributed run the master has none, so there the steps
+are measured from the Locust stats of all workers instead: requests/s and response
+times of STAIRCASE_REQUEST (empty = aggregated), without entities/s.
+
+Usage (combine with any user locustfile that records Metrics transactions):
+    locust -f stress/l3/locustfile.py,stress/l3/shape_staircase.py --host=http://localhost:8545 --headless
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+from locust import LoadTestShape, events
+from locust.runners import MasterRunner
+from prometheus_client.parser import text_string_to_metric_families
+
+# Add the project root (stress-tests/) to Python path so we can import stress.*
+file_dir = Path(__file__).resolve().parent
+project_root = file_dir.parent.parent  # l3/ -> stress/ -> stress-tests/
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from stress.tools.capacity import histogram_percentile, histogram_snapshot, is_steady
+from stress.tools.metrics import Metrics
+
+# =============================================================================
+# Configuration (env-overridable)
+# =============================================================================
+
+STAIRCASE_STEPS = [int(users) for users in os.getenv("STAIRCASE_STEPS", "1,2,5,10,20,50").split(",")]
+STAIRCASE_SPAWN_RATE = float(os.getenv("STAIRCASE_SPAWN_RATE", "5"))
+STAIRCASE_SAMPLE_SEC = float(os.getenv("STAIRCASE_SAMPLE_SEC", "5"))
+STAIRCASE_CV_WINDOW = int(os.getenv("STAIRCASE_CV_WINDOW", "6"))
+STAIRCASE_MAX_CV = float(os.getenv("STAIRCASE_MAX_CV", "0.1"))
+STAIRCASE_MIN_STEP_SEC = float(os.getenv("STAIRCASE_MIN_STEP_SEC", "30"))
+STAIRCASE_MAX_STEP_SEC = float(os.getenv("STAIRCASE_MAX_STEP_SEC", "600"))
+
+STAIRCASE_NODE_METRICS_URL = os.getenv(
+    "STAIRCASE_NODE_METRICS_URL", os.getenv("RETH_SEQUENCER_METRICS_URL", "")
+)
+STAIRCASE_RESULTS_FILE = os.getenv("STAIRCASE_RESULTS_FILE", "staircase_results.json")
+STAIRCASE_REQUEST = os.getenv("STAIRCASE_REQUEST", "")  # Locust request measured in distributed runs
+
+HTTP_TIMEOUT_SECONDS = 5
+
+
+@dataclass
+class MetricsSnapshot:
+    """Cumulative Metrics and node counters at one point in time."""
+
+    at: float
+    transactions: float
+    entities: float | None
+    tx_time_sum: float
+    tx_time_count: float
+    tx_time_bounds: list[float]
+    tx_time_buckets: list[float]
+    node_cpu_seconds: float | None = None
+    node_rss_bytes: float | None = None
+
+
+def _scrape_node_resources(url: str) -> tuple[float | None, float | None]:
+    """Return (process CPU seconds, resident memory bytes) from a Prometheus endpoint."""
+    try:
+        response = requests.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+    except Exception as e:
+        logging.warning("Could not scrape node metrics from %s: %s", url, e)
+        return None, None
+
+    cpu_seconds, rss_bytes = None, None
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name.endswith("process_cpu_seconds_total"):
+                cpu_seconds = float(sample.value)
+            elif sample.name.endswith("process_resident_memory_bytes"):
+                rss_bytes = float(sample.value)
+    return cpu_seconds, rss_bytes
+
+
+def _stats_entry(stats):
+    if STAIRCASE_REQUEST:
+        return next((e for e in stats.entries.values() if e.name == STAIRCASE_REQUEST), stats.total)
+    return stats.total
+
+
+def take_snapshot(stats=None) -> MetricsSnapshot:
+    """
+    Snapshot the transaction Metrics of this process and, if configured, the node resources.
+
+    With stats (the master's Locust stats) the requests of all workers are used instead.
+    """
+    metrics = Metrics.get_metrics()
+    bounds, buckets = histogram_snapshot(metrics.transaction_time)
+    if stats is None:
+        registry = metrics.registry
+        transactions = registry.get_sample_value("loadtest_transactions_total") or 0.0
+        entities = registry.get_sample_value("loadtest_entities_created_total") or 0.0
+        tx_time_sum = registry.get_sample_value("loadtest_transaction_time_milliseconds_sum") or 0.0
+        tx_time_count = registry.get_sample_value("loadtest_transaction_time_milliseconds_count") or 0.0
+    else:
+        entry = _stats_entry(stats)
+        # Same buckets as the histogram, filled from Locust's response times (rounded ms -> count)
+        response_times = dict(entry.response_times)
+        buckets = [sum(count for ms, count in response_times.items() if ms <= bound) for bound in bounds]
+        transactions = entry.num_requests
+        entities = None
+        tx_time_sum = entry.total_response_time
+        tx_time_count = entry.num_requests
+
+    cpu_seconds, rss_bytes = None, None
+    if STAIRCASE_NODE_METRICS_URL:
+        cpu_seconds, rss_bytes = _scrape_node_resources(STAIRCASE_NODE_METRICS_URL)
+
+    return MetricsSnapshot(
+        at=time.monotonic(),
+        transactions=transactions,
+        entities=entities,
+        tx_time_sum=tx_time_sum,
+        tx_time_count=tx_time_count,
+        tx_time_bounds=bounds,
+        tx_time_buckets=buckets,
+        node_cpu_seconds=cpu_seconds,
+        node_rss_bytes=rss_bytes,
+    )
+
+
+def summarize_window(users: int, start: MetricsSnapshot, end: MetricsSnapshot, steady: bool) -> dict:
+    """Per-step numbers between two snapshots."""
+    elapsed = max(end.at - start.at, 1e-9)
+    tx_count = end.tx_time_count - start.tx_time_count
+
+    def percentile(q: float) -> float | None:
+        return histogram_percentile(end.tx_time_bounds, start.tx_time_buckets, end.tx_time_buckets, q)
+
+    node_cpu = None
+    if start.node_cpu_seconds is not None and end.node_cpu_seconds is not None:
+        node_cpu = (end.node_cpu_seconds - start.node_cpu_seconds) / elapsed
+
+    return {
+        "users": users,
+        "steady": steady,
+        "window_sec": elapsed,
+        "tx_per_sec": (end.transactions - start.transactions) / elapsed,
+        "entities_per_sec": (
+            (end.entities - start.entities) / elapsed
+            if start.entities is not None and end.entities is not None
+            else None
+        ),
+        "tx_time_mean_ms": (end.tx_time_sum - start.tx_time_sum) / tx_count if tx_count else None,
+        "tx_time_p50_ms": percentile(0.50),
+        "tx_time_p95_ms": percentile(0.95),
+        "tx_time_p99_ms": percentile(0.99),
+        "node_cpu_cores": node_cpu,
+        "node_rss_bytes": end.node_rss_bytes,
+    }
+
+
+def to_results(steps: list[dict]) -> dict:
+    """Flatten step summaries into the {"key": {"value": ...}} format used by push-results.py."""
+    results = {}
+    for index, step in enumerate(steps, start=1):
+        prefix = f"step{index}"
+        results[f"{prefix}Users"] = {"value": step["users"]}
+        results[f"{prefix}Steady"] = {"value": int(step["steady"])}
+        results[f"{prefix}TxPerSec"] = {"value": round(step["tx_per_sec"], 3)}
+        if step["entities_per_sec"] is not None:
+            results[f"{prefix}EntitiesPerSec"] = {"value": round(step["entities_per_sec"], 3)}
+        for key, name in (
+            ("tx_time_p50_ms", "P50Ms"),
+            ("tx_time_p95_ms", "P95Ms"),
+            ("tx_time_p99_ms", "P99Ms"),
+        ):
+            if step[key] is not None:
+                results[f"{prefix}{name}"] = {"value": round(step[key], 1)}
+        if step["node_cpu_cores"] is not None:
+            results[f"{prefix}NodeCpuCores"] = {"value": round(step["node_cpu_cores"], 3)}
+        if step["node_rss_bytes"] is not None:
+            results[f"{prefix}NodeRssBytes"] = {
+                "value": int(step["node_rss_bytes"]),
+                "display": f"{step['node_rss_bytes'] / 2**20:.0f} MiB",
+            }
+
+    if steps:
+        best = max(steps, key=lambda s: s["tx_per_sec"])
+        results["maxTxPerSec"] = {"value": round(best["tx_per_sec"], 3)}
+        entities_per_sec = [s["entities_per_sec"] for s in steps if s["entities_per_sec"] is not None]
+        if entities_per_sec:
+            results["maxEntitiesPerSec"] = {"value": round(max(entities_per_sec), 3)}
+        results["maxTxPerSecUsers"] = {"value": best["users"]}
+    return results
+
+
+class StaircaseLoadShape(LoadTestShape):
+    """Stepped load shape that advances as soon as each step reaches steady state."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.step_index = 0
+        self.step_started = 0.0
+        self.next_sample = 0.0
+        self.snapshots: list[MetricsSnapshot] = []
+        self.throughput_samples: list[float] = []
+        self.latency_samples: list[float] = []
+        self.steps: list[dict] = []
+        self.results_written = False
+
+    def _locust_stats(self):
+        """The Locust stats of all workers in a distributed run (the master has no Metrics)."""
+        return self.runner.stats if isinstance(self.runner, MasterRunner) else None
+
+    def _start_step(self, run_time: float):
+        self.step_started = run_time
+        self.next_sample = run_time + STAIRCASE_SAMPLE_SEC
+        self.snapshots = [take_snapshot(self._locust_stats())]
+        self.throughput_samples = []
+        self.latency_samples = []
+        logging.info(
+            "Staircase: step %s/%s with %s users",
+            self.step_index + 1,
+            len(STAIRCASE_STEPS),
+            STAIRCASE_STEPS[self.step_index],
+        )
+
+    def _sample(self):
+        previous, current = self.snapshots[-1], take_snapshot(self._locust_stats())
+        self.snapshots.append(current)
+
+        elapsed = max(current.at - previous.at, 1e-9)
+        self.throughput_samples.append((current.transactions - previous.transactions) / elapsed)
+        tx_count = current.tx_time_count - previous.tx_time_count
+        self.latency_samples.append(
+            (current.tx_time_sum - previous.tx_time_sum) / tx_count if tx_count else 0.0
+        )
+
+    def _finish_step(self, steady: bool):
+        # The steady window is the last STAIRCASE_CV_WINDOW samples (or the whole step when not steady)
+        window_start = self.snapshots[-STAIRCASE_CV_WINDOW - 1] if steady else self.snapshots[0]
+        summary = summarize_window(STAIRCASE_STEPS[self.step_index], window_start, self.snapshots[-1], steady)
+        self.steps.append(summary)
+        logging.info(
+            "Staircase: step with %s users done (steady: %s, tx/s: %.2f, p95: %s ms)",
+            summary["users"],
+            steady,
+            summary["tx_per_sec"],
+            summary["tx_time_p95_ms"],
+        )
+        self.step_index += 1
+
+    def tick(self):
+        run_time = self.get_run_time()
+
+        if self.step_index >= len(STAIRCASE_STEPS):
+            self.write_results()
+            return None
+
+        if not self.snapshots:
+            self._start_step(run_time)
+
+        if run_time >= self.next_sample:
+            self.next_sample = run_time + STAIRCASE_SAMPLE_SEC
+            self._sample()
+
+            held = run_time - self.step_started
+            steady = is_steady(self.throughput_samples, STAIRCASE_CV_WINDOW, STAIRCASE_MAX_CV) and is_steady(
+                self.latency_samples, STAIRCASE_CV_WINDOW, STAIRCASE_MAX_CV
+            )
+            if (steady and held >= STAIRCASE_MIN_STEP_SEC) or held >= STAIRCASE_MAX_STEP_SEC:
+                self._finish_step(steady)
+                if self.step_index >= len(STAIRCASE_STEPS):
+                    self.write_results()
+                    return None
+                self._start_step(run_time)
+
+        return STAIRCASE_STEPS[self.step_index], STAIRCASE_SPAWN_RATE
+
+    def write_results(self):
+        if self.results_written:
+            return
+        self.results_written = True
+        with open(STAIRCASE_RESULTS_FILE, "w") as f:
+            json.dump(to_results(self.steps), f, indent=2)
+        logging.info(
+            "Staircase results for %s steps written to %s", len(self.steps), STAIRCASE_RESULTS_FILE
+        )
+
+
+@events.test_stop.add_listener
+def on_test_stop_staircase(environment, **kwargs):
+    """Write the steps completed so far also when the run is stopped early."""
+    shape = getattr(environment, "shape_class", None)
+    if isinstance(shape, StaircaseLoadShape):
+        shape.write_results()
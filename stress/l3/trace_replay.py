@@ -0,0 +1,297 @@
+"""
+Locust replayer for workload traces recorded with TRACE_RECORD_FILE.
+
+Every Locust user replays the stream of one recorded user, in the recorded order,
+so per-user ordering (create before update of the same entity, nonce order) is
+preserved. Streams are scheduled against a shared start time:
+
+  - TRACE_REPLAY_SPEED=1   replays at the recorded pace
+  - TRACE_REPLAY_SPEED=N   replays N times faster
+  - TRACE_REPLAY_SPEED=0   replays as fast as possible (no waiting between operations)
+
+Entity keys created during the replay are mapped to the keys recorded in the trace,
+so updates, extends, deletes and owner changes issued later hit the newly created
+entities. The key map is shared by all streams, as change_owner hands an entity over to
+the account of another recorded user; the replayed change_owner targets the account of
+the user replaying that user's stream. Run the replay with as many users as there are
+streams in the trace and a single Locust process (each process replays the whole trace).
+
+Every recording process writes its own file (see stress/tools/trace.py); TRACE_REPLAY_FILE
+may be a glob, the streams of all matching files are replayed together.
+
+Usage:
+    TRACE_REPLAY_FILE='run-*.trace' locust -f stress/l3/trace_replay.py --host=http://localhost:8545 --users <streams>
+"""
+
+import glob
+import logging
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from arkiv import Arkiv
+from arkiv.types import KEY, Operations
+from arkiv.utils import to_create_op, to_query_options
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from locust import constant, events, task
+from locust.exception import StopUser
+
+# Add the project root (stress-tests/) to Python path so we can import stress.*
+file_dir = Path(__file__).resolve().parent
+project_root = file_dir.parent.parent  # l3/ -> stress/ -> stress-tests/
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import stress.tools.config as config
+from stress.tools.json_rpc_user import JsonRpcUser
+from stress.tools.metrics import Metrics
+from stress.tools.payload_pool import PayloadPool
+from stress.tools.utils import build_account_path
+from stress.tools.trace import (
+    OP_CHANGE_OWNER,
+    OP_CREATE,
+    OP_DELETE,
+    OP_EXTEND,
+    OP_NAMES,
+    OP_QUERY,
+    OP_UPDATE,
+    TraceRecord,
+    group_by_user,
+    read_trace,
+)
+
+# =============================================================================
+# Configuration (env-overridable)
+# =============================================================================
+
+TRACE_REPLAY_FILE = os.getenv("TRACE_REPLAY_FILE", "")
+TRACE_REPLAY_SPEED = float(os.getenv("TRACE_REPLAY_SPEED", "1"))
+
+MAX_RESULTS_PER_PAGE: int = 1_000_000_000
+
+
+# =============================================================================
+# Shared replay state (loaded once per process)
+# =============================================================================
+
+class ReplayState:
+    """Trace streams, the recorded -> replayed entity keys and the shared replay start time."""
+
+    streams: List[List[TraceRecord]] = []
+    key_map: Dict[str, str] = {}
+    started_at: Optional[float] = None
+
+    @classmethod
+    def entity_key(cls, recorded_key: str) -> str:
+        """Key of the replayed entity for a key recorded in the trace."""
+        return cls.key_map.get(recorded_key, recorded_key)
+
+    @classmethod
+    def replay_address(cls, recorded_user_id: int, recorded_address: str) -> str:
+        """Account address of the user replaying the stream of a recorded user."""
+        for stream_index, stream in enumerate(cls.streams):
+            if stream[0].user_id == recorded_user_id:
+                return Account.from_mnemonic(
+                    config.mnemonic, account_path=build_account_path(stream_index)
+                ).address
+        return recorded_address
+
+    @classmethod
+    def load(cls) -> None:
+        if cls.streams:
+            return
+        if not TRACE_REPLAY_FILE:
+            raise RuntimeError("TRACE_REPLAY_FILE must point to a recorded workload trace")
+
+        for path in sorted(glob.glob(TRACE_REPLAY_FILE)) or [TRACE_REPLAY_FILE]:
+            by_user = group_by_user(read_trace(path))
+            cls.streams.extend(by_user[user_id] for user_id in sorted(by_user))
+        logging.info(
+            "Loaded trace %s: %s user streams, %s operations",
+            TRACE_REPLAY_FILE,
+            len(cls.streams),
+            sum(len(stream) for stream in cls.streams),
+        )
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    ReplayState.load()
+    ReplayState.started_at = time.perf_counter()
+    logging.info(
+        "Replaying %s streams at speed %s",
+        len(ReplayState.streams),
+        "max" if TRACE_REPLAY_SPEED <= 0 else f"{TRACE_REPLAY_SPEED}x",
+    )
+
+
+# =============================================================================
+# Locust User
+# =============================================================================
+
+class TraceReplayUser(JsonRpcUser):
+    """Locust user that re-issues one recorded user stream."""
+
+    wait_time = constant(0)
+
+    stream: List[TraceRecord]
+    position: int
+
+    account: Optional[LocalAccount]
+    w3: Optional[Arkiv]
+
+    def on_start(self) -> None:
+        super().on_start()
+        ReplayState.load()
+        if self.id >= len(ReplayState.streams):
+            logging.warning(
+                "No recorded stream for user %s (%s streams in trace)",
+                self.id,
+                len(ReplayState.streams),
+            )
+            raise StopUser()
+
+        self.stream = ReplayState.streams[self.id]
+        self.position = 0
+        self.account = None
+        self.w3 = None
+        self._initialize_account_and_w3()
+
+    def _wait_until_scheduled(self, record: TraceRecord) -> None:
+        """Sleep until the (time-scaled) moment the operation was issued in the recording."""
+        if TRACE_REPLAY_SPEED <= 0 or ReplayState.started_at is None:
+            return
+        due = ReplayState.started_at + record.timestamp / TRACE_REPLAY_SPEED
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    # -------------------------------------------------------------------------
+    # Operation replay
+    # -------------------------------------------------------------------------
+
+    def _replay_create(self, record: TraceRecord, name: str) -> None:
+        w3 = self._initialize_account_and_w3()
+        details = record.details
+        attributes_list = details.get("attributes") or [{}]
+        create_ops = [
+            to_create_op(
+                payload=PayloadPool.get_pool().payload(record.payload_size),
+                content_type=details.get("content_type", "application/octet-stream"),
+                attributes=attributes_list[i % len(attributes_list)],
+                expires_in=int(details.get("expires_in", 1800)),
+            )
+            for i in range(max(record.entity_count, 1))
+        ]
+
+        self.wait_for_write_slot()
+        start = time.perf_counter()
+        receipt = self._fire_locust_request(
+            name,
+            lambda: w3.arkiv.execute(Operations(creates=create_ops)),
+            entity_count=len(create_ops),
+        )
+        Metrics.get_metrics().record_transaction(
+            record.payload_size * len(create_ops),
+            timedelta(seconds=time.perf_counter() - start),
+            len(create_ops),
+        )
+
+        # Remember which new key corresponds to each recorded key
+        for recorded_key, create in zip(details.get("keys") or [], receipt.creates):
+            new_key = getattr(create, "key", None)
+            if recorded_key and new_key is not None:
+                ReplayState.key_map[recorded_key] = str(new_key)
+
+    def _replay_update(self, record: TraceRecord, name: str) -> None:
+        w3 = self._initialize_account_and_w3()
+        details = record.details
+        entity_key = ReplayState.entity_key(details.get("key", ""))
+        self.wait_for_write_slot()
+        self._fire_locust_request(
+            name,
+            lambda: w3.arkiv.update_entity(
+                entity_key,
+                payload=PayloadPool.get_pool().payload(record.payload_size),
+                attributes=details.get("attributes") or {},
+                expires_in=int(details.get("expires_in", 1800)),
+            ),
+            entity_count=1,
+        )
+
+    def _replay_extend(self, record: TraceRecord, name: str) -> None:
+        w3 = self._initialize_account_and_w3()
+        details = record.details
+        entity_key = ReplayState.entity_key(details.get("key", ""))
+        self.wait_for_write_slot()
+        self._fire_locust_request(
+            name,
+            lambda: w3.arkiv.extend_entity(entity_key, extend_by=int(details.get("extend_by", 0))),
+            entity_count=1,
+        )
+
+    def _replay_delete(self, record: TraceRecord, name: str) -> None:
+        w3 = self._initialize_account_and_w3()
+        entity_key = ReplayState.entity_key(record.details.get("key", ""))
+        self.wait_for_write_slot()
+        self._fire_locust_request(
+            name, lambda: w3.arkiv.delete_entity(entity_key), entity_count=1
+        )
+
+    def _replay_change_owner(self, record: TraceRecord, name: str) -> None:
+        w3 = self._initialize_account_and_w3()
+        details = record.details
+        entity_key = ReplayState.entity_key(details.get("key", ""))
+        new_owner = details.get("new_owner", "")
+        if details.get("new_owner_user") is not None:
+            new_owner = ReplayState.replay_address(int(details["new_owner_user"]), new_owner)
+        self.wait_for_write_slot()
+        self._fire_locust_request(
+            name, lambda: w3.arkiv.change_owner(entity_key, new_owner), entity_count=1
+        )
+
+    def _replay_query(self, record: TraceRecord, name: str) -> None:
+        w3 = self._initialize_account_and_w3()
+        query = record.details.get("query", "")
+        self._fire_locust_request(
+            name,
+            lambda: sum(
+                1
+                for _ in w3.arkiv.query_entities(
+                    query=query,
+                    options=to_query_options(
+                        fields=KEY, max_results_per_page=MAX_RESULTS_PER_PAGE
+                    ),
+                )
+            ),
+        )
+
+    @task
+    def replay_next(self) -> None:
+        if self.position >= len(self.stream):
+            logging.info("User %s finished replaying %s operations", self.id, len(self.stream))
+            raise StopUser()
+
+        record = self.stream[self.position]
+        self.position += 1
+        self._wait_until_scheduled(record)
+
+        name = record.details.get("name") or OP_NAMES.get(record.op, "unknown")
+        if record.op == OP_CREATE:
+            self._replay_create(record, name)
+        elif record.op == OP_UPDATE:
+            self._replay_update(record, name)
+        elif record.op == OP_QUERY:
+            self._replay_query(record, name)
+        elif record.op == OP_EXTEND:
+            self._replay_extend(record, name)
+        elif record.op == OP_DELETE:
+            self._replay_delete(record, name)
+        elif record.op == OP_CHANGE_OWNER:
+            self._replay_change_owner(record, name)
+        else:
+            logging.warning("Skipping unknown trace operation %s (user: %s)", record.op, self.id)
@@ -0,0 +1,195 @@
+"""
+Gas-aware adaptive batch sizing for Arkiv create transactions.
+
+The batcher learns how much gas a create costs per entity and per payload byte from
+the receipts of the transactions it sized, and packs the next batch so that its
+predicted gas lands at a target fraction of the block gas limit:
+
+    gas_used - BASE_TX_GAS ~= gas_per_entity * entities + gas_per_byte * payload_bytes
+
+The two coefficients are fitted with exponentially decayed least squares (recent
+receipts weigh more, so the model follows gas price changes in the node), anchored
+by a weak prior so the very first batches are sized sensibly. Rejected transactions
+shrink the batch multiplicatively:
+
+  - "exceeds block gas limit" / "gas limit reached" halves the fill multiplier
+  - "oversized data" caps the transaction payload bytes below the rejected size
+
+and every successful transaction lets the fill multiplier recover additively (AIMD).
+"""
+
+import logging
+import time
+
+import stress.tools.config as config
+from stress.tools.entity_pool import gas_used
+from stress.tools.metrics import Metrics
+
+# Intrinsic cost of any transaction, not attributed to entities or bytes
+BASE_TX_GAS = 21_000
+
+# Prior coefficients, used until receipts outweigh them
+PRIOR_GAS_PER_ENTITY = 60_000.0
+PRIOR_GAS_PER_BYTE = 40.0
+PRIOR_WEIGHT = 1.0
+
+# Weight kept by older receipts every time a new one is added
+DECAY = 0.95
+
+# How often the block gas limit is re-read from the chain (seconds)
+GAS_LIMIT_REFRESH_SECONDS = 30
+DEFAULT_BLOCK_GAS_LIMIT = 30_000_000
+
+# Fill multiplier bounds and its additive recovery per successful transaction
+MIN_FILL_MULTIPLIER = 0.05
+FILL_RECOVERY_STEP = 0.05
+OVERSIZED_BACKOFF = 0.8
+
+GAS_LIMIT_ERRORS = ("exceeds block gas limit", "gas limit reached", "intrinsic gas too high")
+OVERSIZED_ERRORS = ("oversized data", "tx too large", "request entity too large")
+
+
+class GasModel:
+    """Decayed least squares fit of gas = gas_per_entity * entities + gas_per_byte * bytes."""
+
+    def __init__(self, decay: float = DECAY):
+        self.decay = decay
+        # Normal equation sums: [[s_ee, s_eb], [s_eb, s_bb]] * [g_e, g_b] = [s_ey, s_by]
+        self.s_ee = 0.0
+        self.s_eb = 0.0
+        self.s_bb = 0.0
+        self.s_ey = 0.0
+        self.s_by = 0.0
+        self.samples = 0
+
+    def add(self, entities: int, payload_bytes: int, gas: float):
+        """Add one observed transaction (gas excludes BASE_TX_GAS)."""
+        # Scale bytes to kB so both columns have comparable magnitude
+        e, b = float(entities), payload_bytes / 1000.0
+        d = self.decay
+        self.s_ee = self.s_ee * d + e * e
+        self.s_eb = self.s_eb * d + e * b
+        self.s_bb = self.s_bb * d + b * b
+        self.s_ey = self.s_ey * d + e * gas
+        self.s_by = self.s_by * d + b * gas
+        self.samples += 1
+
+    def coefficients(self) -> tuple[float, float]:
+        """Return (gas_per_entity, gas_per_byte)."""
+        # Prior as two pseudo observations: one entity without payload, 1 kB of payload without entity
+        prior_kb = PRIOR_GAS_PER_BYTE * 1000.0
+        s_ee = self.s_ee + PRIOR_WEIGHT
+        s_bb = self.s_bb + PRIOR_WEIGHT
+        s_ey = self.s_ey + PRIOR_WEIGHT * PRIOR_GAS_PER_ENTITY
+        s_by = self.s_by + PRIOR_WEIGHT * prior_kb
+
+        det = s_ee * s_bb - self.s_eb * self.s_eb
+        if det <= 0:
+            return PRIOR_GAS_PER_ENTITY, PRIOR_GAS_PER_BYTE
+
+        g_e = (s_ey * s_bb - self.s_eb * s_by) / det
+        g_kb = (s_ee * s_by - self.s_eb * s_ey) / det
+        # Negative coefficients are fitting noise - fall back to the prior for that term
+        if g_e <= 0:
+            g_e = PRIOR_GAS_PER_ENTITY
+        if g_kb <= 0:
+            g_kb = prior_kb
+        return g_e, g_kb / 1000.0
+
+    def predict(self, entities: int, payload_bytes: int) -> float:
+        g_e, g_b = self.coefficients()
+        return g_e * entities + g_b * payload_bytes
+
+
+class AdaptiveBatcher:
+    """
+    Process-wide batch sizer shared by all users issuing adaptive batches.
+
+    Configured with ADAPTIVE_BATCH_TARGET_FILL (fraction of the block gas limit a single
+    transaction aims for), ADAPTIVE_BATCH_MAX_ENTITIES and ADAPTIVE_BATCH_MAX_TX_BYTES.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_batcher(cls):
+        """Get the global batcher instance"""
+        if cls._instance is None:
+            cls._instance = cls(
+                target_fill=config.adaptive_batch_target_fill,
+                max_entities=config.adaptive_batch_max_entities,
+                max_tx_bytes=config.adaptive_batch_max_tx_bytes,
+            )
+            logging.info(
+                "Created adaptive batcher (target fill: %s, max entities: %s, max tx bytes: %s)",
+                config.adaptive_batch_target_fill,
+                config.adaptive_batch_max_entities,
+                config.adaptive_batch_max_tx_bytes,
+            )
+        return cls._instance
+
+    def __init__(self, target_fill: float, max_entities: int, max_tx_bytes: int):
+        self.target_fill = target_fill
+        self.max_entities = max_entities
+        self.max_tx_bytes = max_tx_bytes
+        self.model = GasModel()
+        self.fill_multiplier = 1.0
+        self.block_gas_limit = DEFAULT_BLOCK_GAS_LIMIT
+        self._gas_limit_read_at = 0.0
+
+    def _refresh_block_gas_limit(self, w3):
+        now = time.monotonic()
+        if now - self._gas_limit_read_at < GAS_LIMIT_REFRESH_SECONDS:
+            return
+        self._gas_limit_read_at = now
+        try:
+            self.block_gas_limit = int(w3.eth.get_block("latest")["gasLimit"])
+        except Exception as e:
+            logging.warning("Could not read block gas limit, keeping %s: %s", self.block_gas_limit, e)
+
+    def next_batch_size(self, w3, payload_size: int) -> int:
+        """Number of entities of `payload_size` bytes to put into the next transaction."""
+        self._refresh_block_gas_limit(w3)
+
+        target_gas = self.block_gas_limit * self.target_fill * self.fill_multiplier - BASE_TX_GAS
+        per_entity_gas = max(self.model.predict(1, payload_size), 1.0)
+        count = int(target_gas // per_entity_gas)
+
+        if payload_size > 0:
+            count = min(count, self.max_tx_bytes // payload_size)
+        count = max(1, min(count, self.max_entities))
+
+        g_e, g_b = self.model.coefficients()
+        Metrics.get_metrics().record_adaptive_batch(count, g_e, g_b, self.fill_multiplier)
+        return count
+
+    def record_receipt(self, w3, receipt, entity_count: int, payload_size: int):
+        """Learn from the gas used by a successful transaction and let the batch size recover."""
+        self.fill_multiplier = min(1.0, self.fill_multiplier + FILL_RECOVERY_STEP)
+
+        gas = gas_used(w3, receipt)
+        if gas is None:
+            return
+        self.model.add(entity_count, entity_count * payload_size, gas - BASE_TX_GAS)
+
+    def record_failure(self, entity_count: int, payload_size: int, error: BaseException):
+        """Shrink the next batches after a transaction was rejected for its size."""
+        message = str(error).lower()
+        if any(pattern in message for pattern in GAS_LIMIT_ERRORS):
+            self.fill_multiplier = max(MIN_FILL_MULTIPLIER, self.fill_multiplier / 2)
+            reason = "gas_limit"
+        elif any(pattern in message for pattern in OVERSIZED_ERRORS):
+            rejected_bytes = entity_count * payload_size
+            self.max_tx_bytes = max(payload_size, int(min(self.max_tx_bytes, rejected_bytes) * OVERSIZED_BACKOFF))
+            reason = "oversized"
+        else:
+            return
+        logging.warning(
+            "Batch of %s x %sB rejected (%s), fill multiplier: %.2f, max tx bytes: %s",
+            entity_count,
+            payload_size,
+            reason,
+            self.fill_multiplier,
+            self.max_tx_bytes,
+        )
+        Metrics.get_metrics().record_adaptive_backoff(reason)
@@ -0,0 +1,90 @@
+"""
+Base of the per-process background threads that poll the node or the explorer while a
+test runs (head tracker, mempool sampler, block follower, index lag probe, ...).
+
+A subclass implements the abstract methods run_once(), called every `interval` seconds
+until the thread is stopped (a subclass with a loop of its own overrides _run() and calls
+it from there), and for_test(environment), which returns the instance to run during a
+test (creating the process-wide instance in cls._instance on first use) or None when the
+sampler is disabled for this process. listen_to_tests() then starts that instance on
+test_start and stops it on test_stop.
+"""
+
+import abc
+import logging
+import threading
+
+from locust import events
+
+
+class BackgroundSampler(abc.ABC):
+    """Process-wide background thread calling run_once() every interval seconds."""
+
+    _instance = None
+
+    @classmethod
+    @abc.abstractmethod
+    def for_test(cls, environment):
+        """Instance to run during the test, None when it should not run in this process."""
+
+    @classmethod
+    def on_test_start(cls, environment, **kwargs):
+        sampler = cls.for_test(environment)
+        if sampler is not None:
+            sampler.start()
+
+    @classmethod
+    def on_test_stop(cls, environment, **kwargs):
+        if cls._instance is not None:
+            cls._instance.stop()
+
+    @classmethod
+    def listen_to_tests(cls):
+        """Start the sampler on test_start and stop it on test_stop."""
+        events.test_start.add_listener(cls.on_test_start)
+        events.test_stop.add_listener(cls.on_test_stop)
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    @property
+    def stopping(self) -> bool:
+        """Whether stop() was called, long iterations should return early."""
+        return self._stop_event.is_set()
+
+    @abc.abstractmethod
+    def run_once(self):
+        """One sampling iteration, called every interval seconds by _run()."""
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error("%s: Error in background thread: %s", self.name, e, exc_info=True)
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Start the background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logging.info("%s: Started (every %ss)", self.name, self.interval)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background thread (also safe from the thread itself)."""
+        self._stop_event.set()
+        if self._thread is None or not self._thread.is_alive():
+            return
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        logging.info("%s: Stopped", self.name)
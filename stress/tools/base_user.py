@@ -1,11 +1,13 @@
 import itertools
 import logging
-import logging.config
 
 from locust import FastHttpUser, events
 
 import stress.tools.config as config
+from stress.tools.logging_setup import configure_logging
 from stress.tools.metrics import Metrics
+import stress.tools.self_monitor  # noqa: F401  registers the load generator self-monitoring hooks
+import stress.tools.sample_sink  # noqa: F401  registers the raw sample export hooks
 
 # Global user ID iterator
 id_iterator = None
@@ -23,7 +25,7 @@ class BaseUser(FastHttpUser):
     Base user class that handles common functionality:
     - User ID generation
     - Metrics tracking (current user count)
-    - Logging configuration
+    - Logging configuration (once per process, see stress/tools/logging_setup.py)
     """
 
     abstract = True
@@ -32,36 +34,15 @@ class BaseUser(FastHttpUser):
         super().__init__(*args, **kwargs)
         self.id = 0
 
-        logging.config.dictConfig(
-            {
-                "version": 1,
-                "formatters": {
-                    "default": {
-                        "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-                    }
-                },
-                "handlers": {
-                    "console": {
-                        "class": "logging.StreamHandler",
-                        "formatter": "default",
-                    },
-                    "file": {
-                        "class": "logging.FileHandler",
-                        "formatter": "default",
-                        "filename": "locust.log",
-                    },
-                },
-                "root": {"handlers": ["console", "file"], "level": config.log_level},
-            }
-        )
+        configure_logging()
 
     def on_start(self):
         global id_iterator
         self.id = next(id_iterator)
         Metrics.get_metrics().current_user_count.inc()
-        logging.info(f"User started with id: {self.id}")
+        logging.info("User started with id: %s", self.id)
 
     def on_stop(self):
         Metrics.get_metrics().current_user_count.dec()
-        logging.info(f"User stopped with id: {self.id}")
+        logging.info("User stopped with id: %s", self.id)
 
@@ -0,0 +1,165 @@
+"""
+On-chain block throughput monitor.
+
+BlockFollower follows the head of the tested host in a background thread (master /
+local runner only, enabled with BLOCK_FOLLOWER). For every new block it fetches the
+block with its transactions and the block receipts in one batched JSON-RPC request and
+records what the chain actually committed:
+
+  - transactions and Arkiv transactions (sent to BLOCK_FOLLOWER_ARKIV_ADDRESSES)
+  - Arkiv creates / updates, counted from the receipt logs matching the
+    BLOCK_FOLLOWER_CREATE_EVENTS / BLOCK_FOLLOWER_UPDATE_EVENTS signatures
+  - payload bytes (calldata of the Arkiv transactions, i.e. the encoded operations)
+  - gas used and fill ratio against the block gas limit
+
+The values are exported through Metrics as chain_* counters (rate() gives committed
+entities/sec to compare with loadtest_entities_created_total) and per-block histograms.
+To get them into InfluxDB, add the push gateway to METRICS_SCRAPE_TARGETS of
+gather-metrics.py.
+"""
+
+import logging
+from dataclasses import dataclass
+
+import requests
+from locust.runners import LocalRunner, MasterRunner
+from web3 import Web3
+
+import stress.tools.config as config
+from stress.tools.background_sampler import BackgroundSampler
+from stress.tools.metrics import Metrics
+
+HTTP_TIMEOUT_SECONDS = 10
+
+# Blocks fetched per loop iteration when the follower is behind the head
+MAX_BLOCKS_PER_ITERATION = 20
+
+
+def event_topics(signatures: list[str]) -> set[str]:
+    """topic0 (lowercase hex with 0x) of each event signature."""
+    return {"0x" + Web3.keccak(text=signature).hex().removeprefix("0x").lower() for signature in signatures}
+
+
+@dataclass
+class BlockStats:
+    """What one block committed."""
+
+    number: int
+    txs: int
+    arkiv_txs: int
+    creates: int
+    updates: int
+    payload_bytes: int
+    gas_used: int
+    gas_limit: int
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.gas_used / self.gas_limit if self.gas_limit else 0.0
+
+
+def block_stats(block: dict, receipts: list[dict], arkiv_addresses: set[str],
+                create_topics: set[str], update_topics: set[str]) -> BlockStats:
+    """Summarize a block (with full transactions) and its receipts."""
+    arkiv_txs = 0
+    payload_bytes = 0
+    for tx in block.get("transactions", []):
+        if (tx.get("to") or "").lower() in arkiv_addresses:
+            arkiv_txs += 1
+            payload_bytes += max(len(tx.get("input", "0x")) - 2, 0) // 2
+
+    creates = 0
+    updates = 0
+    for receipt in receipts or []:
+        for log in receipt.get("logs", []):
+            topics = log.get("topics") or []
+            if not topics:
+                continue
+            topic = topics[0].lower()
+            if topic in create_topics:
+                creates += 1
+            elif topic in update_topics:
+                updates += 1
+
+    return BlockStats(
+        number=int(block["number"], 16),
+        txs=len(block.get("transactions", [])),
+        arkiv_txs=arkiv_txs,
+        creates=creates,
+        updates=updates,
+        payload_bytes=payload_bytes,
+        gas_used=int(block.get("gasUsed", "0x0"), 16),
+        gas_limit=int(block.get("gasLimit", "0x0"), 16),
+    )
+
+
+class BlockFollower(BackgroundSampler):
+    """Background thread that summarizes every new block of one RPC endpoint."""
+
+    @classmethod
+    def for_test(cls, environment):
+        """Follow the blocks of the tested host once per test (master / local runner)."""
+        runner = getattr(environment, "runner", None)
+        if not config.block_follower or not environment.host or not isinstance(runner, (MasterRunner, LocalRunner)):
+            return None
+        if cls._instance is None or cls._instance.rpc_url != environment.host:
+            cls._instance = cls(environment.host, config.block_follower_poll_interval)
+        return cls._instance
+
+    def __init__(self, rpc_url: str, poll_interval: float = 0.5):
+        super().__init__(poll_interval)
+        self.rpc_url = rpc_url
+        self.arkiv_addresses = {address.lower() for address in config.block_follower_arkiv_addresses}
+        self.create_topics = event_topics(config.block_follower_create_events)
+        self.update_topics = event_topics(config.block_follower_update_events)
+        self.next_block: int | None = None
+
+    def _call_batch(self, calls: list[tuple[str, list]]) -> list:
+        """Send several JSON-RPC calls in one HTTP request, results in call order."""
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        response = requests.post(self.rpc_url, json=payload, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        by_id = {item.get("id"): item for item in response.json()}
+        results = []
+        for i, (method, _) in enumerate(calls):
+            item = by_id.get(i) or {}
+            if item.get("error"):
+                raise RuntimeError(f"RPC {method} failed: {item['error']}")
+            results.append(item.get("result"))
+        return results
+
+    def fetch_block(self, number: int) -> BlockStats | None:
+        block, receipts = self._call_batch(
+            [
+                ("eth_getBlockByNumber", [hex(number), True]),
+                ("eth_getBlockReceipts", [hex(number)]),
+            ]
+        )
+        if block is None:
+            return None
+        return block_stats(block, receipts, self.arkiv_addresses, self.create_topics, self.update_topics)
+
+    def follow(self):
+        """Process the blocks produced since the last call."""
+        (head_hex,) = self._call_batch([("eth_blockNumber", [])])
+        head = int(head_hex, 16)
+        if self.next_block is None:
+            # Start at the current head, earlier blocks are not part of the test
+            self.next_block = head
+        last = min(head, self.next_block + MAX_BLOCKS_PER_ITERATION - 1)
+        while self.next_block <= last and not self.stopping:
+            stats = self.fetch_block(self.next_block)
+            if stats is None:
+                return
+            Metrics.get_metrics().record_chain_block(stats)
+            logging.debug("BlockFollower: %s", stats)
+            self.next_block += 1
+
+    def run_once(self):
+        self.follow()
+
+
+BlockFollower.listen_to_tests()
@@ -0,0 +1,189 @@
+"""
+Capacity search helpers: AIMD concurrency control, knee and steady-state detection.
+
+The AIMD controller raises the user count by a fixed step every interval while the
+system stays within its SLO, and cuts it by a factor as soon as the SLO is violated
+(latency above target or mempool growing faster than allowed). Over a run it
+oscillates around the highest sustainable load.
+
+The knee of the throughput/latency curve is the load level with the highest
+"power" (throughput / latency): below it adding users adds throughput almost for
+free, above it extra users mostly add queueing delay.
+"""
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+
+from stress.tools.mempool import read_txpool_status
+
+
+@dataclass
+class CapacitySample:
+    """Throughput and latency observed during one controller interval."""
+
+    run_time: float
+    users: int
+    throughput: float
+    p95_ms: float
+    mempool_growth: float = 0.0
+    slo_violated: bool = False
+
+
+class AimdController:
+    """Additive-increase / multiplicative-decrease controller of the user count."""
+
+    def __init__(
+        self,
+        initial_users: int,
+        min_users: int,
+        max_users: int,
+        additive_step: int,
+        decrease_factor: float,
+        p95_slo_ms: float,
+        mempool_growth_limit: float,
+    ):
+        """
+        Args:
+            initial_users: User count to start with
+            min_users: Lower bound of the user count
+            max_users: Upper bound of the user count
+            additive_step: Users added after every interval within the SLO
+            decrease_factor: Multiplier applied to the user count after a violation (0-1)
+            p95_slo_ms: Highest acceptable p95 latency in milliseconds
+            mempool_growth_limit: Highest acceptable mempool growth in transactions per second
+        """
+        self.users = initial_users
+        self.min_users = min_users
+        self.max_users = max_users
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.p95_slo_ms = p95_slo_ms
+        self.mempool_growth_limit = mempool_growth_limit
+
+    def violates_slo(self, p95_ms: float, mempool_growth: float) -> bool:
+        return p95_ms > self.p95_slo_ms or mempool_growth > self.mempool_growth_limit
+
+    def update(self, p95_ms: float, mempool_growth: float = 0.0) -> int:
+        """Apply one control step and return the new user count."""
+        if self.violates_slo(p95_ms, mempool_growth):
+            self.users = int(self.users * self.decrease_factor)
+        else:
+            self.users += self.additive_step
+        self.users = max(self.min_users, min(self.users, self.max_users))
+        return self.users
+
+
+def aggregate_by_users(samples: list[CapacitySample]) -> list[CapacitySample]:
+    """Average samples taken at the same user count, ordered by user count."""
+    grouped: dict[int, list[CapacitySample]] = {}
+    for sample in samples:
+        grouped.setdefault(sample.users, []).append(sample)
+
+    aggregated = []
+    for users in sorted(grouped):
+        group = grouped[users]
+        aggregated.append(
+            CapacitySample(
+                run_time=group[-1].run_time,
+                users=users,
+                throughput=sum(s.throughput for s in group) / len(group),
+                p95_ms=sum(s.p95_ms for s in group) / len(group),
+                mempool_growth=sum(s.mempool_growth for s in group) / len(group),
+                slo_violated=any(s.slo_violated for s in group),
+            )
+        )
+    return aggregated
+
+
+def find_knee(samples: list[CapacitySample]) -> CapacitySample | None:
+    """Return the load level with the highest power (throughput / p95 latency)."""
+    candidates = [s for s in aggregate_by_users(samples) if s.p95_ms > 0 and s.throughput > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda s: s.throughput / s.p95_ms)
+
+
+def max_sustainable(samples: list[CapacitySample]) -> CapacitySample | None:
+    """Return the load level with the highest throughput that never violated the SLO."""
+    candidates = [s for s in aggregate_by_users(samples) if not s.slo_violated]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda s: s.throughput)
+
+
+def write_capacity_report(path: str, samples: list[CapacitySample], settings: dict):
+    """Write samples, knee and max sustainable load as JSON."""
+    knee = find_knee(samples)
+    sustainable = max_sustainable(samples)
+    report = {
+        "settings": settings,
+        "knee": asdict(knee) if knee else None,
+        "max_sustainable": asdict(sustainable) if sustainable else None,
+        "curve": [asdict(s) for s in aggregate_by_users(samples)],
+        "samples": [asdict(s) for s in samples],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    logging.info("Capacity report written to %s", path)
+
+
+def coefficient_of_variation(values: list[float]) -> float:
+    """Standard deviation divided by the mean (inf for an empty or zero-mean series)."""
+    if not values:
+        return float("inf")
+    mean = sum(values) / len(values)
+    if mean == 0:
+        return float("inf")
+    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    return variance**0.5 / abs(mean)
+
+
+def is_steady(values: list[float], window: int, max_cv: float) -> bool:
+    """True when the last `window` values vary by no more than `max_cv`."""
+    if len(values) < window:
+        return False
+    return coefficient_of_variation(values[-window:]) <= max_cv
+
+
+def histogram_snapshot(histogram) -> tuple[list[float], list[float]]:
+    """Return (upper bounds, cumulative counts) of an unlabelled prometheus Histogram."""
+    bounds, counts = [], []
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_bucket"):
+                bounds.append(float(sample.labels["le"]))
+                counts.append(sample.value)
+    return bounds, counts
+
+
+def histogram_percentile(
+    bounds: list[float], previous: list[float], current: list[float], q: float
+) -> float | None:
+    """
+    Percentile (0-1) of the observations recorded between two histogram snapshots.
+
+    Interpolates linearly inside the bucket holding the percentile, as PromQL's
+    histogram_quantile does. Returns None when nothing was observed in between.
+    """
+    window = [now - before for now, before in zip(current, previous or [0.0] * len(current))]
+    if not window or window[-1] <= 0:
+        return None
+
+    rank = q * window[-1]
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in zip(bounds, window):
+        if count >= rank:
+            if bound == float("inf"):
+                return lower_bound
+            if count == lower_count:
+                return bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+def read_txpool_size(rpc_url: str) -> int | None:
+    """Return pending + queued transactions from txpool_status, or None if unavailable."""
+    status = read_txpool_status(rpc_url)
+    return sum(status) if status is not None else None
@@ -0,0 +1,213 @@
+"""
+Multi-metric chain state sampler.
+
+ChainStateSampler runs on the master / local runner and, every CHAIN_STATE_INTERVAL
+seconds, sends one JSON-RPC batch per node over a persistent keep-alive session:
+
+  - sequencer (Locust --host): entity count, block number, txpool status, base fee
+  - validator (LOCUST_VALIDATOR_HOST, optional): block number
+
+The txpool status feeds the MempoolSampler of the process (stress/tools/mempool.py),
+which then exports the mempool depth and drives the write backpressure without polling
+over a thread and connection of its own.
+
+Probes are pluggable (add_probe): each one names an RPC call and how to store its
+result in ChainState. A probe that fails (RPC error, unparsable result) is counted in
+loadtest_chain_probe_failures_total and leaves its value unset for that round, while
+the other probes of the batch still update.
+
+From consecutive samples the sampler derives entities/sec, blocks/sec and the head
+lag of the validator behind the sequencer, and exports everything through Metrics.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import requests
+from locust import events
+from locust.runners import LocalRunner, MasterRunner
+
+import stress.tools.config as config
+from stress.tools.background_sampler import BackgroundSampler
+from stress.tools.mempool import MempoolSampler
+from stress.tools.metrics import Metrics
+
+HTTP_TIMEOUT_SECONDS = 5
+
+SEQUENCER = "sequencer"
+VALIDATOR = "validator"
+
+
+def hex_int(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+@dataclass
+class ChainState:
+    """One round of probe results (None = not sampled or failed)."""
+
+    sampled_at: float  # time.monotonic()
+    entity_count: int | None = None
+    head: dict[str, int] = field(default_factory=dict)
+    txpool_pending: int | None = None
+    txpool_queued: int | None = None
+    base_fee: int | None = None
+
+
+@dataclass
+class Probe:
+    """One JSON-RPC call sampled every round and how its result is stored."""
+
+    name: str
+    node: str
+    method: str
+    params: list
+    store: Callable[[ChainState, Any], None]
+
+
+def _store_entity_count(state: ChainState, result: Any):
+    state.entity_count = hex_int(result)
+
+
+def _store_head(node: str) -> Callable[[ChainState, Any], None]:
+    def store(state: ChainState, result: Any):
+        state.head[node] = hex_int(result)
+
+    return store
+
+
+def _store_txpool(state: ChainState, result: Any):
+    state.txpool_pending = hex_int(result.get("pending", "0x0"))
+    state.txpool_queued = hex_int(result.get("queued", "0x0"))
+
+
+def _store_base_fee(state: ChainState, result: Any):
+    state.base_fee = hex_int(result.get("baseFeePerGas", "0x0"))
+
+
+def default_probes() -> list[Probe]:
+    probes = [
+        Probe("entity_count", SEQUENCER, "arkiv_getEntityCount", [], _store_entity_count),
+        Probe("head_sequencer", SEQUENCER, "eth_blockNumber", [], _store_head(SEQUENCER)),
+        Probe("txpool_status", SEQUENCER, "txpool_status", [], _store_txpool),
+        Probe("base_fee", SEQUENCER, "eth_getBlockByNumber", ["latest", False], _store_base_fee),
+    ]
+    if config.validator_host:
+        probes.append(Probe("head_validator", VALIDATOR, "eth_blockNumber", [], _store_head(VALIDATOR)))
+    return probes
+
+
+def runs_chain_state_sampler(environment) -> bool:
+    """The sampler runs on the master / local runner only."""
+    return isinstance(getattr(environment, "runner", None), (MasterRunner, LocalRunner))
+
+
+class ChainStateSampler(BackgroundSampler):
+    """Background thread that samples chain state with one batched request per node."""
+
+    @classmethod
+    def for_test(cls, environment):
+        """Sample on the master / local runner, from scratch every test (the host may have changed)."""
+        if not runs_chain_state_sampler(environment):
+            return None
+        if cls._instance is None:
+            cls._instance = cls(environment)
+        cls._instance.reset()
+        logging.info("ChainStateSampler: Sampling %s", environment.host)
+        return cls._instance
+
+    def __init__(self, environment, interval: float | None = None):
+        """
+        Args:
+            environment: Locust environment object (its host is the sequencer)
+            interval: Seconds between rounds (default: CHAIN_STATE_INTERVAL)
+        """
+        super().__init__(interval if interval is not None else config.chain_state_interval)
+        self._environment = environment
+        self._probes: list[Probe] = default_probes()
+        self._sessions: dict[str, requests.Session] = {}
+        self._previous: ChainState | None = None
+
+    def add_probe(self, probe: Probe):
+        """Sample one more RPC call every round."""
+        self._probes.append(probe)
+
+    def reset(self):
+        """Drop the sessions and the previous round (rates restart from the next two rounds)."""
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+        self._previous = None
+
+    def _node_url(self, node: str) -> str:
+        return config.validator_host if node == VALIDATOR else self._environment.host
+
+    def _sample_node(self, node: str, probes: list[Probe], state: ChainState):
+        session = self._sessions.setdefault(node, requests.Session())
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": probe.method, "params": probe.params}
+            for i, probe in enumerate(probes)
+        ]
+        try:
+            response = session.post(self._node_url(node), json=payload, timeout=HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            by_id = {item.get("id"): item for item in response.json()}
+        except Exception as e:
+            logging.warning("ChainStateSampler: Batch to %s failed: %s", node, e)
+            for probe in probes:
+                Metrics.get_metrics().record_chain_probe_failure(probe.name)
+            return
+
+        for i, probe in enumerate(probes):
+            item = by_id.get(i) or {}
+            try:
+                if item.get("error") or item.get("result") is None:
+                    raise RuntimeError(item.get("error") or "no result")
+                probe.store(state, item["result"])
+            except Exception as e:
+                logging.debug("ChainStateSampler: Probe %s failed: %s", probe.name, e)
+                Metrics.get_metrics().record_chain_probe_failure(probe.name)
+
+    def sample(self) -> ChainState:
+        """Run all probes once and export the state and the rates derived from the previous round."""
+        state = ChainState(sampled_at=time.monotonic())
+        by_node: dict[str, list[Probe]] = {}
+        for probe in self._probes:
+            by_node.setdefault(probe.node, []).append(probe)
+        for node, probes in by_node.items():
+            self._sample_node(node, probes, state)
+
+        metrics = Metrics.get_metrics()
+        metrics.record_chain_state(state)
+        if state.txpool_pending is not None and state.txpool_queued is not None:
+            MempoolSampler.get_sampler(self._environment.host).record(
+                state.txpool_pending, state.txpool_queued
+            )
+
+        previous = self._previous
+        if previous is not None and state.sampled_at > previous.sampled_at:
+            elapsed = state.sampled_at - previous.sampled_at
+            entities_per_second = None
+            if state.entity_count is not None and previous.entity_count is not None:
+                entities_per_second = (state.entity_count - previous.entity_count) / elapsed
+            blocks_per_second = None
+            if SEQUENCER in state.head and SEQUENCER in previous.head:
+                blocks_per_second = (state.head[SEQUENCER] - previous.head[SEQUENCER]) / elapsed
+            metrics.record_chain_rates(entities_per_second, blocks_per_second)
+        self._previous = state
+        return state
+
+    def run_once(self):
+        self.sample()
+
+
+@events.init.add_listener
+def on_locust_init_chain_state(environment, **kwargs):
+    """Where the chain state sampler runs, its txpool_status probe feeds the mempool sampler."""
+    if runs_chain_state_sampler(environment):
+        MempoolSampler.feed_externally()
+
+
+ChainStateSampler.listen_to_tests()
@@ -20,3 +20,110 @@ fresh_container_for_each_test = env.bool(
 )  # it will work for single user only
 timeout_tx_to_be_mined = env.int("TIMEOUT_TX_TO_BE_MINED", default=60)
 founder_key = env.str("FOUNDER_KEY", default="")
+validator_host = env.str(
+    "LOCUST_VALIDATOR_HOST", default=""
+)  # optional second RPC endpoint (validator / replica) used for read-your-writes checks
+trace_record_file = env.str(
+    "TRACE_RECORD_FILE", default=""
+)  # when set, every L3 operation is recorded to this workload trace file (one per process, see stress/tools/trace.py)
+adaptive_batch_target_fill = env.float(
+    "ADAPTIVE_BATCH_TARGET_FILL", default=0.8
+)  # fraction of the block gas limit a single adaptive batch aims for
+adaptive_batch_max_entities = env.int("ADAPTIVE_BATCH_MAX_ENTITIES", default=5000)
+adaptive_batch_max_tx_bytes = env.int(
+    "ADAPTIVE_BATCH_MAX_TX_BYTES", default=120_000
+)  # payload bytes per transaction, lowered automatically on "oversized data" errors
+mempool_sampler = env.bool(
+    "MEMPOOL_SAMPLER", default=False
+)  # export mempool pending/queued depth sampled with txpool_status
+mempool_sample_interval = env.float("MEMPOOL_SAMPLE_INTERVAL", default=1.0)
+mempool_backpressure = env.bool(
+    "MEMPOOL_BACKPRESSURE", default=False
+)  # throttle writers based on the mempool depth (implies MEMPOOL_SAMPLER)
+mempool_low_watermark = env.int("MEMPOOL_LOW_WATERMARK", default=500)
+mempool_high_watermark = env.int("MEMPOOL_HIGH_WATERMARK", default=2000)
+mempool_max_write_rate = env.float(
+    "MEMPOOL_MAX_WRITE_RATE", default=0
+)  # writes per second per process below the low watermark, 0 = unlimited
+read_hosts = env.list(
+    "LOCUST_READ_HOSTS", default=[]
+)  # comma-separated read endpoints (validators / replicas); empty = reads go to the write host
+read_balancing = env.str(
+    "LOCUST_READ_BALANCING", default="least_outstanding"
+)  # least_outstanding or round_robin
+payload_pool_bytes = env.int(
+    "PAYLOAD_POOL_BYTES", default=16 * 1024 * 1024
+)  # random buffer generated once per process, payloads are sliced from it
+payload_compression_ratio = env.float(
+    "PAYLOAD_COMPRESSION_RATIO", default=1.0
+)  # target zlib compressed / original payload size, 1.0 = incompressible random bytes
+tx_span_file = env.str(
+    "TX_SPAN_FILE", default=""
+)  # when set, sampled per-transaction phase spans are appended to this JSON lines file
+tx_span_sample_rate = env.float("TX_SPAN_SAMPLE_RATE", default=0.01)
+head_tracker = env.bool(
+    "HEAD_TRACKER", default=False
+)  # follow the head block to export blocks-to-inclusion and submit-offset latency
+head_poll_interval = env.float("HEAD_POLL_INTERVAL", default=0.1)
+block_follower = env.bool(
+    "BLOCK_FOLLOWER", default=False
+)  # summarize every committed block (txs, Arkiv creates/updates, payload bytes, gas fill)
+block_follower_poll_interval = env.float("BLOCK_FOLLOWER_POLL_INTERVAL", default=0.5)
+block_follower_arkiv_addresses = env.list(
+    "BLOCK_FOLLOWER_ARKIV_ADDRESSES",
+    default=["0x00000000000000000000000000000061726b6976", "0x0000000000000000000000000000000060138453"],
+)  # addresses Arkiv transactions are sent to (arkiv and legacy golem-base)
+block_follower_create_events = env.list(
+    "BLOCK_FOLLOWER_CREATE_EVENTS",
+    default=["ArkivEntityCreated(uint256,address,uint256,uint256)", "GolemBaseStorageEntityCreated(uint256,uint256)"],
+    delimiter=";",
+)  # event signatures counted as entity creates
+block_follower_update_events = env.list(
+    "BLOCK_FOLLOWER_UPDATE_EVENTS",
+    default=["ArkivEntityUpdated(uint256,address,uint256,uint256,uint256)", "GolemBaseStorageEntityUpdated(uint256,uint256)"],
+    delimiter=";",
+)  # event signatures counted as entity updates
+chain_state_interval = env.float(
+    "CHAIN_STATE_INTERVAL", default=0.5
+)  # seconds between chain state samples (entity count, heads, txpool, base fee)
+explorer_host = env.str(
+    "LOCUST_EXPLORER_HOST", default=""
+)  # Blockscout proxy base URL, enables the explorer / indexer lag probe
+index_lag_sample_rate = env.float(
+    "INDEX_LAG_SAMPLE_RATE", default=0.1
+)  # fraction of the confirmed writes looked up in the explorer
+index_lag_timeout = env.float(
+    "INDEX_LAG_TIMEOUT", default=300.0
+)  # seconds before a write missing from an indexer counts as a timeout
+index_lag_max_pending = env.int("INDEX_LAG_MAX_PENDING", default=1000)
+explorer_frontier_size = env.int(
+    "EXPLORER_FRONTIER_SIZE", default=5000
+)  # blocks / transactions / addresses / entities (each) and page cursors kept by the explorer crawler
+explorer_page_follow_probability = env.float(
+    "EXPLORER_PAGE_FOLLOW_PROBABILITY", default=0.3
+)  # chance that a crawler request follows a pagination cursor instead of opening an item
+explorer_page_depth_decay = env.float(
+    "EXPLORER_PAGE_DEPTH_DECAY", default=0.8
+)  # weight multiplier of a pagination cursor per page of depth
+log_sample_rate = env.float(
+    "LOG_SAMPLE_RATE", default=1.0
+)  # fraction of the INFO / DEBUG records kept per call site (warnings and errors are always kept)
+log_rate_limit = env.float(
+    "LOG_RATE_LIMIT", default=20.0
+)  # INFO / DEBUG records per second and call site, 0 = unlimited
+self_monitor = env.bool(
+    "SELF_MONITOR", default=True
+)  # export CPU, memory, GC pauses, loop lag, greenlets and sockets of every load generator process
+self_monitor_interval = env.float("SELF_MONITOR_INTERVAL", default=1.0)
+self_monitor_cpu_threshold = env.float(
+    "SELF_MONITOR_CPU_THRESHOLD", default=90.0
+)  # process CPU percent (100 = one core) above which the load generator counts as saturated
+sample_sink_dir = env.str(
+    "SAMPLE_SINK_DIR", default=""
+)  # when set (and pyarrow is installed), raw per-request samples are written there as Parquet
+sample_sink_batch_rows = env.int(
+    "SAMPLE_SINK_BATCH_ROWS", default=50_000
+)  # samples buffered per record batch before it is handed to the writer thread
+lifecycle_pool_per_owner = env.int(
+    "LIFECYCLE_POOL_PER_OWNER", default=1000
+)  # live entities remembered per account for the lifecycle operations (random replacement when full)
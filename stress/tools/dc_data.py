@@ -4,6 +4,8 @@ import uuid
 from dataclasses import dataclass
 from typing import Iterator
 
+from stress.tools.payload_pool import PayloadPool
+
 
 # =============================================================================
 # Configuration & Constants
@@ -22,7 +24,7 @@ DEFAULT_NODE_UPDATES_PER_BLOCK = 60
 DEFAULT_WORKLOAD_UPDATES_PER_BLOCK = 600
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeEntity:
     """Represents a compute node in a data center."""
     entity_key: bytes
@@ -41,9 +43,10 @@ class NodeEntity:
     tx_index: int = 0
     op_index: int = 0
     sequence: int = 0
+    payload_seed: int = 0  # regenerates a generated payload, see entity_payload()
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkloadEntity:
     """Represents a workload/job in a data center."""
     entity_key: bytes
@@ -62,6 +65,7 @@ class WorkloadEntity:
     tx_index: int = 0
     op_index: int = 0
     sequence: int = 0
+    payload_seed: int = 0  # regenerates a generated payload, see entity_payload()
 
 
 # =============================================================================
@@ -264,11 +268,13 @@ def create_node(
     seed: int,
     payload_content: bytes | None = None,
     status: str | None = None,
+    with_payload: bool = True,
 ) -> NodeEntity:
     """Create a single Node entity with randomized attributes.
     
     Args:
         status: If provided, use this status instead of sampling from distribution.
+        with_payload: If False, leave payload empty (metadata only, see entity_payload()).
     """
     rng = random.Random(f"{seed}:node:{dc_num}:{node_num}")
     
@@ -289,8 +295,11 @@ def create_node(
     ttl_blocks = sample_ttl_blocks(rng)
 
     # Generate random payload if not provided
-    if payload_content is None:
-        payload = bytes(rng.getrandbits(8) for _ in range(payload_size))
+    payload_seed = rng.getrandbits(63)
+    if not with_payload:
+        payload = b""
+    elif payload_content is None:
+        payload = PayloadPool.get_pool().seeded_payload(payload_seed, payload_size)
     else:
         payload = payload_content
     
@@ -307,7 +316,8 @@ def create_node(
         avail_hours=avail_hours,
         payload=payload,
         block=block,
-        ttl=ttl_blocks
+        ttl=ttl_blocks,
+        payload_seed=payload_seed,
     )
 
 
@@ -321,12 +331,14 @@ def create_workload(
     payload_content: bytes | None = None,
     status: str | None = None,
     assigned_node: str | None = None,
+    with_payload: bool = True,
 ) -> WorkloadEntity:
     """Create a single Workload entity with randomized attributes.
     
     Args:
         status: If provided, use this status instead of sampling from distribution.
         assigned_node: If provided, use this as the assigned node ID.
+        with_payload: If False, leave payload empty (metadata only, see entity_payload()).
     """
     rng = random.Random(f"{seed}:workload:{dc_num}:{workload_num}")
     
@@ -353,8 +365,11 @@ def create_workload(
             assigned_node = ""
     
     # Generate random payload if not provided
-    if payload_content is None:
-        payload = bytes(rng.getrandbits(8) for _ in range(payload_size))
+    payload_seed = rng.getrandbits(63)
+    if not with_payload:
+        payload = b""
+    elif payload_content is None:
+        payload = PayloadPool.get_pool().seeded_payload(payload_seed, payload_size)
     else:
         payload = payload_content
     
@@ -371,10 +386,18 @@ def create_workload(
         max_hours=max_hours,
         payload=payload,
         block=block,
-        ttl=ttl_blocks
+        ttl=ttl_blocks,
+        payload_seed=payload_seed,
     )
 
 
+def entity_payload(entity: NodeEntity | WorkloadEntity, payload_size: int) -> bytes:
+    """Payload of the entity, regenerated from its seed when it was created without one."""
+    if entity.payload:
+        return entity.payload
+    return PayloadPool.get_pool().seeded_payload(entity.payload_seed, payload_size)
+
+
 # =============================================================================
 # Block-by-Block Entity Generation
 # =============================================================================
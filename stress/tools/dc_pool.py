@@ -0,0 +1,92 @@
+"""
+Bounded, status-indexed pool of data center entities for the dc_* update tests.
+
+Entities are kept metadata only (payload regenerated from payload_seed, see
+dc_data.entity_payload), in a fixed number of slots that are reused ring-buffer style
+once the pool is full. Every status keeps its own list of slot numbers plus each
+slot's position in it, so picking a random entity of given statuses, replacing an
+entity and moving it to another status are all O(1) (swap with the last, then pop).
+"""
+
+import random
+from typing import Generic, Iterable, TypeVar
+
+from stress.tools.dc_data import NodeEntity, WorkloadEntity
+
+Entity = TypeVar("Entity", NodeEntity, WorkloadEntity)
+
+
+class StatusIndexedPool(Generic[Entity]):
+    """Up to `capacity` entities indexed by entity key and by status."""
+
+    __slots__ = ("capacity", "_slots", "_slot_of", "_by_status", "_status_pos", "_ring_idx")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._slots: list[Entity] = []
+        self._slot_of: dict[bytes, int] = {}
+        self._by_status: dict[str, list[int]] = {}
+        self._status_pos: list[int] = []  # position of each slot in its status list
+        self._ring_idx = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def count(self, status: str) -> int:
+        return len(self._by_status.get(status, ()))
+
+    def _index_status(self, slot: int, status: str) -> None:
+        members = self._by_status.setdefault(status, [])
+        self._status_pos[slot] = len(members)
+        members.append(slot)
+
+    def _unindex_status(self, slot: int, status: str) -> None:
+        members = self._by_status[status]
+        position = self._status_pos[slot]
+        last = members.pop()
+        if last != slot:
+            members[position] = last
+            self._status_pos[last] = position
+
+    def put(self, entity: Entity) -> None:
+        """Add the entity or a new version of it (same key), evicting the oldest slot once full."""
+        if entity.entity_key in self._slot_of:
+            self._store(self._slot_of[entity.entity_key], entity)
+            return
+        if len(self._slots) < self.capacity:
+            self._slots.append(entity)
+            self._status_pos.append(0)
+            slot = len(self._slots) - 1
+            self._slot_of[entity.entity_key] = slot
+            self._index_status(slot, entity.status)
+            return
+        slot = self._ring_idx
+        self._ring_idx = (self._ring_idx + 1) % self.capacity
+        del self._slot_of[self._slots[slot].entity_key]
+        self._slot_of[entity.entity_key] = slot
+        self._store(slot, entity)
+
+    def _store(self, slot: int, entity: Entity) -> None:
+        previous = self._slots[slot]
+        self._slots[slot] = entity
+        if previous.status != entity.status:
+            self._unindex_status(slot, previous.status)
+            self._index_status(slot, entity.status)
+
+    def pick(self, rng: random.Random, statuses: Iterable[str] | None = None) -> Entity | None:
+        """Random entity, restricted to the given statuses if any."""
+        if statuses is None:
+            if not self._slots:
+                return None
+            return self._slots[rng.randrange(len(self._slots))]
+
+        candidates = [self._by_status[s] for s in statuses if self._by_status.get(s)]
+        total = sum(len(members) for members in candidates)
+        if total == 0:
+            return None
+        r = rng.randrange(total)
+        for members in candidates:
+            if r < len(members):
+                return self._slots[members[r]]
+            r -= len(members)
+        return None
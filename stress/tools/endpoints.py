@@ -0,0 +1,103 @@
+"""
+Read endpoint pool for routing reads away from the sequencer.
+
+Writes always go to the Locust --host (the sequencer). When LOCUST_READ_HOSTS lists
+read replicas / validators, reads are spread over them with LOCUST_READ_BALANCING:
+
+  - least_outstanding  endpoint with the fewest in-flight reads in this process
+                       (ties broken round-robin)
+  - round_robin        endpoints in turn
+
+Every user gets its own HTTP session (and connection pool) per read endpoint, and
+requests sent through it are named "<rpc method> [<endpoint>]" so Locust reports
+stats per endpoint.
+"""
+
+import itertools
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+from urllib.parse import urlparse
+
+import web3
+from arkiv import Arkiv
+
+LEAST_OUTSTANDING = "least_outstanding"
+ROUND_ROBIN = "round_robin"
+BALANCING_STRATEGIES = (LEAST_OUTSTANDING, ROUND_ROBIN)
+
+
+def endpoint_name(url: str) -> str:
+    """Short endpoint label used in request names (host:port)."""
+    return urlparse(url).netloc or url
+
+
+@dataclass
+class ReadEndpoint:
+    """Arkiv client bound to one read endpoint."""
+
+    name: str
+    url: str
+    w3: Arkiv
+
+    def request_name(self, name: str) -> str:
+        """Locust request name tagged with the endpoint (unchanged for the write host)."""
+        return f"{name} [{self.name}]" if self.name else name
+
+
+class ReadEndpointPool:
+    """Per-user set of read endpoints with process-wide balancing state."""
+
+    # In-flight reads per endpoint URL and the round-robin cursor, shared by all users of the process
+    _outstanding: dict[str, int] = defaultdict(int)
+    _round_robin = itertools.count()
+
+    def __init__(
+        self,
+        urls: list[str],
+        balancing: str,
+        session_factory: Callable[[str, str], Any],
+    ):
+        """
+        Args:
+            urls: Read endpoint URLs
+            balancing: least_outstanding or round_robin
+            session_factory: Creates the HTTP session for (url, endpoint name)
+        """
+        if not urls:
+            raise ValueError("ReadEndpointPool needs at least one read endpoint")
+        if balancing not in BALANCING_STRATEGIES:
+            raise ValueError(
+                f"Unknown read balancing {balancing!r}, expected one of {BALANCING_STRATEGIES}"
+            )
+        self.balancing = balancing
+        self.endpoints = []
+        for url in urls:
+            name = endpoint_name(url)
+            session = session_factory(url, name)
+            self.endpoints.append(
+                ReadEndpoint(
+                    name=name,
+                    url=url,
+                    w3=Arkiv(web3.HTTPProvider(endpoint_uri=url, session=session)),
+                )
+            )
+
+    def pick(self) -> ReadEndpoint:
+        count = len(self.endpoints)
+        start = next(ReadEndpointPool._round_robin) % count
+        ordered = [self.endpoints[(start + i) % count] for i in range(count)]
+        if self.balancing == ROUND_ROBIN:
+            return ordered[0]
+        return min(ordered, key=lambda endpoint: ReadEndpointPool._outstanding[endpoint.url])
+
+    @contextmanager
+    def lease(self) -> Iterator[ReadEndpoint]:
+        """Pick an endpoint and count the read as outstanding on it while the block runs."""
+        endpoint = self.pick()
+        ReadEndpointPool._outstanding[endpoint.url] += 1
+        try:
+            yield endpoint
+        finally:
+            ReadEndpointPool._outstanding[endpoint.url] -= 1
@@ -0,0 +1,118 @@
+"""
+Process-wide pool of live entities created by the load test.
+
+Only the owner of an entity can update, extend, delete or transfer it, so the pool is
+keyed by owner address. Every owner keeps a list plus a key -> index map, which gives
+O(1) add, random pick and removal (swap with the last element, then pop).
+
+Every owner keeps at most LIFECYCLE_POOL_PER_OWNER entities: once full, a new entity
+replaces a random one (the replaced entity is simply no longer used by the test), so a
+long create-heavy run keeps a bounded, uniformly mixed sample of its live entities.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass
+
+import stress.tools.config as config
+
+
+@dataclass
+class LiveEntity:
+    """An entity the test created and believes to be still alive."""
+
+    key: str
+    owner: str
+    payload_size: int
+    expires_at: float  # time.time() when the entity expires
+
+
+class _OwnerEntities:
+    __slots__ = ("entities", "index")
+
+    def __init__(self):
+        self.entities: list[LiveEntity] = []
+        self.index: dict[str, int] = {}
+
+
+class LiveEntityPool:
+    """Live entities grouped by owner, shared by all users of the process."""
+
+    _instance = None
+
+    @classmethod
+    def get_pool(cls):
+        """Get the global live entity pool"""
+        if cls._instance is None:
+            cls._instance = cls(config.lifecycle_pool_per_owner)
+            logging.info("Created live entity pool (%s entities per owner)", config.lifecycle_pool_per_owner)
+        return cls._instance
+
+    def __init__(self, max_per_owner: int = 1000):
+        self.max_per_owner = max(1, max_per_owner)
+        self._owners: dict[str, _OwnerEntities] = {}
+
+    def __len__(self) -> int:
+        return sum(len(owned.entities) for owned in self._owners.values())
+
+    def count(self, owner: str) -> int:
+        owned = self._owners.get(owner.lower())
+        return len(owned.entities) if owned else 0
+
+    def add(self, entity: LiveEntity, rng: random.Random | None = None):
+        owned = self._owners.setdefault(entity.owner.lower(), _OwnerEntities())
+        if entity.key in owned.index:
+            owned.entities[owned.index[entity.key]] = entity
+            return
+        if len(owned.entities) >= self.max_per_owner:
+            position = (rng or random).randrange(len(owned.entities))
+            del owned.index[owned.entities[position].key]
+            owned.entities[position] = entity
+            owned.index[entity.key] = position
+            return
+        owned.index[entity.key] = len(owned.entities)
+        owned.entities.append(entity)
+
+    def remove(self, owner: str, key: str) -> LiveEntity | None:
+        owned = self._owners.get(owner.lower())
+        if owned is None or key not in owned.index:
+            return None
+        position = owned.index.pop(key)
+        removed = owned.entities[position]
+        last = owned.entities.pop()
+        if last is not removed:
+            owned.entities[position] = last
+            owned.index[last.key] = position
+        return removed
+
+    def pick(self, owner: str, rng: random.Random | None = None) -> LiveEntity | None:
+        """Random live entity of the owner; expired entities met on the way are dropped."""
+        owned = self._owners.get(owner.lower())
+        rng = rng or random
+        now = time.time()
+        while owned and owned.entities:
+            entity = owned.entities[rng.randrange(len(owned.entities))]
+            if entity.expires_at > now:
+                return entity
+            self.remove(owner, entity.key)
+        return None
+
+    def transfer(self, key: str, old_owner: str, new_owner: str) -> LiveEntity | None:
+        entity = self.remove(old_owner, key)
+        if entity is not None:
+            entity.owner = new_owner
+            self.add(entity)
+        return entity
+
+
+def gas_used(w3, receipt) -> int | None:
+    """gasUsed of the transaction behind an Arkiv receipt, or None if it cannot be read."""
+    tx_hash = getattr(receipt, "tx_hash", None)
+    if tx_hash is None:
+        return None
+    try:
+        return int(w3.eth.get_transaction_receipt(tx_hash)["gasUsed"])
+    except Exception as e:
+        logging.warning("Could not read gasUsed for %s: %s", tx_hash, e)
+        return None
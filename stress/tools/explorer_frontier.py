@@ -0,0 +1,275 @@
+"""
+Shared crawl frontier for the explorer workload.
+
+Every explorer response is scanned for the blocks, transactions, addresses and Arkiv
+entities it mentions; they go into a process-wide frontier where each item carries a
+popularity weight that grows every time the item is seen again. Addresses that send many
+transactions therefore become hot, the way a few popular contracts / accounts dominate
+real explorer traffic.
+
+The next request is drawn in two steps:
+
+  - with EXPLORER_PAGE_FOLLOW_PROBABILITY, follow one of the pagination cursors
+    (Blockscout next_page_params) collected from earlier list responses, weighted by
+    the popularity of the listed item and EXPLORER_PAGE_DEPTH_DECAY per page of depth
+  - otherwise pick an endpoint template by weight and fill it with an item drawn by
+    popularity
+
+Requests are named after their endpoint template, with the page depth bucket appended
+for followed pages, so deep pages show up separately in the Locust statistics.
+"""
+
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode
+
+import stress.tools.config as config
+
+BLOCK = "block"
+TRANSACTION = "transaction"
+ADDRESS = "address"
+ENTITY = "entity"
+
+# Lengths of 0x-prefixed hex strings
+ADDRESS_HEX_LENGTH = 42
+HASH_HEX_LENGTH = 66
+
+# Response fields holding an address / transaction hash / entity key
+ADDRESS_FIELDS = ("sender", "owner", "address_hash")
+TRANSACTION_FIELDS = ("transaction_hash", "tx_hash")
+ENTITY_FIELDS = ("entity_key",)
+
+# Nesting levels of a response scanned for items
+MAX_SCAN_DEPTH = 6
+
+# Items sampled when looking for the least popular one to evict
+EVICTION_SAMPLE = 8
+
+# Page depth buckets used in the request names: (last page of the bucket, label)
+PAGE_BUCKETS = ((5, "2-5"), (20, "6-20"))
+DEEP_PAGE_BUCKET = "21+"
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """An explorer endpoint template, filled with an item of `kind` (None = list root)."""
+
+    template: str
+    kind: str | None
+    weight: float
+    paginated: bool = False
+
+    def path(self, key: str | None) -> str:
+        return self.template if self.kind is None else self.template.replace("{" + self.kind + "}", key)
+
+
+ENDPOINTS = (
+    Endpoint("/api/v2/blocks?type=block", None, 1, paginated=True),
+    Endpoint("/api/v2/transactions?filter=validated", None, 1, paginated=True),
+    Endpoint("/api/v2/blocks/{block}", BLOCK, 3),
+    Endpoint("/api/v2/blocks/{block}/transactions", BLOCK, 3, paginated=True),
+    Endpoint("/api/v2/transactions/{transaction}", TRANSACTION, 5),
+    Endpoint("/api/v2/transactions/{transaction}/logs", TRANSACTION, 1, paginated=True),
+    Endpoint("/api/v2/addresses/{address}", ADDRESS, 4),
+    Endpoint("/api/v2/addresses/{address}/transactions", ADDRESS, 4, paginated=True),
+    Endpoint(
+        "/arkiv-indexer/api/v1/operations?operation=CREATE&page_size=50&sender={address}",
+        ADDRESS,
+        2,
+        paginated=True,
+    ),
+    Endpoint("/arkiv-indexer/api/v1/entity/{entity}", ENTITY, 4),
+)
+
+
+@dataclass
+class CrawlRequest:
+    """One request chosen from the frontier."""
+
+    endpoint: Endpoint
+    path: str  # without the paging parameters
+    page_params: dict | None = None
+    depth: int = 1
+    weight: float = 1.0  # popularity of the listed item, inherited by the next page
+
+    @property
+    def url(self) -> str:
+        if not self.page_params:
+            return self.path
+        separator = "&" if "?" in self.path else "?"
+        return self.path + separator + urlencode(self.page_params)
+
+    @property
+    def name(self) -> str:
+        if self.depth == 1:
+            return self.endpoint.template
+        for last, label in PAGE_BUCKETS:
+            if self.depth <= last:
+                return f"{self.endpoint.template} [page {label}]"
+        return f"{self.endpoint.template} [page {DEEP_PAGE_BUCKET}]"
+
+
+class _WeightedItems:
+    """Up to `capacity` keys with popularity weights, weighted random pick."""
+
+    __slots__ = ("capacity", "keys", "weights", "index")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.keys: list = []
+        self.weights: list[float] = []
+        self.index: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key, weight: float, rng: random.Random):
+        """Add the key or raise its weight, returns the key evicted to make room (if any)."""
+        position = self.index.get(key)
+        if position is not None:
+            self.weights[position] += weight
+            return None
+        if len(self.keys) < self.capacity:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.weights.append(weight)
+            return None
+        # Full: replace the least popular of a few random items
+        position = min(
+            (rng.randrange(len(self.keys)) for _ in range(EVICTION_SAMPLE)),
+            key=self.weights.__getitem__,
+        )
+        evicted = self.keys[position]
+        del self.index[evicted]
+        self.index[key] = position
+        self.keys[position] = key
+        self.weights[position] = weight
+        return evicted
+
+    def pick(self, rng: random.Random):
+        return rng.choices(self.keys, weights=self.weights)[0]
+
+    def weight(self, key) -> float:
+        position = self.index.get(key)
+        return self.weights[position] if position is not None else 1.0
+
+    def pop(self, rng: random.Random):
+        """Remove and return a key drawn by weight."""
+        position = rng.choices(range(len(self.keys)), weights=self.weights)[0]
+        key = self.keys[position]
+        last_key = self.keys.pop()
+        last_weight = self.weights.pop()
+        del self.index[key]
+        if position < len(self.keys):
+            self.keys[position] = last_key
+            self.weights[position] = last_weight
+            self.index[last_key] = position
+        return key
+
+
+def discover(body: Any, depth: int = 0) -> list[tuple[str, str]]:
+    """(kind, key) of every block, transaction, address and entity mentioned in a response."""
+    found = []
+    if depth > MAX_SCAN_DEPTH:
+        return found
+    if isinstance(body, list):
+        for item in body:
+            found.extend(discover(item, depth + 1))
+        return found
+    if not isinstance(body, dict):
+        return found
+
+    for field in ("height", "block_number", "block"):
+        value = body.get(field)
+        if isinstance(value, int) and not isinstance(value, bool):
+            found.append((BLOCK, str(value)))
+    value = body.get("hash")
+    if isinstance(value, str) and "height" not in body:
+        if len(value) == ADDRESS_HEX_LENGTH:
+            found.append((ADDRESS, value.lower()))
+        elif len(value) == HASH_HEX_LENGTH:
+            found.append((TRANSACTION, value.lower()))
+    for kind, fields in ((ADDRESS, ADDRESS_FIELDS), (TRANSACTION, TRANSACTION_FIELDS), (ENTITY, ENTITY_FIELDS)):
+        for field in fields:
+            value = body.get(field)
+            if isinstance(value, str) and value.startswith("0x"):
+                found.append((kind, value.lower()))
+
+    for key, value in body.items():
+        if key != "next_page_params" and isinstance(value, (dict, list)):
+            found.extend(discover(value, depth + 1))
+    return found
+
+
+class CrawlFrontier:
+    """Discovered items and pagination cursors, shared by all crawler users of the process."""
+
+    _instance = None
+
+    @classmethod
+    def get_frontier(cls):
+        """Get the global crawl frontier"""
+        if cls._instance is None:
+            cls._instance = cls(
+                config.explorer_frontier_size,
+                config.explorer_page_follow_probability,
+                config.explorer_page_depth_decay,
+            )
+            logging.info(
+                "Created explorer crawl frontier with %s items per kind", config.explorer_frontier_size
+            )
+        return cls._instance
+
+    def __init__(self, size: int, follow_probability: float, depth_decay: float, rng: random.Random | None = None):
+        self.follow_probability = follow_probability
+        self.depth_decay = depth_decay
+        self._rng = rng or random.Random()
+        self._items = {kind: _WeightedItems(size) for kind in (BLOCK, TRANSACTION, ADDRESS, ENTITY)}
+        self._cursors = _WeightedItems(size)
+        self._pages: dict[int, CrawlRequest] = {}  # cursor id -> next page request
+        self._next_cursor_id = 0
+
+    def size(self, kind: str) -> int:
+        return len(self._items[kind])
+
+    def pending_pages(self) -> int:
+        return len(self._cursors)
+
+    def next_request(self, rng: random.Random | None = None) -> CrawlRequest:
+        """Choose the next page to load."""
+        rng = rng or self._rng
+        if self._cursors and rng.random() < self.follow_probability:
+            return self._pages.pop(self._cursors.pop(rng))
+
+        endpoints = [e for e in ENDPOINTS if e.kind is None or self._items[e.kind]]
+        endpoint = rng.choices(endpoints, weights=[e.weight for e in endpoints])[0]
+        if endpoint.kind is None:
+            return CrawlRequest(endpoint, endpoint.path(None))
+        items = self._items[endpoint.kind]
+        key = items.pick(rng)
+        return CrawlRequest(endpoint, endpoint.path(key), weight=items.weight(key))
+
+    def record(self, request: CrawlRequest, body: Any) -> int:
+        """Add what a response mentions to the frontier, returns the number of items found."""
+        found = discover(body)
+        for kind, key in found:
+            self._items[kind].add(key, 1.0, self._rng)
+
+        page_params = body.get("next_page_params") if isinstance(body, dict) else None
+        if request.endpoint.paginated and page_params:
+            page = CrawlRequest(
+                request.endpoint,
+                request.path,
+                page_params=page_params,
+                depth=request.depth + 1,
+                weight=request.weight,
+            )
+            cursor_id = self._next_cursor_id
+            self._next_cursor_id += 1
+            self._pages[cursor_id] = page
+            evicted = self._cursors.add(cursor_id, page.weight * self.depth_decay ** (page.depth - 1), self._rng)
+            if evicted is not None:
+                del self._pages[evicted]
+        return len(found)
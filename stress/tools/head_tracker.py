@@ -0,0 +1,120 @@
+"""
+Chain head tracking for block-aligned transaction latency.
+
+HeadTracker polls eth_blockNumber once per process in a background thread (plain HTTP,
+not counted in the Locust stats) and remembers when each new head was first seen and
+the typical block interval. Writes wrapped in tx_phases.tx_span take a snapshot of the
+head when the transaction is sent, and once the receipt arrives record:
+
+  - blocks to inclusion       receipt blockNumber - head at submit
+  - latency by submit offset  submit-to-receipt time, bucketed by how far into the
+                              current block interval the transaction was sent
+
+A transaction sent late in the interval that lands 2 blocks later "just missed the
+block"; one sent early that still needs several blocks points at the sequencer. The
+offset resolution is limited by HEAD_POLL_INTERVAL.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+import requests
+
+import stress.tools.config as config
+from stress.tools.background_sampler import BackgroundSampler
+
+HTTP_TIMEOUT_SECONDS = 5
+
+# Weight of the newest interval in the block interval moving average
+INTERVAL_EMA_WEIGHT = 0.2
+
+# A head older than this many block intervals is considered stale (node stalled or tracker stopped)
+MAX_HEAD_AGE_INTERVALS = 10
+
+OFFSET_BUCKETS = ("0-25%", "25-50%", "50-75%", "75-100%")
+OVERDUE_BUCKET = "overdue"
+
+
+@dataclass
+class HeadSnapshot:
+    """Head block at the moment a transaction was submitted."""
+
+    block_number: int
+    offset: float  # fraction of the block interval elapsed since the head arrived
+
+    @property
+    def offset_bucket(self) -> str:
+        if self.offset >= 1.0:
+            return OVERDUE_BUCKET
+        return OFFSET_BUCKETS[int(self.offset * len(OFFSET_BUCKETS))]
+
+
+class HeadTracker(BackgroundSampler):
+    """Background thread that follows the head block of one RPC endpoint."""
+
+    @classmethod
+    def get_tracker(cls, rpc_url: str):
+        """Get the process-wide tracker, creating it for rpc_url on first use"""
+        if cls._instance is None:
+            cls._instance = cls(rpc_url, config.head_poll_interval)
+            logging.info("Created head tracker for %s", rpc_url)
+        return cls._instance
+
+    @classmethod
+    def for_test(cls, environment):
+        """Follow the head of the tested host when HEAD_TRACKER is enabled."""
+        if config.head_tracker and environment.host:
+            return cls.get_tracker(environment.host)
+        return None
+
+    @classmethod
+    def snapshot(cls) -> HeadSnapshot | None:
+        """Current head and offset into its interval, None unless a tracker is running."""
+        tracker = cls._instance
+        if tracker is None:
+            return None
+        return tracker.current()
+
+    def __init__(self, rpc_url: str, poll_interval: float = 0.1):
+        super().__init__(poll_interval)
+        self.rpc_url = rpc_url
+        self.head: int | None = None
+        self.head_seen_at: float | None = None  # time.monotonic()
+        self.block_interval: float | None = None
+
+    def current(self) -> HeadSnapshot | None:
+        if self.head is None or self.head_seen_at is None or not self.block_interval:
+            return None
+        elapsed = time.monotonic() - self.head_seen_at
+        if elapsed > self.block_interval * MAX_HEAD_AGE_INTERVALS:
+            return None
+        return HeadSnapshot(block_number=self.head, offset=elapsed / self.block_interval)
+
+    def poll(self):
+        payload = {"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1}
+        try:
+            response = requests.post(self.rpc_url, json=payload, timeout=HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            number = int(response.json()["result"], 16)
+        except Exception as e:
+            logging.warning("HeadTracker: Could not read eth_blockNumber from %s: %s", self.rpc_url, e)
+            return
+
+        now = time.monotonic()
+        if self.head is not None and number > self.head:
+            # Several blocks between polls share the elapsed time
+            interval = (now - self.head_seen_at) / (number - self.head)
+            if self.block_interval is None:
+                self.block_interval = interval
+            else:
+                self.block_interval += INTERVAL_EMA_WEIGHT * (interval - self.block_interval)
+        if self.head is None or number > self.head:
+            self.head = number
+            self.head_seen_at = now
+
+    def run_once(self):
+        self.poll()
+
+
+HeadTracker.listen_to_tests()
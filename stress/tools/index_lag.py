@@ -0,0 +1,272 @@
+"""
+Explorer / indexer lag under write load.
+
+Writers hand the transactions they got a receipt for to IndexLagProbe.submit (a
+INDEX_LAG_SAMPLE_RATE fraction of them). A background thread per process, enabled by
+setting LOCUST_EXPLORER_HOST to the Blockscout proxy, polls for every sampled write
+
+  - blockscout     GET /api/v2/transactions/{hash}
+  - arkiv-indexer  GET /arkiv-indexer/api/v1/entity/{key}   (up to MAX_KEYS_PER_WRITE
+                   of the created entities, picked at random)
+
+with a growing delay until it is found, and records the time from the receipt to the
+first successful lookup as loadtest_index_lag_milliseconds{indexer=...}. Writes that are
+still missing after INDEX_LAG_TIMEOUT seconds are counted in
+loadtest_index_lag_timeouts_total. Every loop iteration sends at most
+MAX_LOOKUPS_PER_ITERATION lookups, so the probe does not load the explorer it measures.
+
+On the master / local runner the thread also compares the head of the tested host with
+the latest block each indexer has seen and exports the difference as
+loadtest_indexer_backlog_blocks{indexer=...}.
+
+Lookups are plain HTTP (not counted in the Locust stats), so the probe adds no requests
+to the statistics of the tested endpoints.
+"""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import requests
+from locust.runners import LocalRunner, MasterRunner
+
+import stress.tools.config as config
+from stress.tools.background_sampler import BackgroundSampler
+from stress.tools.metrics import Metrics
+
+HTTP_TIMEOUT_SECONDS = 5
+
+BLOCKSCOUT = "blockscout"
+ARKIV_INDEXER = "arkiv-indexer"
+
+# Polling schedule of one write (seconds)
+INITIAL_BACKOFF = 0.25
+MAX_BACKOFF = 2.0
+BACKOFF_FACTOR = 2.0
+
+# Upper bound of lookups sent per loop iteration, the rest waits for the next one
+MAX_LOOKUPS_PER_ITERATION = 50
+
+# Entities of a sampled write looked up in the arkiv-indexer (big batches create 1000)
+MAX_KEYS_PER_WRITE = 3
+
+LOOP_INTERVAL = 0.1
+BACKLOG_INTERVAL = 5.0
+
+
+def normalize_hash(value) -> str:
+    """0x-prefixed lowercase hex of a tx hash / entity key (str, bytes or HexBytes)."""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.hex()
+    value = str(value).lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+@dataclass
+class PendingWrite:
+    """A sampled write waiting to show up in the indexers."""
+
+    tx_hash: str
+    entity_keys: list[str]
+    block_number: int | None
+    submitted: float  # time.monotonic() when the receipt arrived
+    next_poll: float
+    backoff: float = INITIAL_BACKOFF
+    # Lookups not found yet: (indexer, path)
+    missing: set[tuple[str, str]] = field(default_factory=set)
+
+
+def lookups(tx_hash: str, entity_keys: list[str]) -> set[tuple[str, str]]:
+    """Explorer lookups that succeed once the write is indexed."""
+    paths = {(BLOCKSCOUT, f"/api/v2/transactions/{tx_hash}")}
+    paths.update((ARKIV_INDEXER, f"/arkiv-indexer/api/v1/entity/{key}") for key in entity_keys)
+    return paths
+
+
+def is_indexed(indexer: str, response) -> bool:
+    """Whether a lookup response shows the write as indexed."""
+    if response.status_code != 200:
+        return False
+    if indexer == BLOCKSCOUT:
+        # Blockscout also returns transactions it only saw in the mempool, without a block
+        body = response.json()
+        return body.get("block_number", body.get("block")) is not None
+    return True
+
+
+class IndexLagProbe(BackgroundSampler):
+    """Background thread polling the explorer until sampled writes are indexed."""
+
+    @classmethod
+    def get_probe(cls):
+        """Get the process-wide probe (None when LOCUST_EXPLORER_HOST is not set)"""
+        if cls._instance is None and config.explorer_host:
+            cls._instance = cls(config.explorer_host.rstrip("/"))
+            logging.info(
+                "Probing index lag of %.1f%% of the writes on %s",
+                config.index_lag_sample_rate * 100,
+                config.explorer_host,
+            )
+        return cls._instance
+
+    @classmethod
+    def for_test(cls, environment):
+        """Probe in every process; the backlog is sampled once (master / local runner)."""
+        probe = cls.get_probe()
+        if probe is not None and isinstance(getattr(environment, "runner", None), (MasterRunner, LocalRunner)):
+            probe.rpc_url = environment.host
+        return probe
+
+    def __init__(self, explorer_url: str, rpc_url: str | None = None):
+        super().__init__(LOOP_INTERVAL)
+        self.explorer_url = explorer_url
+        self.rpc_url = rpc_url
+        self.sample_rate = config.index_lag_sample_rate
+        self.timeout = config.index_lag_timeout
+        self.max_pending = config.index_lag_max_pending
+        self._pending: list[PendingWrite] = []
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._next_backlog = 0.0
+
+    def submit(self, tx_hash, entity_keys=(), block_number: int | None = None):
+        """Track a confirmed write (sampled, dropped when too many are pending)."""
+        if random.random() >= self.sample_rate:
+            return
+        tx_hash = normalize_hash(tx_hash)
+        keys = [normalize_hash(key) for key in entity_keys]
+        if len(keys) > MAX_KEYS_PER_WRITE:
+            keys = random.sample(keys, MAX_KEYS_PER_WRITE)
+        now = time.monotonic()
+        write = PendingWrite(
+            tx_hash=tx_hash,
+            entity_keys=keys,
+            block_number=block_number,
+            submitted=now,
+            next_poll=now + INITIAL_BACKOFF,
+            missing=lookups(tx_hash, keys),
+        )
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                logging.debug(
+                    "IndexLagProbe: %s writes pending, dropping %s", len(self._pending), tx_hash
+                )
+                return
+            self._pending.append(write)
+
+    def _lookup(self, write: PendingWrite, budget: int) -> int:
+        """
+        Poll the lookups of one write still missing, at most budget of them.
+
+        Returns the number of requests sent.
+        """
+        sent = 0
+        for indexer, path in sorted(write.missing):
+            if sent >= budget or self.stopping:
+                break
+            sent += 1
+            try:
+                response = self._session.get(self.explorer_url + path, timeout=HTTP_TIMEOUT_SECONDS)
+                if not is_indexed(indexer, response):
+                    continue
+            except Exception as e:
+                logging.debug("IndexLagProbe: Lookup %s failed: %s", path, e)
+                continue
+            write.missing.discard((indexer, path))
+            lag = timedelta(seconds=time.monotonic() - write.submitted)
+            Metrics.get_metrics().record_index_lag(indexer, lag)
+        return sent
+
+    def poll(self):
+        """Look up the writes that are due, drop the indexed and timed out ones."""
+        now = time.monotonic()
+        with self._lock:
+            due = [write for write in self._pending if write.next_poll <= now]
+        budget = MAX_LOOKUPS_PER_ITERATION
+        for write in sorted(due, key=lambda w: w.next_poll):
+            if budget <= 0 or self.stopping:
+                break
+            budget -= self._lookup(write, budget)
+            write.backoff = min(write.backoff * BACKOFF_FACTOR, MAX_BACKOFF)
+            write.next_poll = time.monotonic() + write.backoff
+
+        now = time.monotonic()
+        metrics = Metrics.get_metrics()
+        with self._lock:
+            remaining = []
+            for write in self._pending:
+                if not write.missing:
+                    continue
+                if now - write.submitted > self.timeout:
+                    for indexer, _ in write.missing:
+                        metrics.record_index_lag_timeout(indexer)
+                    logging.warning(
+                        "IndexLagProbe: %s not indexed by %s after %ss",
+                        write.tx_hash,
+                        sorted({indexer for indexer, _ in write.missing}),
+                        self.timeout,
+                    )
+                    continue
+                remaining.append(write)
+            self._pending = remaining
+
+    def _explorer_json(self, path: str) -> dict:
+        response = self._session.get(self.explorer_url + path, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return response.json()
+
+    def indexed_heads(self) -> dict[str, int]:
+        """Latest block seen by each indexer (missing when it could not be read)."""
+        heads = {}
+        try:
+            items = self._explorer_json("/api/v2/blocks?type=block").get("items") or []
+            if items:
+                heads[BLOCKSCOUT] = int(items[0]["height"])
+        except Exception as e:
+            logging.debug("IndexLagProbe: Could not read the Blockscout head: %s", e)
+        try:
+            items = self._explorer_json("/arkiv-indexer/api/v1/operations?page_size=1").get("items") or []
+            if items:
+                heads[ARKIV_INDEXER] = int(items[0]["block_number"])
+        except Exception as e:
+            logging.debug("IndexLagProbe: Could not read the arkiv-indexer head: %s", e)
+        return heads
+
+    def sample_backlog(self):
+        """Export chain head minus the latest block of each indexer."""
+        payload = {"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1}
+        try:
+            response = self._session.post(self.rpc_url, json=payload, timeout=HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            head = int(response.json()["result"], 16)
+        except Exception as e:
+            logging.warning(
+                "IndexLagProbe: Could not read eth_blockNumber from %s: %s", self.rpc_url, e
+            )
+            return
+        for indexer, indexed in self.indexed_heads().items():
+            Metrics.get_metrics().record_indexer_backlog(indexer, head - indexed)
+
+    def run_once(self):
+        self.poll()
+        if self.rpc_url and time.monotonic() >= self._next_backlog:
+            self._next_backlog = time.monotonic() + BACKLOG_INTERVAL
+            self.sample_backlog()
+
+
+def submit_receipt(receipt):
+    """Track an Arkiv SDK receipt (tx_hash, block_number, creates) when the probe is enabled."""
+    probe = IndexLagProbe.get_probe()
+    if probe is None or receipt is None:
+        return
+    tx_hash = getattr(receipt, "tx_hash", None)
+    if tx_hash is None:
+        return
+    keys = [create.key for create in getattr(receipt, "creates", None) or []]
+    probe.submit(tx_hash, keys, getattr(receipt, "block_number", None))
+
+
+IndexLagProbe.listen_to_tests()
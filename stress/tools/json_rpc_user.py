@@ -1,8 +1,64 @@
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
 import json
 import logging
+import time
 
+import web3
+from arkiv import Arkiv
+from arkiv.account import NamedAccount
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from locust import events
+from locust.contrib.fasthttp import FastHttpSession
+from web3 import Web3
+
+import stress.tools.config as config
 from stress.tools.base_user import BaseUser
+from stress.tools.endpoints import ReadEndpoint, ReadEndpointPool
+from stress.tools.mempool import MempoolThrottle
+from stress.tools.sample_sink import sample_context
+from stress.tools.trace import record_operation
+from stress.tools.tx_phases import record_rpc_call, record_rpc_start, tx_span
+from stress.tools.utils import build_account_path
+
+Account.enable_unaudited_hdwallet_features()
+
+
+def wrap_json_rpc_session(session, endpoint_name: str | None = None):
+    """
+    Name requests sent through the session after their JSON-RPC method.
+
+    With endpoint_name the request name becomes "<method> [<endpoint_name>]".
+    """
+    original_request_method = session.request
+
+    def wrapped_request(*args, **kwargs):
+        # Add any extra logic here (before calling the original method)
+        call_name = None
+        rpc_method = None
+        if args[0] == "POST":
+            data = kwargs["data"]
+            # data bytes into json
+            data = json.loads(kwargs["data"].decode("utf-8"))
+            rpc_method = data.get("method", None)
+            call_name = rpc_method
+            if endpoint_name and call_name:
+                call_name = f"{call_name} [{endpoint_name}]"
+
+        record_rpc_start(rpc_method)
+        started = time.perf_counter()
+        response = original_request_method(*args, name=call_name, **kwargs)
+        record_rpc_call(rpc_method, started, time.perf_counter(), response)
+
+        if not response.ok:
+            logging.error("%s Error response: %s", call_name, response.text)
+        elif logging.root.isEnabledFor(logging.DEBUG):
+            # Decoding the body is the expensive part, skip it unless it gets logged
+            logging.debug("%s response: %s", call_name, response.text)
+        return response
+
+    session.request = wrapped_request
 
 
 class JsonRpcUser(BaseUser):
@@ -10,26 +66,122 @@ class JsonRpcUser(BaseUser):
 
     abstract = True
 
+    account: LocalAccount | None = None
+    w3: Arkiv | None = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        original_request_method = self.client.request
-
-        def wrapped_request(*args, **kwargs):
-            # Add any extra logic here (before calling the original method)
-            call_name = None
-            if args[0] == "POST":
-                data = kwargs["data"]
-                # data bytes into json
-                data = json.loads(kwargs["data"].decode("utf-8"))
-                rpc_method = data.get("method", None)
-                call_name = rpc_method
-
-            response = original_request_method(*args, name=call_name, **kwargs)
-
-            if response.ok:
-                logging.debug(f"{call_name} response: {response.json()}")
-            else:
-                logging.error(f"{call_name} Error response: {response.json()}")
-            return response
-
-        self.client.request = wrapped_request
+        wrap_json_rpc_session(self.client)
+        self.read_pool: ReadEndpointPool | None = None
+
+    def _initialize_account_and_w3(self) -> Arkiv:
+        """Derive the user's account and connect to the host through the user's session (once)."""
+        if self.account is None or self.w3 is None:
+            account_path = build_account_path(self.id)
+            self.account = Account.from_mnemonic(config.mnemonic, account_path=account_path)
+
+            self.w3 = Arkiv(
+                web3.HTTPProvider(endpoint_uri=self.client.base_url, session=self.client),
+                NamedAccount(name="LocalSigner", account=self.account),
+            )
+            if not self.w3.is_connected():
+                raise RuntimeError(f"Not connected to Arkiv RPC at {self.client.base_url}")
+
+            if config.chain_env == "local":
+                self._topup_local_account()
+
+        return self.w3
+
+    def _topup_local_account(self) -> None:
+        """Top up local account with ETH from the first dev account."""
+        if self.w3 is None or self.account is None:
+            return
+        try:
+            accounts = self.w3.eth.accounts
+            balance = Web3.from_wei(self.w3.eth.get_balance(self.account.address), "ether")
+            if balance < 0.1:
+                tx_hash = self.w3.eth.send_transaction(
+                    {"from": accounts[0], "to": self.account.address, "value": Web3.to_wei(10, "ether")}
+                )
+                self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        except Exception:
+            return
+
+    def _fire_locust_request(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        trace: dict[str, Any] | None = None,
+        entity_count: int | None = None,
+    ) -> Any:
+        """
+        Run fn as one Locust request; with trace (record_operation kwargs) it is also traced.
+
+        entity_count and the block of the receipt fn returns go into the request context.
+        """
+        start = time.perf_counter()
+        exc: BaseException | None = None
+        result = None
+        try:
+            with tx_span(name):
+                result = fn()
+            return result
+        except BaseException as e:
+            exc = e
+            raise
+        finally:
+            events.request.fire(
+                request_type="arkiv",
+                name=name,
+                response_time=(time.perf_counter() - start) * 1000,
+                response_length=0,
+                exception=exc,
+                context=sample_context(entity_count, result),
+                response=None,
+            )
+            if trace is not None:
+                record_operation(self.id, name=name, started_at=start, exception=exc, **trace)
+
+    def _read_endpoint_session(self, url: str, name: str) -> FastHttpSession:
+        """Separate session (and connection pool) for one read endpoint."""
+        session = FastHttpSession(
+            self.environment,
+            base_url=url,
+            user=self,
+            network_timeout=self.network_timeout,
+            connection_timeout=self.connection_timeout,
+        )
+        wrap_json_rpc_session(session, name)
+        return session
+
+    @contextmanager
+    def read_endpoint(self, write_w3: Arkiv) -> Iterator[ReadEndpoint]:
+        """
+        Lease the endpoint a read should be sent to.
+
+        Without LOCUST_READ_HOSTS reads stay on the write host and use write_w3.
+        """
+        if not config.read_hosts:
+            yield ReadEndpoint(name="", url=self.host, w3=write_w3)
+            return
+
+        if self.read_pool is None:
+            self.read_pool = ReadEndpointPool(
+                config.read_hosts, config.read_balancing, self._read_endpoint_session
+            )
+        with self.read_pool.lease() as endpoint:
+            yield endpoint
+
+    def wait_for_write_slot(self) -> float:
+        """
+        Wait until the mempool throttle admits one more write transaction.
+
+        No-op unless MEMPOOL_BACKPRESSURE is set. Call it before timing a write so the
+        wait is not counted as transaction latency.
+
+        Returns:
+            Time waited in seconds
+        """
+        if not config.mempool_backpressure:
+            return 0.0
+        return MempoolThrottle.get_throttle(self.host).acquire()
@@ -0,0 +1,140 @@
+"""
+Process-wide logging for the Locust users.
+
+configure_logging() runs once per process (the users call it from __init__, later calls
+are no-ops). The root logger gets a single QueueHandler; a QueueListener drains the
+queue and does the formatting and the console / locust.log writes, so a user that logs
+only pays for putting the record on the queue. Records are queued unformatted (the
+message is built from msg % args by the listener), so log with %-style arguments
+instead of f-strings to keep the formatting off the hot path as well.
+
+Records below WARNING go through a per-call-site filter first:
+
+  - LOG_SAMPLE_RATE   fraction of the records of a call site that are kept
+  - LOG_RATE_LIMIT    records per second and call site (token bucket with the same burst,
+                      0 = unlimited)
+
+The next record a call site emits reports how many were dropped since the last one.
+Warnings and errors are never dropped.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from locust import events
+
+import stress.tools.config as config
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FILE = "locust.log"
+
+_listener: QueueListener | None = None
+
+
+class _CallSiteBudget:
+    __slots__ = ("tokens", "updated", "dropped")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.dropped = 0
+
+
+class CallSiteFilter(logging.Filter):
+    """Samples and rate limits the records below WARNING of every call site."""
+
+    def __init__(self, sample_rate: float = 1.0, rate_limit: float = 0.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        # At least one record must fit the bucket, also below one record per second
+        self.burst = max(1.0, rate_limit)
+        self._sites: dict[tuple[str, int], _CallSiteBudget] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        site = (record.pathname, record.lineno)
+        budget = self._sites.get(site)
+        if budget is None:
+            budget = self._sites[site] = _CallSiteBudget(self.burst, now)
+
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            budget.dropped += 1
+            return False
+        if self.rate_limit > 0:
+            budget.tokens = min(self.burst, budget.tokens + (now - budget.updated) * self.rate_limit)
+            budget.updated = now
+            if budget.tokens < 1.0:
+                budget.dropped += 1
+                return False
+            budget.tokens -= 1.0
+
+        if budget.dropped:
+            _append_dropped(record, budget.dropped)
+            budget.dropped = 0
+        return True
+
+
+def _append_dropped(record: logging.LogRecord, dropped: int):
+    if isinstance(record.args, tuple) and record.args:
+        record.msg = f"{record.msg} (%d similar dropped)"
+        record.args = (*record.args, dropped)
+    elif not record.args:
+        record.msg = f"{record.msg} ({dropped} similar dropped)"
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener (the queue stays in process)."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging():
+    """Route all logging of this process through one queue, once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    console = logging.StreamHandler()
+    console.setFormatter(formatter)
+    file = logging.FileHandler(LOG_FILE)
+    file.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(CallSiteFilter(config.log_sample_rate, config.log_rate_limit))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config.log_level)
+
+    _listener = QueueListener(log_queue, console, file, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush the queued records and stop the listener."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+@events.quitting.add_listener
+def on_quitting_logging(environment, **kwargs):
+    shutdown_logging()
@@ -0,0 +1,186 @@
+"""
+Mempool sampling and write backpressure.
+
+MempoolSampler polls txpool_status (cheap, counts only - unlike txpool_content used by
+show-mempool.py) once per process in a background thread and exports the pending and
+queued depth as metrics. In the processes where ChainStateSampler runs (master / local
+runner of stress/l3/locustfile.py) txpool_status is one of its batched probes, so the
+sampler is fed from there (feed_externally / record) and does not poll on its own.
+
+MempoolThrottle is a token bucket that JsonRpcUser writers pass through before sending
+a transaction (JsonRpcUser.wait_for_write_slot). Its refill rate depends on the sampled
+mempool depth:
+
+  - depth <= MEMPOOL_LOW_WATERMARK    full rate (MEMPOOL_MAX_WRITE_RATE tx/s per process,
+                                      0 = unlimited)
+  - between the watermarks            rate scaled down linearly towards 0
+  - depth >= MEMPOOL_HIGH_WATERMARK   writes wait until the mempool drains
+
+Writers therefore slow down before the txpool explodes, and latency percentiles keep
+measuring the node instead of queueing in the mempool.
+"""
+
+import logging
+import time
+
+import requests
+
+import stress.tools.config as config
+from stress.tools.background_sampler import BackgroundSampler
+from stress.tools.metrics import Metrics
+
+HTTP_TIMEOUT_SECONDS = 5
+
+# How often a throttled writer re-checks the bucket while waiting (seconds)
+THROTTLE_POLL_INTERVAL = 0.1
+
+# Sampled depth older than this is considered unknown and does not throttle (seconds)
+MAX_SAMPLE_AGE = 10.0
+
+
+def read_txpool_status(rpc_url: str, timeout: float = HTTP_TIMEOUT_SECONDS) -> tuple[int, int] | None:
+    """Return (pending, queued) transaction counts from txpool_status, or None if unavailable."""
+    payload = {"jsonrpc": "2.0", "method": "txpool_status", "params": [], "id": 1}
+    try:
+        response = requests.post(rpc_url, json=payload, timeout=timeout)
+        response.raise_for_status()
+        result = response.json().get("result") or {}
+        return int(result.get("pending", "0x0"), 16), int(result.get("queued", "0x0"), 16)
+    except Exception as e:
+        logging.warning("Could not read txpool_status from %s: %s", rpc_url, e)
+        return None
+
+
+class MempoolSampler(BackgroundSampler):
+    """Background thread that periodically samples the mempool depth of one RPC endpoint."""
+
+    # Set when another sampler feeds the depth through record(), no thread is started then
+    external_source = False
+
+    @classmethod
+    def get_sampler(cls, rpc_url: str):
+        """Get the process-wide sampler, creating it for rpc_url on first use"""
+        if cls._instance is None:
+            cls._instance = cls(rpc_url, config.mempool_sample_interval)
+            logging.info("Created mempool sampler for %s", rpc_url)
+        return cls._instance
+
+    @classmethod
+    def feed_externally(cls):
+        """Take the depth from record() calls of another sampler instead of polling it."""
+        cls.external_source = True
+
+    @classmethod
+    def for_test(cls, environment):
+        """Sample the mempool of the tested host when sampling or backpressure is enabled."""
+        if (config.mempool_sampler or config.mempool_backpressure) and environment.host:
+            return cls.get_sampler(environment.host)
+        return None
+
+    def __init__(self, rpc_url: str, sample_interval: float = 1.0):
+        super().__init__(sample_interval)
+        self.rpc_url = rpc_url
+        self.pending = 0
+        self.queued = 0
+        self.sampled_at: float | None = None
+
+    @property
+    def depth(self) -> int | None:
+        """Pending + queued transactions, or None when there is no recent sample."""
+        if self.sampled_at is None or time.monotonic() - self.sampled_at > MAX_SAMPLE_AGE:
+            return None
+        return self.pending + self.queued
+
+    def record(self, pending: int, queued: int):
+        """Store and export one depth sample."""
+        self.pending, self.queued = pending, queued
+        self.sampled_at = time.monotonic()
+        Metrics.get_metrics().record_mempool_depth(pending, queued)
+
+    def sample(self):
+        status = read_txpool_status(self.rpc_url)
+        if status is not None:
+            self.record(*status)
+
+    def run_once(self):
+        self.sample()
+
+    def start(self):
+        """Start the polling thread, unless the depth is fed by another sampler."""
+        if self.external_source:
+            return
+        super().start()
+
+
+class MempoolThrottle:
+    """Token bucket whose rate shrinks as the sampled mempool depth grows."""
+
+    _instance = None
+
+    @classmethod
+    def get_throttle(cls, rpc_url: str):
+        """Get the process-wide throttle (starts the mempool sampler if needed)"""
+        if cls._instance is None:
+            sampler = MempoolSampler.get_sampler(rpc_url)
+            sampler.start()
+            cls._instance = cls(
+                sampler,
+                low_watermark=config.mempool_low_watermark,
+                high_watermark=config.mempool_high_watermark,
+                max_rate=config.mempool_max_write_rate,
+            )
+            logging.info(
+                "Created mempool throttle (watermarks: %s/%s, max rate: %s tx/s)",
+                config.mempool_low_watermark,
+                config.mempool_high_watermark,
+                config.mempool_max_write_rate,
+            )
+        return cls._instance
+
+    def __init__(self, sampler: MempoolSampler, low_watermark: int, high_watermark: int, max_rate: float):
+        self.sampler = sampler
+        self.low_watermark = low_watermark
+        self.high_watermark = max(high_watermark, low_watermark + 1)
+        self.max_rate = max_rate
+        self.burst = max(1.0, max_rate)
+        self.tokens = self.burst
+        self._refilled_at = time.monotonic()
+
+    def current_rate(self) -> float | None:
+        """Allowed writes per second for the current depth (None = unlimited)."""
+        depth = self.sampler.depth
+        if depth is None or depth <= self.low_watermark:
+            return self.max_rate if self.max_rate > 0 else None
+        if depth >= self.high_watermark:
+            return 0.0
+        if self.max_rate <= 0:
+            # Pure watermark gating: writes flow freely until the high watermark
+            return None
+        fraction = (self.high_watermark - depth) / (self.high_watermark - self.low_watermark)
+        return self.max_rate * fraction
+
+    def acquire(self) -> float:
+        """Wait for one write token and return how long the caller waited in seconds."""
+        started = time.monotonic()
+        while True:
+            rate = self.current_rate()
+            now = time.monotonic()
+            if rate is None:
+                self._refilled_at = now
+                break
+
+            self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                break
+
+            wait = (1 - self.tokens) / rate if rate > 0 else THROTTLE_POLL_INTERVAL
+            time.sleep(min(wait, THROTTLE_POLL_INTERVAL))
+
+        waited = time.monotonic() - started
+        Metrics.get_metrics().record_backpressure_wait(waited, rate)
+        return waited
+
+
+MempoolSampler.listen_to_tests()
@@ -12,6 +12,7 @@ from prometheus_client import (
     disable_created_metrics,
 )
 
+
 # Prometheus Push Gateway constants
 PUSHGATEWAY_HOST = os.getenv("PUSHGATEWAY_HOST", "metrics.golem.network")
 PUSHGATEWAY_PORT = os.getenv("PUSHGATEWAY_PORT", "9092")
@@ -218,6 +219,346 @@ class Metrics:
             registry=self.registry,
         )
 
+        # Transaction latency split into phases (see stress/tools/tx_phases.py)
+        self.transaction_phase_time = Histogram(
+            "loadtest_transaction_phase_time_milliseconds",
+            "Time spent in each phase of a transaction (client, estimate_gas, prepare, send, inclusion_wait, receipt)",
+            ["phase"],
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        # Block-aligned inclusion (see stress/tools/head_tracker.py)
+        self.blocks_to_inclusion = Histogram(
+            "loadtest_blocks_to_inclusion",
+            "Number of blocks between the head at submit time and the block including the transaction",
+            buckets=[0, 1, 2, 3, 4, 5, 7, 10, 15, 20, 30, 50],
+            registry=self.registry,
+        )
+
+        self.inclusion_time_by_submit_offset = Histogram(
+            "loadtest_inclusion_time_by_submit_offset_milliseconds",
+            "Submit-to-receipt time by how far into the block interval the transaction was sent",
+            ["submit_offset"],
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        # Read-your-writes visibility lag (in milliseconds), from receipt to first successful query
+        self.visibility_lag = Histogram(
+            "loadtest_visibility_lag_milliseconds",
+            "Time from transaction receipt until a created entity is visible to query_entities",
+            ["endpoint"],
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        # Read-your-writes visibility lag expressed in blocks after the creation block
+        self.visibility_lag_blocks = Histogram(
+            "loadtest_visibility_lag_blocks",
+            "Number of blocks between entity creation and its first visibility to query_entities",
+            ["endpoint"],
+            buckets=[0, 1, 2, 3, 4, 5, 7, 10, 15, 20, 30, 50, 100],
+            registry=self.registry,
+        )
+
+        self.visibility_timeouts = Counter(
+            "loadtest_visibility_timeouts_total",
+            "Total number of entities that did not become visible before the polling timeout",
+            ["endpoint"],
+            registry=self.registry,
+        )
+
+        # Entity lifecycle operations (create / update / extend / delete / change_owner)
+        self.entity_operations = Counter(
+            "loadtest_entity_operations_total",
+            "Total number of entity lifecycle operations executed",
+            ["operation"],
+            registry=self.registry,
+        )
+
+        self.entity_operation_time = Histogram(
+            "loadtest_entity_operation_time_milliseconds",
+            "Time taken by entity lifecycle operations in milliseconds",
+            ["operation"],
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        self.entity_operation_gas = Histogram(
+            "loadtest_entity_operation_gas",
+            "Gas used by entity lifecycle operations",
+            ["operation"],
+            buckets=[
+                21_000,
+                30_000,
+                50_000,
+                75_000,
+                100_000,
+                150_000,
+                200_000,
+                300_000,
+                500_000,
+                1_000_000,
+                2_000_000,
+                5_000_000,
+            ],
+            registry=self.registry,
+        )
+
+        # Adaptive batch sizing (see stress/tools/adaptive_batcher.py)
+        self.adaptive_batch_size = Gauge(
+            "loadtest_adaptive_batch_size",
+            "Number of entities chosen for the latest adaptive batch",
+            registry=self.registry,
+        )
+
+        self.adaptive_gas_per_entity = Gauge(
+            "loadtest_adaptive_gas_per_entity",
+            "Learned gas cost per created entity",
+            registry=self.registry,
+        )
+
+        self.adaptive_gas_per_byte = Gauge(
+            "loadtest_adaptive_gas_per_byte",
+            "Learned gas cost per payload byte",
+            registry=self.registry,
+        )
+
+        self.adaptive_fill_multiplier = Gauge(
+            "loadtest_adaptive_fill_multiplier",
+            "Current backoff multiplier applied to the adaptive batch gas target",
+            registry=self.registry,
+        )
+
+        self.adaptive_backoffs = Counter(
+            "loadtest_adaptive_backoffs_total",
+            "Total number of adaptive batches rejected for their size",
+            ["reason"],
+            registry=self.registry,
+        )
+
+        # Mempool depth sampled with txpool_status (see stress/tools/mempool.py)
+        self.mempool_pending = Gauge(
+            "arkiv_mempool_pending_transactions",
+            "Number of pending transactions in the node mempool",
+            registry=self.registry,
+        )
+
+        self.mempool_queued = Gauge(
+            "arkiv_mempool_queued_transactions",
+            "Number of queued transactions in the node mempool",
+            registry=self.registry,
+        )
+
+        self.backpressure_wait = Counter(
+            "loadtest_backpressure_wait_seconds_total",
+            "Total time writers waited for the mempool throttle",
+            registry=self.registry,
+        )
+
+        self.backpressure_write_rate = Gauge(
+            "loadtest_backpressure_write_rate",
+            "Writes per second currently allowed by the mempool throttle (-1 = unlimited)",
+            registry=self.registry,
+        )
+
+        # Chain head as followed by monitors (see stress/l3/expiration_storm.py)
+        self.block_interval = Histogram(
+            "loadtest_block_interval_milliseconds",
+            "Time between the arrival of consecutive blocks at the load test",
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        self.head_lag = Histogram(
+            "loadtest_head_lag_milliseconds",
+            "Time from a block's timestamp until the load test saw it as head",
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        self.rpc_probe_time = Histogram(
+            "loadtest_rpc_probe_time_milliseconds",
+            "Latency of eth_blockNumber probes sent by monitors",
+            buckets=time_buckets,
+            registry=self.registry,
+        )
+
+        # Committed blocks as seen by the block follower (see stress/tools/block_follower.py)
+        self.chain_blocks = Counter(
+            "chain_blocks_total",
+            "Total number of blocks processed by the block follower",
+            registry=self.registry,
+        )
+
+        self.chain_transactions = Counter(
+            "chain_transactions_total",
+            "Total number of transactions committed on chain",
+            ["kind"],
+            registry=self.registry,
+        )
+
+        self.chain_entity_operations = Counter(
+            "chain_entity_operations_total",
+            "Total number of Arkiv entity operations committed on chain",
+            ["operation"],
+            registry=self.registry,
+        )
+
+        self.chain_payload_bytes = Counter(
+            "chain_payload_bytes_total",
+            "Total calldata bytes of committed Arkiv transactions",
+            registry=self.registry,
+        )
+
+        self.chain_gas_used = Counter(
+            "chain_gas_used_total",
+            "Total gas used by committed blocks",
+            registry=self.registry,
+        )
+
+        self.chain_block_fill = Histogram(
+            "chain_block_fill_ratio",
+            "Gas used divided by the gas limit per block",
+            buckets=[0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0],
+            registry=self.registry,
+        )
+
+        self.chain_block_entities = Histogram(
+            "chain_block_entity_operations",
+            "Arkiv creates + updates committed per block",
+            buckets=[0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000],
+            registry=self.registry,
+        )
+
+        self.chain_head = Gauge(
+            "chain_head_block",
+            "Latest block processed by the block follower",
+            registry=self.registry,
+        )
+
+        # Sampled chain state (see stress/tools/chain_state_sampler.py)
+        self.chain_state_head = Gauge(
+            "chain_state_head_block",
+            "Latest block number reported by each node",
+            ["node"],
+            registry=self.registry,
+        )
+
+        self.chain_state_head_lag = Gauge(
+            "chain_state_head_lag_blocks",
+            "Blocks the validator head is behind the sequencer head",
+            registry=self.registry,
+        )
+
+        self.chain_state_base_fee = Gauge(
+            "chain_state_base_fee_wei",
+            "Base fee per gas of the latest block",
+            registry=self.registry,
+        )
+
+        self.chain_state_entities_per_second = Gauge(
+            "chain_state_entities_per_second",
+            "Change of the chain entity count per second between samples",
+            registry=self.registry,
+        )
+
+        self.chain_state_blocks_per_second = Gauge(
+            "chain_state_blocks_per_second",
+            "Sequencer blocks produced per second between samples",
+            registry=self.registry,
+        )
+
+        self.chain_probe_failures = Counter(
+            "loadtest_chain_probe_failures_total",
+            "Total number of failed chain state probes",
+            ["probe"],
+            registry=self.registry,
+        )
+
+        # Explorer / indexer lag (see stress/tools/index_lag.py)
+        self.index_lag = Histogram(
+            "loadtest_index_lag_milliseconds",
+            "Time from transaction receipt until the write is returned by the indexer",
+            ["indexer"],
+            buckets=[250, 500, 1000, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 60000, 120000, 300000],
+            registry=self.registry,
+        )
+
+        self.index_lag_timeouts = Counter(
+            "loadtest_index_lag_timeouts_total",
+            "Total number of lookups that did not find the write before the timeout",
+            ["indexer"],
+            registry=self.registry,
+        )
+
+        self.indexer_backlog = Gauge(
+            "loadtest_indexer_backlog_blocks",
+            "Blocks between the chain head and the latest block seen by the indexer",
+            ["indexer"],
+            registry=self.registry,
+        )
+
+        # Load generator self-monitoring (see stress/tools/self_monitor.py)
+        self.generator_cpu = Gauge(
+            "loadtest_generator_cpu_percent",
+            "CPU usage of the load generator process (100 = one core)",
+            ["worker"],
+            registry=self.registry,
+        )
+
+        self.generator_rss = Gauge(
+            "loadtest_generator_rss_bytes",
+            "Resident memory of the load generator process",
+            ["worker"],
+            registry=self.registry,
+        )
+
+        self.generator_gc_pause = Histogram(
+            "loadtest_generator_gc_pause_milliseconds",
+            "Garbage collector pauses of the load generator process",
+            ["worker", "generation"],
+            buckets=[0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+            registry=self.registry,
+        )
+
+        self.generator_loop_lag = Histogram(
+            "loadtest_generator_loop_lag_milliseconds",
+            "Worst gevent hub wake-up delay per sample of the load generator process",
+            ["worker"],
+            buckets=[1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000],
+            registry=self.registry,
+        )
+
+        self.generator_greenlets = Gauge(
+            "loadtest_generator_greenlets",
+            "Live greenlets in the load generator process",
+            ["worker"],
+            registry=self.registry,
+        )
+
+        self.generator_open_sockets = Gauge(
+            "loadtest_generator_open_sockets",
+            "Open inet sockets of the load generator process",
+            ["worker"],
+            registry=self.registry,
+        )
+
+        self.generator_saturated = Gauge(
+            "loadtest_generator_saturated",
+            "1 while the load generator process is above its CPU threshold",
+            ["worker"],
+            registry=self.registry,
+        )
+
+        self.generator_saturated_seconds = Counter(
+            "loadtest_generator_saturated_seconds",
+            "Total time the load generator process spent above its CPU threshold",
+            ["worker"],
+            registry=self.registry,
+        )
+
         # Load test status metric
         self.loadtest_running = Enum(
             "loadtest_status",
@@ -341,3 +682,136 @@ class Metrics:
         # Convert duration to milliseconds
         duration_ms = duration.total_seconds() * 1000
         self.transaction_time.observe(duration_ms)
+
+    def record_transaction_phases(self, phases: dict[str, float]):
+        """Record the seconds spent in each transaction phase (converted to milliseconds)"""
+        for phase, seconds in phases.items():
+            self.transaction_phase_time.labels(phase=phase).observe(seconds * 1000)
+
+    def record_inclusion(self, blocks: int, submit_offset: str, latency_seconds: float):
+        """Record blocks to inclusion and the submit-to-receipt time (converted to milliseconds)"""
+        self.blocks_to_inclusion.observe(blocks)
+        self.inclusion_time_by_submit_offset.labels(submit_offset=submit_offset).observe(latency_seconds * 1000)
+
+    def record_visibility_lag(self, endpoint: str, lag: timedelta, lag_blocks: int):
+        """Record how long a created entity took to become visible on the given endpoint"""
+        self.visibility_lag.labels(endpoint=endpoint).observe(lag.total_seconds() * 1000)
+        self.visibility_lag_blocks.labels(endpoint=endpoint).observe(max(lag_blocks, 0))
+
+    def record_visibility_timeout(self, endpoint: str, count: int = 1):
+        """Record entities that never became visible on the given endpoint"""
+        self.visibility_timeouts.labels(endpoint=endpoint).inc(count)
+
+    def record_adaptive_batch(
+        self, batch_size: int, gas_per_entity: float, gas_per_byte: float, fill_multiplier: float
+    ):
+        """Record the size chosen for an adaptive batch and the gas model behind it"""
+        self.adaptive_batch_size.set(batch_size)
+        self.adaptive_gas_per_entity.set(gas_per_entity)
+        self.adaptive_gas_per_byte.set(gas_per_byte)
+        self.adaptive_fill_multiplier.set(fill_multiplier)
+
+    def record_adaptive_backoff(self, reason: str):
+        """Record an adaptive batch rejected for its size (gas_limit or oversized)"""
+        self.adaptive_backoffs.labels(reason=reason).inc()
+
+    def record_mempool_depth(self, pending: int, queued: int):
+        """Record the sampled mempool depth"""
+        self.mempool_pending.set(pending)
+        self.mempool_queued.set(queued)
+
+    def record_backpressure_wait(self, waited_seconds: float, write_rate: float | None):
+        """Record time a writer waited for the mempool throttle and the rate it allowed"""
+        self.backpressure_wait.inc(waited_seconds)
+        self.backpressure_write_rate.set(-1 if write_rate is None else write_rate)
+
+    def record_entity_operation(self, operation: str, duration: timedelta, gas: int | None = None):
+        """Record a lifecycle operation with its duration (converted to milliseconds) and gas used"""
+        self.entity_operations.labels(operation=operation).inc()
+        self.entity_operation_time.labels(operation=operation).observe(duration.total_seconds() * 1000)
+        if gas is not None:
+            self.entity_operation_gas.labels(operation=operation).observe(gas)
+
+    def record_block_observation(self, interval_ms: float | None, head_lag_ms: float):
+        """Record the arrival interval (None for the first block) and head lag of a new block"""
+        if interval_ms is not None:
+            self.block_interval.observe(interval_ms)
+        self.head_lag.observe(head_lag_ms)
+
+    def record_rpc_probe(self, latency_ms: float):
+        """Record the latency of a monitor's eth_blockNumber probe"""
+        self.rpc_probe_time.observe(latency_ms)
+
+    def record_chain_block(self, stats):
+        """Record one committed block (a block_follower.BlockStats)"""
+        self.chain_blocks.inc()
+        self.chain_transactions.labels(kind="all").inc(stats.txs)
+        self.chain_transactions.labels(kind="arkiv").inc(stats.arkiv_txs)
+        self.chain_entity_operations.labels(operation="create").inc(stats.creates)
+        self.chain_entity_operations.labels(operation="update").inc(stats.updates)
+        self.chain_payload_bytes.inc(stats.payload_bytes)
+        self.chain_gas_used.inc(stats.gas_used)
+        self.chain_block_fill.observe(stats.fill_ratio)
+        self.chain_block_entities.observe(stats.creates + stats.updates)
+        self.chain_head.set(stats.number)
+
+    def record_chain_state(self, state):
+        """Record one round of sampled chain state (a chain_state_sampler.ChainState)"""
+        if state.entity_count is not None:
+            self.total_entity_count.set(state.entity_count)
+        for node, head in state.head.items():
+            self.chain_state_head.labels(node=node).set(head)
+        if "sequencer" in state.head and "validator" in state.head:
+            self.chain_state_head_lag.set(state.head["sequencer"] - state.head["validator"])
+        if state.base_fee is not None:
+            self.chain_state_base_fee.set(state.base_fee)
+
+    def record_chain_rates(self, entities_per_second: float | None, blocks_per_second: float | None):
+        """Record rates derived from two consecutive chain state samples"""
+        if entities_per_second is not None:
+            self.chain_state_entities_per_second.set(entities_per_second)
+        if blocks_per_second is not None:
+            self.chain_state_blocks_per_second.set(blocks_per_second)
+
+    def record_chain_probe_failure(self, probe: str):
+        """Record a failed chain state probe"""
+        self.chain_probe_failures.labels(probe=probe).inc()
+
+    def record_index_lag(self, indexer: str, lag: timedelta):
+        """Record how long a write took to be returned by the given indexer"""
+        self.index_lag.labels(indexer=indexer).observe(lag.total_seconds() * 1000)
+
+    def record_index_lag_timeout(self, indexer: str, count: int = 1):
+        """Record lookups that never found the write in the given indexer"""
+        self.index_lag_timeouts.labels(indexer=indexer).inc(count)
+
+    def record_indexer_backlog(self, indexer: str, blocks: int):
+        """Record how many blocks the given indexer is behind the chain head"""
+        self.indexer_backlog.labels(indexer=indexer).set(max(blocks, 0))
+
+    def record_generator_sample(
+        self,
+        worker: str,
+        cpu_percent: float,
+        rss_bytes: int,
+        loop_lag_seconds: float,
+        open_sockets: int,
+        greenlets: int | None = None,
+    ):
+        """Record one resource sample of a load generator process (loop lag converted to milliseconds)"""
+        self.generator_cpu.labels(worker=worker).set(cpu_percent)
+        self.generator_rss.labels(worker=worker).set(rss_bytes)
+        self.generator_loop_lag.labels(worker=worker).observe(loop_lag_seconds * 1000)
+        self.generator_open_sockets.labels(worker=worker).set(open_sockets)
+        if greenlets is not None:
+            self.generator_greenlets.labels(worker=worker).set(greenlets)
+        self.generator_saturated.labels(worker=worker).set(0)
+
+    def record_generator_gc_pause(self, worker: str, generation: int, pause_seconds: float):
+        """Record a garbage collector pause of a load generator process (converted to milliseconds)"""
+        self.generator_gc_pause.labels(worker=worker, generation=str(generation)).observe(pause_seconds * 1000)
+
+    def record_generator_saturation(self, worker: str, seconds: float):
+        """Record time a load generator process spent above its CPU threshold"""
+        self.generator_saturated.labels(worker=worker).set(1)
+        self.generator_saturated_seconds.labels(worker=worker).inc(seconds)
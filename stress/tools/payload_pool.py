@@ -0,0 +1,199 @@
+"""
+Preallocated pool of high-entropy payload bytes.
+
+Generating every payload with os.urandom costs a syscall plus a fresh allocation per
+transaction (and the dc generators built them byte by byte). Instead every process
+generates one PAYLOAD_POOL_BYTES buffer once and payloads are memoryview slices of it
+at random offsets, so they stay incompressible without touching the random source.
+
+Slices of the same buffer repeat, so payload() prefixes every payload with a
+PAYLOAD_NONCE_BYTES nonce (process salt + counter) that keeps entities unique.
+
+The buffer is filled from a PRNG with the fixed PAYLOAD_POOL_SEED, so it holds the same
+bytes in every process and run with the same PAYLOAD_POOL_BYTES and compression ratio.
+seeded_payload() builds its nonce and slice offset from the seed alone and therefore
+returns the same payload for the same seed on every run, which the dc_* tests rely on.
+
+Real payloads are rarely random. With PAYLOAD_COMPRESSION_RATIO below 1 the buffer is
+filled with synthetic JSON records instead: words from a small dictionary mixed with
+base64 random blobs. The blob share is calibrated so that zlib compresses the buffer
+to roughly the requested ratio (compressed / original size), which makes the DA bytes
+paid per payload byte tunable. Achievable ratios are about 0.15 - 0.75.
+"""
+
+import base64
+import itertools
+import json
+import logging
+import os
+import random
+import zlib
+
+import stress.tools.config as config
+
+# Per-entity nonce: 8 random bytes per process followed by an 8 byte counter
+PAYLOAD_NONCE_BYTES = 16
+
+# Seed of the buffer contents (not of the slice offsets handed out by payload())
+PAYLOAD_POOL_SEED = 0x41524B4956
+
+# Synthetic JSON records used for compressible payloads
+DICTIONARY = [
+    "node", "workload", "region", "status", "running", "pending", "finished", "failed",
+    "provider", "requestor", "offer", "demand", "agreement", "activity", "invoice", "payment",
+    "cpu", "memory", "storage", "network", "gpu", "image", "runtime", "container",
+    "eu-west", "us-east", "ap-south", "small", "medium", "large", "debug", "subnet",
+]
+STATUSES = ["running", "pending", "finished", "failed"]
+REGIONS = ["eu-west", "us-east", "ap-south"]
+
+# Sample size and bisection steps used to calibrate the random blob share
+CALIBRATION_SAMPLE_BYTES = 64 * 1024
+CALIBRATION_STEPS = 12
+
+
+def compression_ratio(data: bytes) -> float:
+    """zlib compressed size / original size (proxy for the batcher compression)."""
+    if not data:
+        return 1.0
+    return len(zlib.compress(data, 6)) / len(data)
+
+
+def synthetic_json(rng: random.Random, size_bytes: int, random_fraction: float) -> bytes:
+    """
+    JSON lines of at least size_bytes where about random_fraction of the bytes are
+    base64 random blobs and the rest dictionary words and repeated structure.
+    """
+    blob_per_text_byte = random_fraction / max(1.0 - random_fraction, 0.01)
+    lines = []
+    total = 0
+    seq = 0
+    while total < size_bytes:
+        note = " ".join(rng.choice(DICTIONARY) for _ in range(rng.randint(4, 12)))
+        blob_len = int(len(note) * blob_per_text_byte)
+        blob = base64.b64encode(rng.randbytes(blob_len * 3 // 4 + 3))[:blob_len].decode()
+        line = json.dumps(
+            {
+                "seq": seq,
+                "status": rng.choice(STATUSES),
+                "region": rng.choice(REGIONS),
+                "note": note,
+                "blob": blob,
+            },
+            separators=(",", ":"),
+        ).encode() + b"\n"
+        lines.append(line)
+        total += len(line)
+        seq += 1
+    return b"".join(lines)
+
+
+def calibrate_random_fraction(target_ratio: float, rng: random.Random) -> float:
+    """Random blob share for which synthetic_json compresses to about target_ratio."""
+    low, high = 0.0, 1.0
+    for _ in range(CALIBRATION_STEPS):
+        middle = (low + high) / 2
+        sample = synthetic_json(rng, CALIBRATION_SAMPLE_BYTES, middle)
+        if compression_ratio(sample) < target_ratio:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+class PayloadPool:
+    """Process-wide buffer payloads are sliced from, one per compression ratio."""
+
+    _instances: dict[float, "PayloadPool"] = {}
+
+    @classmethod
+    def get_pool(cls, target_ratio: float | None = None):
+        """Get the global payload pool for the ratio (PAYLOAD_COMPRESSION_RATIO by default)"""
+        if target_ratio is None:
+            target_ratio = config.payload_compression_ratio
+        if target_ratio not in cls._instances:
+            cls._instances[target_ratio] = cls(config.payload_pool_bytes, target_ratio)
+            logging.info(
+                "Created payload pool (%s bytes, target compression ratio: %s)",
+                config.payload_pool_bytes,
+                target_ratio,
+            )
+        return cls._instances[target_ratio]
+
+    def __init__(self, size_bytes: int, target_ratio: float = 1.0):
+        self._rng = random.Random()
+        self.target_ratio = target_ratio
+        # None keeps the buffer purely random (incompressible)
+        self._random_fraction = None
+        if target_ratio < 1.0:
+            self._random_fraction = calibrate_random_fraction(
+                target_ratio, random.Random(PAYLOAD_POOL_SEED)
+            )
+        self._buffer = self._generate(size_bytes)
+        self._salt = os.urandom(PAYLOAD_NONCE_BYTES // 2)
+        self._counter = itertools.count()
+
+        if self._random_fraction is not None:
+            achieved = compression_ratio(self._buffer[:CALIBRATION_SAMPLE_BYTES])
+            if abs(achieved - target_ratio) > 0.05:
+                logging.warning(
+                    "Payload pool compresses to %.2f instead of %.2f, "
+                    "the target is outside the achievable range",
+                    achieved,
+                    target_ratio,
+                )
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _generate(self, size_bytes: int) -> memoryview:
+        rng = random.Random(PAYLOAD_POOL_SEED)
+        if self._random_fraction is None:
+            return memoryview(rng.randbytes(size_bytes))
+        return memoryview(synthetic_json(rng, size_bytes, self._random_fraction))
+
+    def _ensure_capacity(self, size_bytes: int):
+        if size_bytes > len(self._buffer):
+            logging.warning(
+                "Payload of %s bytes exceeds the payload pool (%s bytes), regrowing it",
+                size_bytes,
+                len(self._buffer),
+            )
+            self._buffer = self._generate(size_bytes * 2)
+
+    def view(self, size_bytes: int) -> memoryview:
+        """Zero-copy random slice of the pool (shared, repeats across calls)."""
+        self._ensure_capacity(size_bytes)
+        offset = self._rng.randrange(len(self._buffer) - size_bytes + 1)
+        return self._buffer[offset:offset + size_bytes]
+
+    def nonce(self) -> bytes:
+        """Unique nonce for the next entity of this process."""
+        return self._salt + next(self._counter).to_bytes(PAYLOAD_NONCE_BYTES // 2, "big")
+
+    def seeded_payload(self, seed: int, size_bytes: int) -> bytes:
+        """
+        Payload that is regenerated identically for the same seed, in every process and
+        run, so callers can keep the seed instead of the bytes (stable while the pool is
+        not regrown).
+        """
+        nonce = (seed % (1 << (8 * PAYLOAD_NONCE_BYTES))).to_bytes(PAYLOAD_NONCE_BYTES, "big")
+        if size_bytes <= PAYLOAD_NONCE_BYTES:
+            return nonce[PAYLOAD_NONCE_BYTES - size_bytes:]
+        size_bytes -= PAYLOAD_NONCE_BYTES
+        self._ensure_capacity(size_bytes)
+        # Fibonacci hashing spreads consecutive seeds over the whole buffer
+        offset = (seed * 0x9E3779B97F4A7C15) % (len(self._buffer) - size_bytes + 1)
+        return nonce + self._buffer[offset:offset + size_bytes]
+
+    def payload(self, size_bytes: int) -> bytes:
+        """
+        Unique payload of exactly size_bytes (high-entropy unless the pool is compressible).
+
+        The nonce prefix is patched in front of a pool slice, which costs a single copy.
+        Payloads shorter than the nonce get its trailing (counter) bytes.
+        """
+        nonce = self.nonce()
+        if size_bytes <= PAYLOAD_NONCE_BYTES:
+            return nonce[PAYLOAD_NONCE_BYTES - size_bytes:]
+        return nonce + self.view(size_bytes - PAYLOAD_NONCE_BYTES)
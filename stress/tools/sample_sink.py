@@ -0,0 +1,214 @@
+"""
+Raw per-request samples written to Parquet for offline analysis.
+
+The Prometheus histograms only keep bucket counts. With SAMPLE_SINK_DIR set (and the
+optional pyarrow package installed) every sample is also kept raw:
+
+  - every Locust request event (JSON-RPC calls, _fire_locust_request writes, lifecycle
+    and visibility pseudo-requests); a request adds entity_count / block through its
+    context dict (sample_context)
+  - writes that fire no request event of their own (ArkivL3User._store_payload), which
+    call record_sample directly
+
+Samples are appended to per-column lists (a few list appends per sample) and every
+SAMPLE_SINK_BATCH_ROWS rows or FLUSH_INTERVAL seconds handed as one Arrow record batch
+to a native writer thread (gevent threadpool, so compression and disk writes stay off
+the hub). Each process writes its own files, one per test and every ROWS_PER_FILE rows:
+
+    SAMPLE_SINK_DIR/worker=<host>-<pid>/samples-<test start>-<n>.parquet
+
+The worker=... directories are hive partitions, so all workers merge with
+
+    pyarrow.dataset.dataset(SAMPLE_SINK_DIR, partitioning="hive").to_table()
+
+(or pandas / duckdb read_parquet with hive partitioning) and get a worker column.
+"""
+
+import logging
+import os
+import socket
+import time
+
+from gevent.threadpool import ThreadPool
+from locust import events
+
+import stress.tools.config as config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, the sink stays disabled without it
+    pa = None
+    pq = None
+
+FLUSH_INTERVAL = 10.0
+ROWS_PER_FILE = 5_000_000
+
+COLUMNS = ("timestamp", "request_type", "name", "latency_ms", "size", "entity_count", "block", "error")
+
+
+def _schema():
+    return pa.schema(
+        [
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("request_type", pa.dictionary(pa.int32(), pa.string())),
+            ("name", pa.dictionary(pa.int32(), pa.string())),
+            ("latency_ms", pa.float64()),
+            ("size", pa.int64()),
+            ("entity_count", pa.int32()),
+            ("block", pa.int64()),
+            ("error", pa.string()),
+        ]
+    )
+
+
+class SampleSink:
+    """Buffers raw samples column-wise and writes them to Parquet in a native thread."""
+
+    _instance = None
+    _disabled = False
+
+    @classmethod
+    def get_sink(cls):
+        """Get the process-wide sink (None unless SAMPLE_SINK_DIR is set and pyarrow is installed)"""
+        if cls._instance is None and not cls._disabled and config.sample_sink_dir:
+            if pa is None:
+                logging.warning("SAMPLE_SINK_DIR is set but pyarrow is not installed, raw samples are not written")
+                cls._disabled = True
+                return None
+            cls._instance = cls(config.sample_sink_dir, config.sample_sink_batch_rows)
+            logging.info("Writing raw samples to %s", cls._instance.directory)
+        return cls._instance
+
+    def __init__(self, base_dir: str, batch_rows: int = 50_000):
+        self.worker = f"{socket.gethostname()}-{os.getpid()}"
+        self.directory = os.path.join(base_dir, f"worker={self.worker}")
+        self.batch_rows = max(1, batch_rows)
+        self._columns = self._empty_columns()
+        self._rows = 0
+        self._last_flush = time.monotonic()
+        self._pool = ThreadPool(1)  # one writer thread keeps the batches in order
+        self._schema = _schema()
+        self._test_started = time.strftime("%Y%m%dT%H%M%S")
+        self._writer = None
+        self._file_rows = 0
+        self._file_index = 0
+
+    @staticmethod
+    def _empty_columns() -> dict[str, list]:
+        return {column: [] for column in COLUMNS}
+
+    def record(
+        self,
+        name: str,
+        latency_ms: float,
+        size: int = 0,
+        entity_count: int | None = None,
+        block: int | None = None,
+        error: str | None = None,
+        request_type: str = "metric",
+        timestamp: float | None = None,
+    ):
+        """Buffer one sample (timestamp: time.time() when it started, default now - latency)."""
+        columns = self._columns
+        if timestamp is None:
+            timestamp = time.time() - latency_ms / 1000
+        columns["timestamp"].append(int(timestamp * 1_000_000))
+        columns["request_type"].append(request_type)
+        columns["name"].append(name)
+        columns["latency_ms"].append(latency_ms)
+        columns["size"].append(size)
+        columns["entity_count"].append(entity_count)
+        columns["block"].append(block)
+        columns["error"].append(error)
+        self._rows += 1
+        if self._rows >= self.batch_rows or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Hand the buffered samples to the writer thread."""
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        columns, self._columns, self._rows = self._columns, self._empty_columns(), 0
+        self._pool.spawn(self._write, columns)
+
+    def _write(self, columns: dict[str, list]):
+        """Runs in the writer thread."""
+        try:
+            batch = pa.RecordBatch.from_pydict(columns, schema=self._schema)
+            if self._writer is None or self._file_rows >= ROWS_PER_FILE:
+                self._close_writer()
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, f"samples-{self._test_started}-{self._file_index}.parquet")
+                self._file_index += 1
+                self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+            self._writer.write_batch(batch)
+            self._file_rows += batch.num_rows
+        except Exception as e:
+            logging.error("SampleSink: Could not write %s samples: %s", len(columns["timestamp"]), e)
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._file_rows = 0
+
+    def close(self):
+        """Write the remaining samples and close the current file (the next sample opens a new one)."""
+        self.flush()
+        self._pool.spawn(self._close_writer).get()
+        self._test_started = time.strftime("%Y%m%dT%H%M%S")
+        self._file_index = 0
+
+
+def receipt_block(result) -> int | None:
+    """Block of an Arkiv receipt, also when it is returned next to the entity key (create_entity)."""
+    if isinstance(result, tuple):
+        for item in result:
+            block = receipt_block(item)
+            if block is not None:
+                return block
+        return None
+    return getattr(result, "block_number", None)
+
+
+def sample_context(entity_count: int | None = None, result=None) -> dict:
+    """Request event context with the entity count and the block of the receipt in result."""
+    return {"entity_count": entity_count, "block": receipt_block(result)}
+
+
+def record_sample(name: str, latency_ms: float, **kwargs):
+    """Buffer a raw sample when the sink is enabled (see SampleSink.record)."""
+    sink = SampleSink.get_sink()
+    if sink is not None:
+        sink.record(name, latency_ms, **kwargs)
+
+
+@events.request.add_listener
+def on_request_sample_sink(request_type, name, response_time, response_length, exception=None, context=None, **kwargs):
+    sink = SampleSink.get_sink()
+    if sink is None:
+        return
+    context = context or {}
+    sink.record(
+        name,
+        response_time,
+        size=response_length or 0,
+        entity_count=context.get("entity_count"),
+        block=context.get("block"),
+        error=None if exception is None else f"{type(exception).__name__}: {exception}",
+        request_type=request_type,
+    )
+
+
+@events.test_stop.add_listener
+def on_test_stop_sample_sink(environment, **kwargs):
+    if SampleSink._instance is not None:
+        SampleSink._instance.close()
+
+
+@events.quitting.add_listener
+def on_quitting_sample_sink(environment, **kwargs):
+    if SampleSink._instance is not None:
+        SampleSink._instance.close()
@@ -0,0 +1,150 @@
+"""
+Load generator self-monitoring.
+
+SelfMonitor runs in every process that runs users (workers / local runner, enabled by
+default with SELF_MONITOR) and exports, labelled with the process id:
+
+  - CPU usage of the process (100 = one core) and its resident memory
+  - garbage collector pauses, per generation (gc.callbacks)
+  - gevent hub loop lag: the monitor sleeps LAG_PROBE_INTERVAL at a time and records
+    how late it wakes up; with threading monkey patched it is a greenlet, so a late
+    wake-up means the hub was busy running other greenlets
+  - live greenlets (counted from the gc heap every GREENLET_COUNT_EVERY samples, the
+    scan is too expensive to do every second) and open inet sockets
+
+A process above SELF_MONITOR_CPU_THRESHOLD percent CPU is saturated: one process can
+use a single core, so beyond that point the users wait for the load generator and not
+for the node. Saturation is logged as a warning and accumulated in
+loadtest_generator_saturated_seconds_total; push-results.py adds it to the tracker
+results so such a run is not mistaken for a node regression.
+"""
+
+import gc
+import logging
+import os
+import time
+
+import psutil
+from greenlet import greenlet
+from locust.runners import MasterRunner
+
+import stress.tools.config as config
+from stress.tools.background_sampler import BackgroundSampler
+from stress.tools.metrics import Metrics
+
+LAG_PROBE_INTERVAL = 0.1
+
+GREENLET_COUNT_EVERY = 30
+
+
+class SelfMonitor(BackgroundSampler):
+    """Background thread sampling the resource usage of this Locust process."""
+
+    @classmethod
+    def get_monitor(cls):
+        """Get the process-wide monitor"""
+        if cls._instance is None:
+            cls._instance = cls(config.self_monitor_interval, config.self_monitor_cpu_threshold)
+            logging.info(
+                "Created load generator monitor (interval %ss, CPU threshold %s%%)",
+                config.self_monitor_interval,
+                config.self_monitor_cpu_threshold,
+            )
+        return cls._instance
+
+    @classmethod
+    def for_test(cls, environment):
+        """Monitor every process that runs users (not the master)."""
+        if config.self_monitor and not isinstance(getattr(environment, "runner", None), MasterRunner):
+            return cls.get_monitor()
+        return None
+
+    def __init__(self, interval: float = 1.0, cpu_threshold: float = 90.0):
+        super().__init__(interval)
+        self.cpu_threshold = cpu_threshold
+        self.worker = str(os.getpid())
+        self.saturated = False
+        self._process = psutil.Process()
+        self._samples = 0
+        self._gc_started: float | None = None
+        self.loop_lag = 0.0
+
+    def _on_gc(self, phase: str, info: dict):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_started = None
+            Metrics.get_metrics().record_generator_gc_pause(self.worker, info.get("generation", -1), pause)
+
+    def _open_sockets(self) -> int:
+        try:
+            if hasattr(self._process, "net_connections"):
+                return len(self._process.net_connections(kind="inet"))
+            return len(self._process.connections(kind="inet"))
+        except psutil.Error:
+            return 0
+
+    def run_once(self):
+        """Export one sample; self.loop_lag is the worst wake-up delay (seconds) since the last one."""
+        cpu_percent = self._process.cpu_percent()
+        metrics = Metrics.get_metrics()
+        greenlets = None
+        if self._samples % GREENLET_COUNT_EVERY == 0:
+            greenlets = sum(1 for obj in gc.get_objects() if isinstance(obj, greenlet))
+        self._samples += 1
+        metrics.record_generator_sample(
+            self.worker,
+            cpu_percent,
+            self._process.memory_info().rss,
+            self.loop_lag,
+            self._open_sockets(),
+            greenlets,
+        )
+
+        saturated = cpu_percent > self.cpu_threshold
+        if saturated:
+            metrics.record_generator_saturation(self.worker, self.interval)
+        if saturated and not self.saturated:
+            logging.warning(
+                "Load generator saturated: process %s at %.0f%% CPU (threshold %s%%), "
+                "results are limited by the load generator",
+                self.worker,
+                cpu_percent,
+                self.cpu_threshold,
+            )
+        elif self.saturated and not saturated:
+            logging.info("Load generator back below the CPU threshold: %.0f%% CPU", cpu_percent)
+        self.saturated = saturated
+
+    def _run(self):
+        self._process.cpu_percent()  # first call only sets the baseline
+        next_sample = time.monotonic() + self.interval
+        self.loop_lag = 0.0
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            self._stop_event.wait(LAG_PROBE_INTERVAL)
+            self.loop_lag = max(self.loop_lag, time.monotonic() - started - LAG_PROBE_INTERVAL)
+            if time.monotonic() < next_sample:
+                continue
+            next_sample += self.interval
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error("SelfMonitor: Error sampling the process: %s", e)
+            self.loop_lag = 0.0
+
+    def start(self):
+        """Start the background thread and the GC pause tracking."""
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+        super().start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background thread and the GC pause tracking."""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        super().stop(timeout)
+
+
+SelfMonitor.listen_to_tests()
@@ -0,0 +1,282 @@
+"""
+Compact binary workload traces for L3 stress tests.
+
+A trace is a gzip stream that starts with TRACE_MAGIC followed by one record per
+operation. Every record is a fixed-size little-endian header followed by a JSON
+blob with the variable part (attributes, query string, entity keys, ...):
+
+    timestamp   float64  seconds since the recorder was created (operation start)
+    user_id     uint32   BaseUser id of the user that issued the operation
+    op          uint8    OP_CREATE / OP_UPDATE / OP_QUERY / OP_EXTEND / OP_DELETE / OP_CHANGE_OWNER
+    payload     uint32   payload size in bytes of every entity in the operation
+    count       uint32   number of entities in the operation
+    blob_len    uint32   length of the JSON blob that follows
+
+Payload bytes are not stored - the replayer regenerates random payloads of the
+recorded size, which keeps traces small and payloads incompressible.
+
+Operations are recorded in one place, record_operation(), once they finished: the
+users call it from _fire_locust_request (or wrap the operation in traced_operation),
+and the blob also carries the outcome (duration_ms, error). Every Locust process
+writes its own file, TRACE_RECORD_FILE with "-<host>-<pid>" inserted before the
+extension, so workers of a distributed run do not overwrite each other.
+"""
+
+import gzip
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from locust import events
+from locust.runners import MasterRunner
+
+import stress.tools.config as config
+
+TRACE_MAGIC = b"ARKTRC01"
+
+OP_CREATE = 1
+OP_UPDATE = 2
+OP_QUERY = 3
+OP_EXTEND = 4
+OP_DELETE = 5
+OP_CHANGE_OWNER = 6
+
+OP_NAMES = {
+    OP_CREATE: "create",
+    OP_UPDATE: "update",
+    OP_QUERY: "query",
+    OP_EXTEND: "extend",
+    OP_DELETE: "delete",
+    OP_CHANGE_OWNER: "change_owner",
+}
+
+_RECORD_HEADER = struct.Struct("<dIBIII")
+
+
+@dataclass
+class TraceRecord:
+    """A single recorded operation."""
+
+    timestamp: float
+    user_id: int
+    op: int
+    payload_size: int
+    entity_count: int
+    details: dict[str, Any] = field(default_factory=dict)
+
+
+def encode_record(record: TraceRecord) -> bytes:
+    """Encode a record into its binary representation."""
+    blob = json.dumps(record.details, separators=(",", ":"), default=str).encode(
+        "utf-8"
+    )
+    header = _RECORD_HEADER.pack(
+        record.timestamp,
+        record.user_id,
+        record.op,
+        record.payload_size,
+        record.entity_count,
+        len(blob),
+    )
+    return header + blob
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Read all records from a trace file in recording order."""
+    with gzip.open(path, "rb") as f:
+        magic = f.read(len(TRACE_MAGIC))
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{path} is not an Arkiv workload trace")
+
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) != _RECORD_HEADER.size:
+                raise ValueError(f"Truncated record header in {path}")
+
+            timestamp, user_id, op, payload_size, entity_count, blob_len = (
+                _RECORD_HEADER.unpack(header)
+            )
+            blob = f.read(blob_len)
+            if len(blob) != blob_len:
+                raise ValueError(f"Truncated record body in {path}")
+
+            yield TraceRecord(
+                timestamp=timestamp,
+                user_id=user_id,
+                op=op,
+                payload_size=payload_size,
+                entity_count=entity_count,
+                details=json.loads(blob) if blob else {},
+            )
+
+
+def process_trace_path(path: str) -> str:
+    """Trace file of this process: run.trace -> run-<host>-<pid>.trace"""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{socket.gethostname()}-{os.getpid()}{ext}"
+
+
+def group_by_user(records: Iterator[TraceRecord]) -> dict[int, list[TraceRecord]]:
+    """Split a trace into per-user streams, keeping the recorded order of each user."""
+    streams: dict[int, list[TraceRecord]] = {}
+    for record in records:
+        streams.setdefault(record.user_id, []).append(record)
+    return streams
+
+
+class TraceRecorder:
+    """
+    Process-wide recorder of every operation issued by the L3 users.
+
+    Recording is enabled by setting TRACE_RECORD_FILE; when it is empty
+    get_recorder() returns None and callers skip recording entirely.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_recorder(cls) -> "TraceRecorder | None":
+        """Get the global recorder, or None when recording is disabled"""
+        if not config.trace_record_file:
+            return None
+        if cls._instance is None:
+            cls._instance = cls(process_trace_path(config.trace_record_file))
+            logging.info("Recording workload trace to %s", cls._instance.path)
+        return cls._instance
+
+    def __init__(self, path: str):
+        self.path = path
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(TRACE_MAGIC)
+        self.records_written = 0
+
+    def record(
+        self,
+        user_id: int,
+        op: int,
+        payload_size: int = 0,
+        entity_count: int = 0,
+        started_at: float | None = None,
+        **details: Any,
+    ):
+        """
+        Append one operation to the trace.
+
+        Args:
+            user_id: Id of the user issuing the operation
+            op: Operation type (one of OP_NAMES)
+            payload_size: Payload size in bytes of each entity
+            entity_count: Number of entities in the operation
+            started_at: time.perf_counter() when the operation started (defaults to now)
+            details: Variable part of the record (name, attributes, query, keys, ...)
+        """
+        if started_at is None:
+            started_at = time.perf_counter()
+        data = encode_record(
+            TraceRecord(
+                timestamp=max(started_at - self._start, 0.0),
+                user_id=user_id,
+                op=op,
+                payload_size=payload_size,
+                entity_count=entity_count,
+                details=details,
+            )
+        )
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self.records_written += 1
+
+    def close(self):
+        """Flush and close the trace file"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+        logging.info("Workload trace %s closed with %s records", self.path, self.records_written)
+
+
+def record_operation(
+    user_id: int,
+    op: int,
+    name: str,
+    started_at: float,
+    exception: BaseException | None = None,
+    payload_size: int = 0,
+    entity_count: int = 0,
+    **details: Any,
+):
+    """
+    Record a finished operation in the workload trace (no-op unless TRACE_RECORD_FILE is set).
+
+    Args:
+        user_id: Id of the user that issued the operation
+        op: Operation type (one of OP_NAMES)
+        name: Name the operation is reported under
+        started_at: time.perf_counter() when the operation started
+        exception: The exception the operation failed with, None on success
+        payload_size: Payload size in bytes of each entity
+        entity_count: Number of entities in the operation
+        details: Variable part of the record (attributes, query, keys, ...)
+    """
+    recorder = TraceRecorder.get_recorder()
+    if recorder is None:
+        return
+    recorder.record(
+        user_id,
+        op,
+        payload_size,
+        entity_count,
+        started_at=started_at,
+        name=name,
+        duration_ms=(time.perf_counter() - started_at) * 1000,
+        error=None if exception is None else f"{type(exception).__name__}: {exception}",
+        **details,
+    )
+
+
+@contextmanager
+def traced_operation(
+    user_id: int, op: int, name: str, payload_size: int = 0, entity_count: int = 0, **details: Any
+) -> Iterator[dict[str, Any]]:
+    """
+    Record the operation run inside the block once it finished, with its outcome.
+
+    The yielded dict holds the details; add the ones only known afterwards (e.g. created keys).
+    """
+    started_at = time.perf_counter()
+    exception = None
+    try:
+        yield details
+    except BaseException as e:
+        exception = e
+        raise
+    finally:
+        record_operation(user_id, op, name, started_at, exception, payload_size, entity_count, **details)
+
+
+@events.test_start.add_listener
+def on_test_start_trace(environment, **kwargs):
+    """Open the trace at test start, so record timestamps count from there in every process."""
+    if not isinstance(getattr(environment, "runner", None), MasterRunner):
+        TraceRecorder.get_recorder()
+
+
+@events.quitting.add_listener
+def on_quitting_trace(environment, **kwargs):
+    """Close the trace so the gzip stream is complete."""
+    if TraceRecorder._instance is not None:
+        TraceRecorder._instance.close()
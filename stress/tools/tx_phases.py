@@ -0,0 +1,239 @@
+"""
+Phase-level latency breakdown of Arkiv transactions.
+
+A write wrapped in tx_span(name) collects every JSON-RPC call the user's session sends
+while the span is open (wrap_json_rpc_session reports them), and on exit splits the
+wall-clock time into phases:
+
+  - client          time outside RPC calls before the send and after the receipt
+                    (op encoding, signing, SDK / web3 overhead)
+  - estimate_gas    eth_estimateGas calls before the send
+  - prepare         other RPC calls before the send (nonce, chain id, fees)
+  - send            eth_sendRawTransaction / eth_sendTransaction (RPC front-end)
+  - inclusion_wait  from the send until the last receipt poll started (block inclusion,
+                    including the polls that found no receipt yet)
+  - receipt         the eth_getTransactionReceipt call that returned the receipt
+
+Spans that sent no transaction (reads) are dropped. Phases are exported as the
+loadtest_transaction_phase_time_milliseconds histogram; with TX_SPAN_FILE set a
+TX_SPAN_SAMPLE_RATE fraction of the spans is also appended there as JSON lines, with
+their individual RPC calls.
+
+With HEAD_TRACKER enabled the span also remembers the head block right before the send
+and the receipt's blockNumber (see stress/tools/head_tracker.py).
+"""
+
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from locust import events
+
+import stress.tools.config as config
+from stress.tools.head_tracker import HeadSnapshot, HeadTracker
+from stress.tools.metrics import Metrics
+
+SEND_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+RECEIPT_METHODS = ("eth_getTransactionReceipt",)
+ESTIMATE_METHODS = ("eth_estimateGas",)
+
+
+@dataclass
+class RpcCall:
+    method: str
+    started: float  # time.perf_counter()
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class TxSpan:
+    """RPC calls made while one logical write was executing."""
+
+    name: str
+    started: float
+    started_at: float  # time.time(), for the span file
+    finished: float = 0.0
+    calls: list[RpcCall] = field(default_factory=list)
+    submit_head: HeadSnapshot | None = None
+    inclusion_block: int | None = None
+
+    def phases(self) -> dict[str, float] | None:
+        """Seconds spent in every phase, or None if no transaction was sent."""
+        sends = [c for c in self.calls if c.method in SEND_METHODS]
+        if not sends:
+            return None
+        send = sends[-1]
+        before = [c for c in self.calls if c.finished <= send.started]
+        receipts = [c for c in self.calls if c.method in RECEIPT_METHODS and c.started >= send.finished]
+        receipt = receipts[-1] if receipts else None
+        # Without a receipt poll (fire and forget) the transaction ends with the send
+        done = receipt.finished if receipt else send.finished
+        after = [c for c in self.calls if c.started >= done]
+
+        estimate_gas = sum(c.duration for c in before if c.method in ESTIMATE_METHODS)
+        prepare = sum(c.duration for c in before if c.method not in ESTIMATE_METHODS)
+        client = (send.started - self.started - estimate_gas - prepare) + (
+            self.finished - done - sum(c.duration for c in after)
+        )
+        return {
+            "client": max(client, 0.0),
+            "estimate_gas": estimate_gas,
+            "prepare": prepare,
+            "send": send.duration,
+            "inclusion_wait": receipt.started - send.finished if receipt else 0.0,
+            "receipt": receipt.duration if receipt else 0.0,
+        }
+
+    def submit_to_receipt(self) -> float | None:
+        """Seconds from the start of the send until the receipt was returned."""
+        sends = [c for c in self.calls if c.method in SEND_METHODS]
+        receipts = [c for c in self.calls if c.method in RECEIPT_METHODS]
+        if not sends or not receipts or receipts[-1].started < sends[-1].finished:
+            return None
+        return receipts[-1].finished - sends[-1].started
+
+    def to_record(self, phases: dict[str, float]) -> dict:
+        return {
+            "name": self.name,
+            "submit_head": self.submit_head.block_number if self.submit_head else None,
+            "submit_offset": self.submit_head.offset if self.submit_head else None,
+            "inclusion_block": self.inclusion_block,
+            "started_at": self.started_at,
+            "total_ms": (self.finished - self.started) * 1000,
+            "phases_ms": {phase: seconds * 1000 for phase, seconds in phases.items()},
+            "calls": [
+                {
+                    "method": c.method,
+                    "offset_ms": (c.started - self.started) * 1000,
+                    "duration_ms": c.duration * 1000,
+                }
+                for c in self.calls
+            ],
+        }
+
+
+# Span of the write running in the current greenlet
+_current_span: contextvars.ContextVar[TxSpan | None] = contextvars.ContextVar("tx_span", default=None)
+
+
+class TxSpanWriter:
+    """Appends sampled spans to TX_SPAN_FILE as JSON lines."""
+
+    _instance = None
+
+    @classmethod
+    def get_writer(cls):
+        """Get the global span writer (None when TX_SPAN_FILE is not set)"""
+        if cls._instance is None and config.tx_span_file:
+            cls._instance = cls(config.tx_span_file, config.tx_span_sample_rate)
+            logging.info(
+                "Writing %.1f%% of transaction spans to %s",
+                config.tx_span_sample_rate * 100,
+                config.tx_span_file,
+            )
+        return cls._instance
+
+    def __init__(self, path: str, sample_rate: float):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._file = None
+
+    def maybe_write(self, span: TxSpan, phases: dict[str, float]):
+        if random.random() >= self.sample_rate:
+            return
+        line = json.dumps(span.to_record(phases), separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def record_rpc_start(method: str | None):
+    """Remember the head block right before a transaction is sent (no-op outside of spans)."""
+    if method not in SEND_METHODS:
+        return
+    span = _current_span.get()
+    if span is not None:
+        span.submit_head = HeadTracker.snapshot()
+
+
+def record_rpc_call(method: str | None, started: float, finished: float, response=None):
+    """Attach an RPC call to the span open in this greenlet (no-op outside of spans)."""
+    span = _current_span.get()
+    if span is None or not method:
+        return
+    span.calls.append(RpcCall(method=method, started=started, finished=finished))
+    if method in RECEIPT_METHODS and span.submit_head is not None and response is not None:
+        try:
+            result = response.json().get("result")
+            if result and result.get("blockNumber"):
+                span.inclusion_block = int(result["blockNumber"], 16)
+        except Exception:
+            pass
+
+
+@contextmanager
+def tx_span(name: str) -> Iterator[TxSpan]:
+    """
+    Time the phases of the transaction sent inside the block.
+
+    Nested spans join the outer one, so wrapping a helper that already opens a span is harmless.
+    """
+    outer = _current_span.get()
+    if outer is not None:
+        yield outer
+        return
+
+    span = TxSpan(name=name, started=time.perf_counter(), started_at=time.time())
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+        span.finished = time.perf_counter()
+        _finish(span)
+
+
+def _finish(span: TxSpan):
+    try:
+        phases = span.phases()
+        if phases is None:
+            return
+        Metrics.get_metrics().record_transaction_phases(phases)
+        latency = span.submit_to_receipt()
+        if span.submit_head is not None and span.inclusion_block is not None and latency is not None:
+            Metrics.get_metrics().record_inclusion(
+                span.inclusion_block - span.submit_head.block_number,
+                span.submit_head.offset_bucket,
+                latency,
+            )
+        writer = TxSpanWriter.get_writer()
+        if writer is not None:
+            writer.maybe_write(span, phases)
+    except Exception as e:
+        logging.warning("Could not record transaction span %s: %s", span.name, e)
+
+
+@events.quitting.add_listener
+def on_quitting_tx_spans(environment, **kwargs):
+    """Close the span file."""
+    if TxSpanWriter._instance is not None:
+        TxSpanWriter._instance.close()
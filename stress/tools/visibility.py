@@ -0,0 +1,115 @@
+import logging
+import time
+
+from arkiv import Arkiv
+from arkiv.types import ATTRIBUTES, KEY
+from arkiv.utils import to_query_options
+
+# Polling schedule for visibility checks (seconds)
+DEFAULT_INITIAL_BACKOFF = 0.05
+DEFAULT_MAX_BACKOFF = 2.0
+DEFAULT_BACKOFF_FACTOR = 2.0
+DEFAULT_TIMEOUT = 60.0
+
+# Maximum number of values OR-ed together in a single query
+DEFAULT_QUERY_BATCH_SIZE = 50
+
+MAX_RESULTS_PER_PAGE: int = 1_000_000_000
+
+
+def build_match_query(attribute: str, values: list[str]) -> str:
+    """
+    Build a single query matching any of the given attribute values.
+
+    Example: uniqueId="a" || uniqueId="b"
+    """
+    return " || ".join(f'{attribute}="{value}"' for value in values)
+
+
+def _entity_match_value(entity, attribute: str) -> str | None:
+    """Extract the value used to match an entity returned by query_entities."""
+    if attribute == "$key":
+        key = getattr(entity, "key", None)
+        return str(key).lower() if key is not None else None
+    attributes = getattr(entity, "attributes", None) or {}
+    value = attributes.get(attribute)
+    return str(value) if value is not None else None
+
+
+def wait_for_visibility(
+    w3: Arkiv,
+    attribute: str,
+    values: list[str],
+    timeout: float = DEFAULT_TIMEOUT,
+    initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
+    max_backoff: float = DEFAULT_MAX_BACKOFF,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+) -> dict[str, tuple[float, int]]:
+    """
+    Poll query_entities until every value of `attribute` is visible or the timeout expires.
+
+    Entities still missing are queried in batches of `batch_size` OR-ed conditions, so a
+    poll round costs ceil(missing / batch_size) queries. The delay between rounds grows
+    exponentially from `initial_backoff` up to `max_backoff`.
+
+    Args:
+        w3: Arkiv client connected to the endpoint being measured
+        attribute: Attribute to match on ("uniqueId" or "$key")
+        values: Attribute values of the entities to wait for
+        timeout: Maximum time to wait in seconds
+
+    Returns:
+        Dictionary value -> (time.perf_counter() when first seen, head block when first seen).
+        Values that never became visible are missing from the result.
+    """
+    if attribute == "$key":
+        values = [value.lower() for value in values]
+    missing = set(values)
+    seen: dict[str, tuple[float, int]] = {}
+    fields = KEY if attribute == "$key" else KEY | ATTRIBUTES
+
+    deadline = time.perf_counter() + timeout
+    backoff = initial_backoff
+
+    while missing:
+        pending = sorted(missing)
+        found_now = []
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i : i + batch_size]
+            result = w3.arkiv.query_entities(
+                query=build_match_query(attribute, chunk),
+                options=to_query_options(
+                    fields=fields, max_results_per_page=MAX_RESULTS_PER_PAGE
+                ),
+            )
+            for entity in result:
+                value = _entity_match_value(entity, attribute)
+                if value in missing:
+                    found_now.append(value)
+
+        if found_now:
+            seen_at = time.perf_counter()
+            head_block = w3.eth.block_number
+            for value in found_now:
+                if value in missing:
+                    missing.discard(value)
+                    seen[value] = (seen_at, head_block)
+
+        if not missing:
+            break
+
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            logging.warning(
+                "Visibility check timed out after %ss with %s of %s entities missing",
+                timeout,
+                len(missing),
+                len(values),
+            )
+            break
+
+        time.sleep(min(backoff, remaining))
+        backoff = min(backoff * backoff_factor, max_backoff)
+
+    return seen
@@ -0,0 +1,123 @@
+import importlib.util
+import math
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODULE_PATH = REPO_ROOT / "stress" / "tools" / "capacity.py"
+
+
+def load_capacity_module():
+    stress_module = types.ModuleType("stress")
+    tools_module = types.ModuleType("stress.tools")
+    mempool_module = types.ModuleType("stress.tools.mempool")
+    mempool_module.read_txpool_status = lambda rpc_url: None
+    stress_module.tools = tools_module
+    tools_module.mempool = mempool_module
+
+    stubs = {
+        "stress": stress_module,
+        "stress.tools": tools_module,
+        "stress.tools.mempool": mempool_module,
+    }
+    with mock.patch.dict(sys.modules, stubs):
+        spec = importlib.util.spec_from_file_location("capacity_under_test", MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(module)
+    return module
+
+
+class CapacityTests(unittest.TestCase):
+    def setUp(self):
+        self.module = load_capacity_module()
+
+    def sample(self, users, throughput, p95_ms, slo_violated=False):
+        return self.module.CapacitySample(
+            run_time=0.0, users=users, throughput=throughput, p95_ms=p95_ms, slo_violated=slo_violated
+        )
+
+    def test_find_knee_picks_highest_throughput_per_latency(self):
+        samples = [
+            self.sample(1, 10, 100),
+            self.sample(2, 20, 110),  # highest power: 20 / 110 > 30 / 200
+            self.sample(4, 30, 200),
+            self.sample(8, 40, 400),
+        ]
+
+        knee = self.module.find_knee(samples)
+
+        self.assertEqual(knee.users, 2)
+
+    def test_find_knee_averages_samples_of_the_same_user_count(self):
+        samples = [
+            self.sample(2, 10, 100),
+            self.sample(2, 30, 100),
+            self.sample(4, 25, 100),
+        ]
+
+        knee = self.module.find_knee(samples)
+
+        self.assertEqual(knee.users, 4)
+        self.assertIsNone(self.module.find_knee([self.sample(1, 0, 0)]))
+
+    def test_max_sustainable_skips_levels_that_violated_the_slo(self):
+        samples = [
+            self.sample(2, 20, 100),
+            self.sample(4, 35, 150),
+            self.sample(8, 40, 900, slo_violated=True),
+        ]
+
+        self.assertEqual(self.module.max_sustainable(samples).users, 4)
+
+    def test_histogram_percentile_interpolates_within_the_bucket(self):
+        bounds = [10.0, 20.0, 50.0, math.inf]
+        previous = [5, 5, 5, 5]
+        # 10 observations in the window: 0 <= 10ms, 4 in (10, 20], 6 in (20, 50]
+        current = [5, 9, 15, 15]
+
+        p50 = self.module.histogram_percentile(bounds, previous, current, 0.5)
+        p95 = self.module.histogram_percentile(bounds, previous, current, 0.95)
+
+        self.assertAlmostEqual(p50, 20 + 30 * (5 - 4) / 6)
+        self.assertAlmostEqual(p95, 20 + 30 * (9.5 - 4) / 6)
+
+    def test_histogram_percentile_edge_cases(self):
+        bounds = [10.0, 20.0, math.inf]
+
+        self.assertIsNone(self.module.histogram_percentile(bounds, [1, 2, 3], [1, 2, 3], 0.95))
+        # Without a previous snapshot the counts since start are used
+        self.assertAlmostEqual(self.module.histogram_percentile(bounds, [], [4, 4, 4], 0.5), 5.0)
+        # Everything above the last finite bound reports that bound
+        self.assertEqual(self.module.histogram_percentile(bounds, [0, 0, 0], [0, 0, 3], 0.95), 20.0)
+
+    def test_is_steady(self):
+        self.assertFalse(self.module.is_steady([100, 101], window=3, max_cv=0.1))
+        self.assertTrue(self.module.is_steady([10, 500, 100, 102, 98], window=3, max_cv=0.1))
+        self.assertFalse(self.module.is_steady([100, 150, 50], window=3, max_cv=0.1))
+        self.assertFalse(self.module.is_steady([0, 0, 0], window=3, max_cv=0.1))
+
+    def test_aimd_controller_adds_and_cuts_within_bounds(self):
+        controller = self.module.AimdController(
+            initial_users=4,
+            min_users=1,
+            max_users=7,
+            additive_step=2,
+            decrease_factor=0.5,
+            p95_slo_ms=1000,
+            mempool_growth_limit=5,
+        )
+
+        self.assertEqual(controller.update(500), 6)
+        self.assertEqual(controller.update(500), 7)
+        self.assertEqual(controller.update(500, mempool_growth=10), 3)
+        self.assertEqual(controller.update(2000), 1)
+        self.assertEqual(controller.update(2000), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
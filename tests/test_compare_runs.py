@@ -0,0 +1,167 @@
+import contextlib
+import importlib.util
+import io
+import random
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODULE_PATH = REPO_ROOT / "compare-runs.py"
+
+
+def load_compare_runs_module():
+    spec = importlib.util.spec_from_file_location("compare_runs_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+class CompareRunsTests(unittest.TestCase):
+    def setUp(self):
+        self.module = load_compare_runs_module()
+        self.args = self.module.parse_args(["baseline", "candidate", "--bootstrap-iterations", "300"])
+
+    def run_data(self, latencies=None, throughput=None, scalars=None):
+        return self.module.RunData(
+            source="test",
+            latencies=latencies or {},
+            throughput=throughput or [],
+            scalars=scalars or {},
+        )
+
+    def test_quantile_interpolates(self):
+        self.assertEqual(self.module.quantile([1, 2, 3, 4], 0.5), 2.5)
+        self.assertEqual(self.module.quantile([5], 0.95), 5)
+
+    def test_mann_whitney_detects_shift_and_not_identical_samples(self):
+        rng = random.Random(1)
+        baseline = [rng.gauss(100, 10) for _ in range(200)]
+        shifted = [value + 20 for value in baseline]
+
+        _, p_shifted = self.module.mann_whitney_u(baseline, shifted)
+        _, p_same = self.module.mann_whitney_u(baseline, list(baseline))
+
+        self.assertLess(p_shifted, 1e-6)
+        self.assertGreater(p_same, 0.9)
+
+    def test_mann_whitney_handles_all_ties(self):
+        _, p_value = self.module.mann_whitney_u([1] * 10, [1] * 10)
+
+        self.assertEqual(p_value, 1.0)
+
+    def test_latency_regression_and_improvement(self):
+        rng = random.Random(2)
+        baseline = [rng.uniform(90, 110) for _ in range(300)]
+        slower = [value * 1.3 for value in baseline]
+        faster = [value * 0.7 for value in baseline]
+
+        regression = self.module.compare_distribution("latency x", "p50", baseline, slower, True, self.args)
+        improvement = self.module.compare_distribution("latency x", "p50", baseline, faster, True, self.args)
+
+        self.assertEqual(regression.verdict, self.module.REGRESSION)
+        self.assertAlmostEqual(regression.change, 0.3, places=6)
+        self.assertGreater(regression.ci_low, 0)
+        self.assertEqual(improvement.verdict, self.module.IMPROVEMENT)
+
+    def test_lower_throughput_is_a_regression(self):
+        rng = random.Random(3)
+        baseline = [rng.uniform(95, 105) for _ in range(60)]
+        candidate = [value * 0.8 for value in baseline]
+
+        verdict = self.module.compare_distribution("throughput", "mean", baseline, candidate, False, self.args)
+
+        self.assertEqual(verdict.verdict, self.module.REGRESSION)
+
+    def test_small_effect_is_not_a_regression(self):
+        rng = random.Random(4)
+        baseline = [rng.uniform(90, 110) for _ in range(2000)]
+        candidate = [value * 1.02 for value in baseline]
+
+        verdict = self.module.compare_distribution("latency x", "p50", baseline, candidate, True, self.args)
+
+        self.assertEqual(verdict.verdict, self.module.NO_CHANGE)
+
+    def test_p95_tail_regression_is_gated_on_the_bootstrap_ci(self):
+        rng = random.Random(6)
+        baseline = [rng.uniform(90, 110) for _ in range(1000)]
+        # Same body, only the slowest 10% get much slower: no shift for Mann-Whitney
+        candidate = sorted(baseline)
+        candidate = candidate[:900] + [value * 2 for value in candidate[900:]]
+
+        _, p_value = self.module.mann_whitney_u(baseline, candidate)
+        verdict = self.module.compare_distribution("latency x", "p95", baseline, candidate, True, self.args)
+
+        self.assertGreater(p_value, self.args.alpha)
+        self.assertEqual(verdict.verdict, self.module.REGRESSION)
+        self.assertIsNone(verdict.p_value)
+        self.assertGreater(verdict.ci_low, 0)
+
+    def test_load_influx_reports_db_growth_per_node(self):
+        growth = {"sequencer": 5_000_000, "validator": 6_000_000}
+        totals = {"loadtest_entities_created_total": 1000}
+
+        with mock.patch.object(
+            self.module, "query_total", side_effect=lambda test, measurement, fn="last": totals.get(measurement)
+        ), mock.patch.object(
+            self.module, "query_growth", side_effect=lambda test, measurement, node: growth[node]
+        ), mock.patch.object(self.module, "query_rates", return_value=[]):
+            run = self.module.load_influx("test-1")
+
+        self.assertEqual(
+            run.scalars,
+            {"db_bytes_per_entity_sequencer": 5000, "db_bytes_per_entity_validator": 6000},
+        )
+
+    def test_too_few_samples(self):
+        verdict = self.module.compare_distribution("latency x", "p50", [1, 2], [3, 4], True, self.args)
+
+        self.assertEqual(verdict.verdict, self.module.INSUFFICIENT)
+
+    def test_scalar_threshold(self):
+        regression = self.module.compare_scalar("db_bytes_per_entity_sequencer", 1000, 1200, True, self.args)
+        unchanged = self.module.compare_scalar("db_bytes_per_entity_sequencer", 1000, 1050, True, self.args)
+        missing = self.module.compare_scalar("cost_usd_per_entity", None, 0.1, True, self.args)
+
+        self.assertEqual(regression.verdict, self.module.REGRESSION)
+        self.assertEqual(unchanged.verdict, self.module.NO_CHANGE)
+        self.assertEqual(missing.verdict, self.module.INSUFFICIENT)
+
+    def test_samples_to_run_groups_latencies_and_entity_rates(self):
+        rows = [
+            {"timestamp": second, "name": "store", "latency_ms": 100.0, "entity_count": 5, "error": None}
+            for second in range(0, 50)
+        ]
+        rows.append({"timestamp": 10, "name": "store", "latency_ms": 9999.0, "entity_count": 5, "error": "Timeout"})
+
+        run = self.module.samples_to_run("export", rows)
+
+        self.assertEqual(len(run.latencies["store"]), 50)
+        self.assertEqual(run.throughput, [5.0, 5.0, 5.0])
+
+    def test_main_exits_non_zero_on_regression(self):
+        rng = random.Random(5)
+        baseline = self.run_data(
+            latencies={"store": [rng.uniform(90, 110) for _ in range(200)]},
+            scalars={"db_bytes_per_entity_sequencer": 1000},
+        )
+        slower = self.run_data(
+            latencies={"store": [value * 1.5 for value in baseline.latencies["store"]]},
+            scalars={"db_bytes_per_entity_sequencer": 1000},
+        )
+        runs = {"base": baseline, "slow": slower, "same": baseline}
+
+        output = io.StringIO()
+        with mock.patch.object(self.module, "load_run", side_effect=runs.get), contextlib.redirect_stdout(output):
+            failing = self.module.main(["base", "slow", "--bootstrap-iterations", "200"])
+            passing = self.module.main(["base", "same", "--bootstrap-iterations", "200"])
+
+        self.assertEqual(failing, 1)
+        self.assertEqual(passing, 0)
+        self.assertIn("REGRESSION", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
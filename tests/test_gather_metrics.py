@@ -1,7 +1,11 @@
 import contextlib
 import io
 import importlib.util
+import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import types
 import unittest
 from decimal import Decimal
@@ -70,6 +74,13 @@ def load_gather_metrics_module():
     return module
 
 
+def fake_rpc_batch(fake_rpc):
+    def call_batch(url, calls):
+        return [fake_rpc(url, method, params) for method, params in calls]
+
+    return call_batch
+
+
 class GatherMetricsTests(unittest.TestCase):
     def setUp(self):
         self.module = load_gather_metrics_module()
@@ -132,6 +143,7 @@ class GatherMetricsTests(unittest.TestCase):
             return responses[(method, tuple(params))]
 
         self.module.call_json_rpc = fake_rpc
+        self.module.call_json_rpc_batch = fake_rpc_batch(fake_rpc)
 
         points = self.module.collect_l1_sender_points_sync()
         measurements = [point.measurement for point in points]
@@ -198,6 +210,7 @@ class GatherMetricsTests(unittest.TestCase):
             return responses[(method, tuple(params))]
 
         self.module.call_json_rpc = fake_rpc
+        self.module.call_json_rpc_batch = fake_rpc_batch(fake_rpc)
 
         points = self.module.collect_l1_sender_points_sync()
 
@@ -241,6 +254,7 @@ class GatherMetricsTests(unittest.TestCase):
             return responses[(method, tuple(params))]
 
         self.module.call_json_rpc = fake_rpc
+        self.module.call_json_rpc_batch = fake_rpc_batch(fake_rpc)
 
         with io.StringIO() as stdout, contextlib.redirect_stdout(stdout):
             self.module.collect_l1_sender_points_sync()
@@ -276,6 +290,7 @@ class GatherMetricsTests(unittest.TestCase):
             return responses[(method, tuple(params))]
 
         self.module.call_json_rpc = fake_rpc
+        self.module.call_json_rpc_batch = fake_rpc_batch(fake_rpc)
 
         with io.StringIO() as stdout, contextlib.redirect_stdout(stdout):
             self.module.collect_l1_sender_points_sync()
@@ -285,6 +300,107 @@ class GatherMetricsTests(unittest.TestCase):
         self.assertIn(f"tracked=op-batcher={self.batcher_address}", output)
         self.assertIn(f"seen_from={other_address}", output)
 
+    def test_collect_l1_sender_points_scans_in_batches_up_to_the_iteration_cap(self):
+        transaction_hash = "0x" + ("12" * 32)
+        self.module.GAS_BASE_NETWORK = ""
+        self.module.L1_SCAN_BATCH_SIZE = 3
+        self.module.L1_SCAN_CONCURRENCY = 2
+        self.module.L1_SCAN_MAX_BLOCKS_PER_ITERATION = 8
+        batches = []
+
+        def fake_rpc(url, method, params):
+            if method == "eth_blockNumber":
+                return "0xb"
+            if method == "eth_getBlockReceipts":
+                return [{"transactionHash": transaction_hash, "gasUsed": "0x5208"}]
+            raise AssertionError(f"unexpected single call {method}")
+
+        def fake_batch(url, calls):
+            batches.append([hex_to_int(params[0]) for _, params in calls])
+            return [
+                {
+                    "transactions": [
+                        {"hash": transaction_hash, "from": self.sender_address, "to": ""}
+                    ]
+                    if params[0] == "0x6"
+                    else []
+                }
+                for _, params in calls
+            ]
+
+        hex_to_int = self.module.hex_to_int
+        self.module.call_json_rpc = fake_rpc
+        self.module.call_json_rpc_batch = fake_batch
+
+        with io.StringIO() as stdout, contextlib.redirect_stdout(stdout):
+            self.module.collect_l1_sender_points_sync()
+            output = stdout.getvalue()
+
+        self.assertEqual(sorted(batches), [[0, 1, 2], [3, 4, 5], [6, 7]])
+        self.assertEqual(self.module.l1_tx_metrics_state["last_scanned_block"], 7)
+        self.assertEqual(self.module.l1_tx_metrics_state["transactions_total"]["op-node"], 1)
+        self.assertIn("catching up: 4 block(s) behind L1 head 11", output)
+
+        batches.clear()
+        self.module.collect_l1_sender_points_sync()
+
+        self.assertEqual(sorted(batches), [[8, 9, 10], [11]])
+        self.assertEqual(self.module.l1_tx_metrics_state["last_scanned_block"], 11)
+        self.assertEqual(self.module.l1_tx_metrics_state["transactions_total"]["op-node"], 1)
+
+    def test_get_l1_blocks_falls_back_to_single_calls_when_batches_fail(self):
+        def fake_batch(url, calls):
+            raise RuntimeError("batch requests are not supported")
+
+        self.module.call_json_rpc_batch = fake_batch
+        self.module.call_json_rpc = lambda url, method, params: {"number": params[0]}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            blocks = self.module.get_l1_blocks(self.module.OP_NODE_L1_RPC_URL, [4, 5])
+
+        self.assertEqual(blocks, [{"number": "0x4"}, {"number": "0x5"}])
+
+    def test_call_json_rpc_batch_returns_results_in_call_order(self):
+        class Response:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return [
+                    {"jsonrpc": "2.0", "id": 1, "result": "second"},
+                    {"jsonrpc": "2.0", "id": 0, "result": "first"},
+                ]
+
+        requests_posted = []
+
+        def fake_post(url, json, timeout):
+            requests_posted.append(json)
+            return Response()
+
+        self.module.requests.post = fake_post
+
+        results = self.module.call_json_rpc_batch(
+            "http://l1", [("eth_blockNumber", []), ("eth_chainId", [])]
+        )
+
+        self.assertEqual(results, ["first", "second"])
+        self.assertEqual([request["id"] for request in requests_posted[0]], [0, 1])
+
+    def test_find_matching_l1_transactions_looks_up_senders(self):
+        sender_components = self.module.get_l1_sender_components(
+            {"op-node": self.sender_address, "op-batcher": self.sender_address}
+        )
+        transactions = [
+            {"hash": "0x01", "from": self.sender_address.upper()},
+            {"hash": "0x02", "from": self.batcher_address},
+            {"from": self.sender_address},
+        ]
+
+        matching, seen = self.module.find_matching_l1_transactions(transactions, sender_components)
+
+        self.assertEqual(matching, [("op-node", self.sender_address, transactions[0])])
+        self.assertEqual(seen, [self.sender_address, self.batcher_address])
+
     def test_log_prepared_l1_points_logs_summary_and_queued_points(self):
         point = self.module.create_point(
             "arkiv_l1_transactions_total",
@@ -654,6 +770,141 @@ class GatherMetricsTests(unittest.TestCase):
         self.assertNotIn("arkiv_tia_price_usd", measurements)
         self.assertNotIn("arkiv_simulated_da_spending_usd", measurements)
 
+    def test_collect_da_efficiency_initializes_baseline_without_ratio(self):
+        self.module.LOADTEST_METRICS_URL = "http://127.0.0.1:9091/metrics"
+        self.module.metrics_state["arkiv_da_data_size"] = 5000
+        self.module.fetch_loadtest_payload_bytes = lambda url: 2000.0
+
+        points = self.module.collect_da_efficiency_points_sync()
+        measurements = [point.measurement for point in points]
+
+        self.assertEqual(measurements, ["arkiv_loadtest_payload_bytes"])
+        self.assertEqual(
+            self.module.da_efficiency_state,
+            {"da_data_size_baseline": 5000, "payload_bytes_baseline": 2000.0},
+        )
+
+    def test_collect_da_efficiency_divides_da_growth_by_payload_bytes(self):
+        self.module.LOADTEST_METRICS_URL = "http://127.0.0.1:9091/metrics"
+        self.module.da_efficiency_state = {
+            "da_data_size_baseline": 5000,
+            "payload_bytes_baseline": 2000.0,
+        }
+        self.module.metrics_state["arkiv_da_data_size"] = 8000
+        self.module.fetch_loadtest_payload_bytes = lambda url: 12000.0
+
+        points = self.module.collect_da_efficiency_points_sync()
+        efficiency_point = next(
+            point for point in points if point.measurement == "arkiv_da_efficiency"
+        )
+
+        # (8000 - 5000) DA bytes for (12000 - 2000) payload bytes
+        self.assertAlmostEqual(efficiency_point.fields["value"], 0.3)
+
+    def test_collect_da_efficiency_resets_baseline_when_counter_drops(self):
+        self.module.LOADTEST_METRICS_URL = "http://127.0.0.1:9091/metrics"
+        self.module.da_efficiency_state = {
+            "da_data_size_baseline": 5000,
+            "payload_bytes_baseline": 2000.0,
+        }
+        self.module.metrics_state["arkiv_da_data_size"] = 9000
+        self.module.fetch_loadtest_payload_bytes = lambda url: 100.0
+
+        points = self.module.collect_da_efficiency_points_sync()
+        measurements = [point.measurement for point in points]
+
+        self.assertNotIn("arkiv_da_efficiency", measurements)
+        self.assertEqual(
+            self.module.da_efficiency_state,
+            {"da_data_size_baseline": 9000, "payload_bytes_baseline": 100.0},
+        )
+
+    def test_collect_da_efficiency_empty_when_no_url(self):
+        self.module.LOADTEST_METRICS_URL = ""
+        self.assertEqual(self.module.collect_da_efficiency_points_sync(), [])
+
+
+def du_apparent_size(path):
+    """Reference total with `du -sb` semantics: lstat sizes, hard links counted once."""
+    seen = set()
+    total = 0
+    for directory, dirnames, filenames in os.walk(path):
+        for name in [None, *dirnames, *filenames]:
+            stat = os.lstat(directory if name is None else os.path.join(directory, name))
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+class DirectorySizeTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.module = load_gather_metrics_module()
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "data")
+        os.makedirs(os.path.join(self.root, "chaindata", "ancient"))
+        self.write("chaindata/000001.log", 1000)
+        self.write("chaindata/ancient/headers.cdat", 5000)
+        self.write("LOCK", 0)
+        os.link(
+            os.path.join(self.root, "chaindata", "000001.log"),
+            os.path.join(self.root, "chaindata", "hardlink.log"),
+        )
+        os.symlink("chaindata/000001.log", os.path.join(self.root, "current"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, relative_path, size, mode="wb"):
+        with open(os.path.join(self.root, relative_path), mode) as f:
+            f.write(b"x" * size)
+
+    def mutate(self):
+        self.write("chaindata/000001.log", 4096, mode="ab")
+        os.makedirs(os.path.join(self.root, "chaindata", "new"))
+        self.write("chaindata/new/000002.sst", 12345)
+        shutil.rmtree(os.path.join(self.root, "chaindata", "ancient"))
+        os.rename(
+            os.path.join(self.root, "chaindata", "new"),
+            os.path.join(self.root, "moved"),
+        )
+        os.remove(os.path.join(self.root, "LOCK"))
+
+    def assert_tracks_changes(self, use_inotify):
+        tracker = self.module.DirectorySizeTracker(self.root, use_inotify=use_inotify)
+        try:
+            self.assertEqual(tracker.size(), du_apparent_size(self.root))
+            self.mutate()
+            self.assertEqual(tracker.size(), du_apparent_size(self.root))
+            shutil.rmtree(self.root)
+            self.assertEqual(tracker.size(), 0)
+            os.makedirs(self.root)
+            self.write("restarted.db", 777)
+            self.assertEqual(tracker.size(), du_apparent_size(self.root))
+        finally:
+            tracker.close()
+
+    def test_tracks_changes_with_rescans(self):
+        self.assert_tracks_changes(use_inotify=False)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_tracks_changes_incrementally_with_inotify(self):
+        self.assert_tracks_changes(use_inotify=True)
+
+    @unittest.skipUnless(shutil.which("du"), "du is not installed")
+    def test_matches_du_sb(self):
+        tracker = self.module.DirectorySizeTracker(self.root, use_inotify=False)
+        du_output = subprocess.run(["du", "-sb", self.root], capture_output=True, check=True).stdout
+
+        self.assertEqual(tracker.size(), int(du_output.split()[0]))
+
+    def test_missing_directory_is_zero(self):
+        tracker = self.module.DirectorySizeTracker(os.path.join(self.tmp, "missing"))
+        try:
+            self.assertEqual(tracker.size(), 0)
+        finally:
+            tracker.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import importlib.util
+import logging
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODULE_PATH = REPO_ROOT / "stress" / "tools" / "logging_setup.py"
+
+
+def load_logging_setup_module():
+    locust_module = types.ModuleType("locust")
+    locust_module.events = types.SimpleNamespace(
+        quitting=types.SimpleNamespace(add_listener=lambda fn: fn)
+    )
+
+    stress_module = types.ModuleType("stress")
+    tools_module = types.ModuleType("stress.tools")
+    config_module = types.ModuleType("stress.tools.config")
+    config_module.log_sample_rate = 1.0
+    config_module.log_rate_limit = 0.0
+    config_module.log_level = "INFO"
+    stress_module.tools = tools_module
+    tools_module.config = config_module
+
+    stubs = {
+        "locust": locust_module,
+        "stress": stress_module,
+        "stress.tools": tools_module,
+        "stress.tools.config": config_module,
+    }
+    with mock.patch.dict(sys.modules, stubs):
+        spec = importlib.util.spec_from_file_location("logging_setup_under_test", MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(module)
+    return module
+
+
+def make_record(level=logging.INFO, lineno=10, msg="query returned %s entities", args=(3,)):
+    return logging.LogRecord("test", level, "/stress/l3/locustfile.py", lineno, msg, args, None)
+
+
+class CallSiteFilterTests(unittest.TestCase):
+    def setUp(self):
+        self.module = load_logging_setup_module()
+        self.now = 100.0
+        patcher = mock.patch.object(self.module.time, "monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_warnings_are_never_dropped(self):
+        log_filter = self.module.CallSiteFilter(sample_rate=0.0, rate_limit=1.0)
+
+        kept = [log_filter.filter(make_record(level=logging.WARNING)) for _ in range(5)]
+
+        self.assertEqual(kept, [True] * 5)
+
+    def test_sample_rate_drops_records_below_warning(self):
+        dropping = self.module.CallSiteFilter(sample_rate=0.0)
+        keeping = self.module.CallSiteFilter(sample_rate=1.0)
+
+        self.assertFalse(dropping.filter(make_record()))
+        self.assertTrue(keeping.filter(make_record()))
+
+    def test_rate_limit_per_call_site_reports_dropped_records(self):
+        log_filter = self.module.CallSiteFilter(rate_limit=2.0)
+
+        kept = [log_filter.filter(make_record()) for _ in range(5)]
+        other_site = log_filter.filter(make_record(lineno=20))
+
+        self.assertEqual(kept, [True, True, False, False, False])
+        self.assertTrue(other_site)
+
+        self.now += 1.0
+        record = make_record()
+        self.assertTrue(log_filter.filter(record))
+        self.assertEqual(record.getMessage(), "query returned 3 entities (3 similar dropped)")
+
+        # The count is reset once reported
+        record = make_record()
+        self.assertTrue(log_filter.filter(record))
+        self.assertEqual(record.getMessage(), "query returned 3 entities")
+
+    def test_rate_limit_below_one_record_per_second(self):
+        log_filter = self.module.CallSiteFilter(rate_limit=0.5)
+
+        kept = [log_filter.filter(make_record()) for _ in range(3)]
+        self.now += 1.0
+        too_early = log_filter.filter(make_record())
+        self.now += 1.0
+        refilled = log_filter.filter(make_record())
+
+        self.assertEqual(kept, [True, False, False])
+        self.assertFalse(too_early)
+        self.assertTrue(refilled)
+
+    def test_dropped_count_without_args(self):
+        log_filter = self.module.CallSiteFilter(rate_limit=1.0)
+        log_filter.filter(make_record(msg="skipping query", args=()))
+        log_filter.filter(make_record(msg="skipping query", args=()))
+
+        self.now += 1.0
+        record = make_record(msg="skipping query", args=())
+        log_filter.filter(record)
+
+        self.assertEqual(record.getMessage(), "skipping query (1 similar dropped)")
+
+
+if __name__ == "__main__":
+    unittest.main()
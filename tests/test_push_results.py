@@ -43,6 +43,27 @@ class PushResultsTests(unittest.TestCase):
             {"value": 21_000_000_000_000, "display": "0.000021"},
         )
 
+    def test_collect_load_generator_metrics_flags_saturation(self):
+        def fake_query(test_name, measurement):
+            self.assertEqual(measurement, "loadtest_generator_saturated_seconds_total")
+            return {"saturated-test": 42.0, "healthy-test": 0}.get(test_name)
+
+        with mock.patch.object(
+            self.module, "query_last_metric_total", side_effect=fake_query
+        ):
+            saturated = self.module.collect_load_generator_result_metrics("saturated-test")
+            healthy = self.module.collect_load_generator_result_metrics("healthy-test")
+            missing = self.module.collect_load_generator_result_metrics("unknown-test")
+
+        self.assertEqual(
+            saturated["loadGeneratorSaturatedSeconds"],
+            {"value": 42, "display": "saturated 42s"},
+        )
+        self.assertEqual(
+            healthy["loadGeneratorSaturatedSeconds"], {"value": 0, "display": "ok"}
+        )
+        self.assertEqual(missing, {})
+
     def test_query_last_metric_total_escapes_flux_strings(self):
         captured = {}
 